@@ -0,0 +1,65 @@
+"""Compare load time and peak RSS of JSON and binary saves.
+
+Usage: python -m benchmarks.load_formats [task_count]
+
+Each load runs in a fresh interpreter so RSS figures don't include the
+other format. "first page" loads the save and reads the first 20 tasks,
+which is what a screen needs; "all tasks" builds every task object.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils.data_manager import JsonStorage
+from utils.binary_format import BinaryStorage
+from benchmarks.run import populate
+
+PAGE_SIZE = 20
+
+CHILD = """
+import resource, sys, time
+from models.task_manager import TaskManager
+from utils.data_manager import JsonStorage
+from utils.binary_format import BinaryStorage
+engine, path, mode = sys.argv[1:4]
+storage = JsonStorage(path, journaled=False) if engine == "json" else BinaryStorage(path)
+started = time.perf_counter()
+game_state = storage.load_game_state()
+if mode == "page":
+    page = [game_state["tasks"][i] for i in range(min({page_size}, len(game_state["tasks"])))]
+else:
+    TaskManager().load_tasks(game_state["tasks"])
+elapsed = time.perf_counter() - started
+# VmHWM starts fresh at exec, unlike ru_maxrss which also counts the
+# forked parent
+with open("/proc/self/status") as f:
+    peak = next((int(line.split()[1]) for line in f if line.startswith("VmHWM:")), None)
+print(elapsed, peak or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+""".format(page_size=PAGE_SIZE)
+
+def run_child(engine, path, mode):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", CHILD, engine, path, mode],
+                            cwd=root, capture_output=True, text=True, check=True).stdout
+    elapsed, max_rss_kib = output.split()
+    return float(elapsed), int(max_rss_kib)
+
+def main(count=100_000):
+    with tempfile.TemporaryDirectory(prefix="rpg-bench-") as work_dir:
+        tasks = populate(TaskManager(), count).get_tasks()
+        json_file = os.path.join(work_dir, "gamestate.json")
+        binary_file = os.path.join(work_dir, "gamestate.bin")
+        JsonStorage(json_file, journaled=False).save_game_state(Survivor("Bench"), tasks)
+        BinaryStorage(binary_file).save_game_state(Survivor("Bench"), tasks)
+
+        print(f"Tasks: {count}")
+        for engine, path in (("json", json_file), ("binary", binary_file)):
+            print(f"{engine} file: {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+            for mode, label in (("page", "first page"), ("all", "all tasks")):
+                elapsed, max_rss_kib = run_child(engine, path, mode)
+                print(f"  {label:10}  {elapsed * 1000:9.1f} ms  peak RSS {max_rss_kib / 1024:7.1f} MiB")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
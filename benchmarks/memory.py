@@ -0,0 +1,77 @@
+"""Compare memory used by task objects and by the columnar TaskStore.
+
+Usage: python -m benchmarks.memory [task_count]
+"""
+import sys
+import tracemalloc
+from models.task_manager import TaskManager
+from models.task_store import TaskStore
+from models.todo_task import TodoTask
+from models.daily_task import DailyTask
+
+class DictTodoTask:
+    """Same fields as TodoTask, but with a per-instance __dict__ like the
+    task classes had before __slots__."""
+    def __init__(self, title, description, priority="low"):
+        self._id = None
+        self._title = title
+        self._description = description
+        self._completed = False
+        self._priority = priority
+
+class DictDailyTask:
+    def __init__(self, title, description=""):
+        self._id = None
+        self._title = title
+        self._description = description
+        self._completed = False
+        self.last_completion_date = None
+        self.was_successful = None
+
+def make_rows(count):
+    # Titles and descriptions are created up front so every layout below
+    # shares the same string objects and only its own overhead is measured
+    return [("todo", f"Task {i}", "Scavenge supplies", "medium") if i % 2
+            else ("daily", f"Habit {i}", "Drink water", None)
+            for i in range(count)]
+
+def build_dict_objects(rows):
+    tasks = {}
+    for task_id, (task_type, title, description, priority) in enumerate(rows, 1):
+        task = DictTodoTask(title, description, priority) if task_type == "todo" else DictDailyTask(title, description)
+        task._id = task_id
+        tasks[task_id] = task
+    return tasks
+
+def build_task_manager(rows):
+    task_manager = TaskManager()
+    for task_type, title, description, priority in rows:
+        task_manager.create_task(task_type, title, description, priority)
+    return task_manager
+
+def build_task_store(rows):
+    store = TaskStore()
+    for task_id, (task_type, title, description, priority) in enumerate(rows, 1):
+        task = TodoTask(title, description, priority) if task_type == "todo" else DailyTask(title, description)
+        task._id = task_id
+        store.add(task)
+    return store
+
+def measure(build, rows):
+    tracemalloc.start()
+    result = build(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main(count=100_000):
+    rows = make_rows(count)
+    print(f"Tasks: {count}")
+    for label, build in (("__dict__ objects", build_dict_objects),
+                         ("TaskManager", build_task_manager),
+                         ("TaskStore", build_task_store)):
+        print(f"{label + ':':18}{measure(build, rows) / count:8.1f} bytes/task")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,252 @@
+"""Headless benchmarks for the task, persistence and rendering hot paths.
+
+Usage: python -m benchmarks.run [--sizes 1000 10000 100000] [--output results.json]
+                                [--baseline baseline.json] [--tolerance 0.2]
+
+Every case reports throughput, latency percentiles and peak traced
+memory. Results are written as JSON so later runs can be compared with
+--baseline; cases whose throughput dropped by more than the tolerance
+are reported as regressions and make the run exit with status 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils.data_manager import DataManager, JsonStorage
+from utils.sqlite_storage import SqliteStorage
+
+PRIORITIES = ["low", "medium", "high"]
+
+def populate(task_manager, count):
+    for i in range(count):
+        if i % 4:
+            task_manager.create_task("todo", f"Task {i}", "Scavenge supplies", PRIORITIES[i % 3])
+        else:
+            task_manager.create_task("daily", f"Habit {i}", "Drink water")
+    return task_manager
+
+# Each case takes the task count and returns (setup, ops). setup builds
+# fresh state outside the timed region and ops(state) returns the
+# callables to time, one per operation, for the latency percentiles.
+
+def case_create_task(count):
+    def setup():
+        return TaskManager()
+    def ops(task_manager):
+        return [lambda i=i: task_manager.create_task("todo", f"Task {i}", "", "medium") for i in range(count)]
+    return setup, ops
+
+def case_complete_task(count):
+    character = Survivor("Bench")
+    def setup():
+        return populate(TaskManager(), count)
+    def ops(task_manager):
+        return [lambda task_id=task.id: task_manager.complete_task(task_id, character)
+                for task in task_manager.get_tasks()]
+    return setup, ops
+
+def case_delete_task(count):
+    def setup():
+        return populate(TaskManager(), count)
+    def ops(task_manager):
+        return [lambda task_id=task.id: task_manager.delete_task(task_id)
+                for task in task_manager.get_tasks()]
+    return setup, ops
+
+def case_query_tasks(count):
+    queries = [
+        {"task_type": "daily", "limit": 20},
+        {"priority": "high", "completed": False, "limit": 20},
+        {"search": "task 12", "limit": 20},
+        {"search": "supplies", "sort": "title", "limit": 20},
+    ]
+    def setup():
+        return populate(TaskManager(), count)
+    def ops(task_manager):
+        return [lambda query=query: task_manager.query(**query) for query in queries]
+    return setup, ops
+
+def case_load_tasks(count):
+    def setup():
+        tasks = populate(TaskManager(), count).get_tasks()
+        return [DataManager.serialize_task(task) for task in tasks]
+    def ops(tasks_data):
+        return [lambda: TaskManager().load_tasks(tasks_data)]
+    return setup, ops
+
+def _storage_cases(make_storage):
+    def case_save(count):
+        def setup():
+            return make_storage(), Survivor("Bench"), populate(TaskManager(), count).get_tasks()
+        def ops(state):
+            storage, character, tasks = state
+            return [lambda: storage.save_game_state(character, tasks)]
+        return setup, ops
+
+    def case_load(count):
+        def setup():
+            storage = make_storage()
+            storage.save_game_state(Survivor("Bench"), populate(TaskManager(), count).get_tasks())
+            return storage
+        def ops(storage):
+            return [storage.load_game_state]
+        return setup, ops
+
+    return case_save, case_load
+
+# Save files live in a directory run_case creates and removes for each run
+_work_dir = None
+
+def _temp_path(name):
+    return os.path.join(tempfile.mkdtemp(dir=_work_dir), name)
+
+case_json_save, case_json_load = _storage_cases(
+    lambda: JsonStorage(_temp_path("gamestate.json"), journaled=False))
+case_sqlite_save, case_sqlite_load = _storage_cases(
+    lambda: SqliteStorage(_temp_path("gamestate.db")))
+
+def case_view_tasks(count):
+    from main import view_tasks
+    def setup():
+        return populate(TaskManager(), count).get_tasks()
+    def ops(tasks):
+        def render():
+            with contextlib.redirect_stdout(io.StringIO()):
+                view_tasks(tasks, wait_for_input=False)
+        return [render]
+    return setup, ops
+
+def case_render_page(count):
+    from utils.task_renderer import TaskRenderer
+    def setup():
+        renderer = TaskRenderer(populate(TaskManager(), count))
+        renderer.render(0)  # Warm the row cache like a running session
+        return renderer
+    def ops(renderer):
+        pages = range(0, renderer.page_count(), max(1, renderer.page_count() // 100))
+        return [lambda page=page: renderer.render(page) for page in pages]
+    return setup, ops
+
+CASES = {
+    "task_manager.create_task": case_create_task,
+    "task_manager.complete_task": case_complete_task,
+    "task_manager.delete_task": case_delete_task,
+    "task_manager.query": case_query_tasks,
+    "task_manager.load_tasks": case_load_tasks,
+    "json.save_game_state": case_json_save,
+    "json.load_game_state": case_json_load,
+    "sqlite.save_game_state": case_sqlite_save,
+    "sqlite.load_game_state": case_sqlite_load,
+    "main.view_tasks": case_view_tasks,
+    "renderer.render_page": case_render_page,
+}
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def run_case(case, count):
+    global _work_dir
+    with tempfile.TemporaryDirectory(prefix="rpg-bench-") as _work_dir:
+        return _run_case(case, count)
+
+def _run_case(case, count):
+    setup, make_ops = case(count)
+
+    # Timed pass
+    operations = make_ops(setup())
+    latencies = []
+    started = time.perf_counter()
+    for operation in operations:
+        op_started = time.perf_counter_ns()
+        operation()
+        latencies.append(time.perf_counter_ns() - op_started)
+    elapsed = time.perf_counter() - started
+
+    # Separate pass for memory, since tracing slows everything down
+    state = setup()
+    operations = make_ops(state)
+    tracemalloc.start()
+    for operation in operations:
+        operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    # Whole-list operations process count tasks per call
+    tasks_processed = count if len(operations) == 1 else len(operations)
+    return {
+        "tasks": count,
+        "operations": len(operations),
+        "seconds": elapsed,
+        "tasks_per_second": tasks_processed / elapsed if elapsed else float("inf"),
+        "latency_us": {
+            "p50": percentile(latencies, 0.50) / 1000,
+            "p90": percentile(latencies, 0.90) / 1000,
+            "p99": percentile(latencies, 0.99) / 1000,
+            "max": latencies[-1] / 1000 if latencies else 0.0,
+        },
+        "peak_memory_bytes": peak,
+    }
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, runs in results["cases"].items():
+        for size, result in runs.items():
+            previous = baseline.get("cases", {}).get(name, {}).get(size)
+            if previous is None:
+                continue
+            ratio = result["tasks_per_second"] / previous["tasks_per_second"]
+            if ratio < 1 - tolerance:
+                regressions.append((name, size, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark task, persistence and rendering hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare throughput against a previous results file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed throughput drop against the baseline (default 0.2)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {},
+    }
+    for name in args.cases:
+        for count in args.sizes:
+            result = run_case(CASES[name], count)
+            results["cases"].setdefault(name, {})[str(count)] = result
+            print(f"{name:28} {count:>9} tasks  {result['tasks_per_second']:>14,.0f} tasks/s  "
+                  f"p50 {result['latency_us']['p50']:>10.1f}us  p99 {result['latency_us']['p99']:>10.1f}us  "
+                  f"peak {result['peak_memory_bytes'] / 1024 / 1024:>8.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, size, ratio in regressions:
+            print(f"REGRESSION: {name} at {size} tasks runs at {ratio:.0%} of baseline throughput")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
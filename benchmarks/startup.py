@@ -0,0 +1,61 @@
+"""Compare cold and warm start of the CLI.
+
+Usage: python -m benchmarks.startup [task_count] [runs]
+
+A cold start parses the save and rebuilds every task; a warm start finds
+a valid snapshot from utils.snapshot_cache. Each start runs in a fresh
+interpreter in the save's directory, the way the game is launched, and
+is timed from before `import main` until the game state is loaded. The
+process figure adds interpreter startup and exit. Medians of `runs`.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils.data_manager import JsonStorage
+from utils.snapshot_cache import SnapshotCache
+from benchmarks.run import populate
+
+CHILD = """
+import time
+started = time.perf_counter()
+import main
+from utils.data_manager import DataManager
+from utils.snapshot_cache import SnapshotCache
+character, task_manager = main.load_game(SnapshotCache(DataManager.storage))
+print(time.perf_counter() - started)
+"""
+
+def run_child(work_dir):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", CHILD], cwd=work_dir, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output), time.perf_counter() - started
+
+def main(count=10_000, runs=5):
+    with tempfile.TemporaryDirectory(prefix="rpg-bench-") as work_dir:
+        character = Survivor("Bench")
+        task_manager = populate(TaskManager(), count)
+        storage = JsonStorage(os.path.join(work_dir, JsonStorage.DEFAULT_FILE))
+        storage.save_game_state(character, task_manager.get_tasks())
+        snapshots = SnapshotCache(storage)
+        print(f"Tasks: {count}, save {os.path.getsize(storage.save_file) / 1024 / 1024:.1f} MiB")
+
+        for label, warm in (("cold", False), ("warm", True)):
+            if warm:
+                snapshots.save(character, task_manager)
+            else:
+                snapshots.invalidate()
+            results = [run_child(work_dir) for _ in range(runs)]
+            load = statistics.median(result[0] for result in results)
+            process = statistics.median(result[1] for result in results)
+            print(f"  {label}  {load * 1000:9.1f} ms to loaded state  {process * 1000:9.1f} ms per process")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -1,21 +1,43 @@
+import argparse
+import os
+import sys
+import threading
+from datetime import date
 from models.survivor import Survivor
-from models.todo_task import TodoTask
 from models.daily_task import DailyTask
 from utils.data_manager import DataManager
-from models.consumables import Food, Water, Medicine
 from models.task_manager import TaskManager
+from models.daily_rollover import DailyRollover
+from models.rules import MAX_HEALTH, MAX_STAT
+from utils.task_renderer import TaskRenderer, format_task
+from utils import metrics
 
-def display_menu():
+def ask(prompt=""):
+    # Time at a prompt is the player's, not the menu step's
+    with metrics.waiting():
+        return input(prompt)
+
+def display_menu(history):
     print("\n=== Post-Apocalyptic RPG To-Do List ===")
     print("1. View Character Stats")
     print("2. Create New Task")
     print("3. View Tasks")
     print("4. Complete Task")
     print("5. Visit Marketplace")
-    print("6. Delete Task")
-    print("7. Settings")
-    print("8. Save and Exit")
-    return input("Choose an option (1-8): ")
+    print("6. Open Inventory")
+    print("7. Delete Task")
+    print("8. Settings")
+    print("9. Save and Exit")
+    if history.undo_label:
+        print(f"u. Undo {history.undo_label}")
+    if history.redo_label:
+        print(f"r. Redo {history.redo_label}")
+    return ask("Choose an option (1-9): ").strip().lower()
+
+# Names menu steps in the metrics and the undo history
+MENU_STEPS = {"1": "stats", "2": "create_task", "3": "view_tasks", "4": "complete_task",
+              "5": "marketplace", "6": "inventory", "7": "delete_task", "8": "settings",
+              "u": "undo", "r": "redo"}
 
 def settings_menu(character, tasks):
     print("\n=== Settings ===")
@@ -23,242 +45,328 @@ def settings_menu(character, tasks):
     print("2. Reset All Data")
     print("3. Back to Main Menu")
     
-    choice = input("Choose an option (1-3): ")
+    choice = ask("Choose an option (1-3): ")
     if choice == "1":
-        new_name = input("Enter new character name: ")
+        new_name = ask("Enter new character name: ")
         if new_name.strip():
-            character._name = new_name.strip()
-            print(f"Character name changed to: {character._name}")
+            character.name = new_name
+            print(f"Character name changed to: {character.name}")
         else:
             print("Name cannot be empty!")
     elif choice == "2":
-        confirm = input("Are you sure you want to reset all data? This cannot be undone! (y/n): ").lower()
+        confirm = ask("Are you sure you want to reset all data? Only Undo can bring it back! (y/n): ").lower()
         if confirm == 'y':
-            new_name = input("Enter new character name: ")
+            new_name = ask("Enter new character name: ")
             if new_name.strip():
-                character._name = new_name.strip() 
-                character._level = 1
-                character._xp = 0
-                character._health = 30
-                character._hunger = 100
-                character._thirst = 100
-                character._infection = 0
-                tasks.clear() 
+                character.name = new_name
+                character.level = 1
+                character.xp = 0
+                character.health = MAX_HEALTH
+                character.hunger = MAX_STAT
+                character.thirst = MAX_STAT
+                character.infection = 0
+                character.inventory = {}
+                tasks.clear_tasks()
                 print("All data has been reset to default values!")
             else:
                 print("Reset cancelled - name cannot be empty!")
         else:
             print("Reset cancelled.")
 
+def roll_over_daily_tasks(character, task_manager):
+    previous_rollover = task_manager.last_rollover
+    _, missed_days = task_manager.roll_over(character)
+    run_schedule(character, task_manager)
+    if task_manager.last_rollover == previous_rollover:
+        return
+    
+    # Reset tasks and the penalties go out with the next save_changes()
+    DataManager.record("state", key="last_rollover", value=task_manager.last_rollover)
+    
+    if missed_days:
+        print(f"\nYou missed {missed_days} daily task(s) since your last visit!")
+        print(f"Lost {missed_days * DailyRollover.MISSED_DAY_HEALTH_PENALTY} health points!")
+
+def run_schedule(character, task_manager):
+    # Penalties, new tasks and the schedule go out with the next save_changes()
+    report = task_manager.run_schedule(character)
+    if report.expired:
+        print(f"\n{len(report.expired)} task(s) passed their deadline!")
+        print(f"Lost {-report.health_change} health points!")
+    if report.created:
+        print(f"\n{len(report.created)} recurring task(s) are due again.")
+
 def view_character_stats(character):
     print(f"\nCharacter Stats:")
     print(f"Name: {character._name}")
     print(f"Level: {character._level}")
     print(f"XP: {character._xp}/{character.calculate_xp_needed()}")
-    print(f"Health: {character._health}/30")
+    print(f"Health: {character._health}/{MAX_HEALTH}")
     print(f"Hunger: {character._hunger}%")
     print(f"Thirst: {character._thirst}%")
     print(f"Infection: {character._infection}%")
-    input("\nPress Enter to continue...")
-
-def create_task(tasks):
-    print("\nCreate New Task")
-    
-    # Task type validation
-    while True:
-        print("Task Types:")
-        print("1. Todo")
-        print("2. Habit")
-        task_type = input("Choose task type (1 or 2): ").strip()
-        if task_type in ["1", "2"]:
-            break
-        print("Error: Invalid task type! Please choose 1 for Todo or 2 for Habit.")
-    
-    # Title validation
-    while True:
-        title = input("Enter task title: ").strip()
-        if title:  # Check if title is not empty
-            break
-        print("Error: Title is required!")
-    
-    description = input("Enter task description (optional): ").strip()
-    
-    if task_type == "1":
-        while True:
-            priority = input("Enter priority (low/medium/high) [default: low]: ").lower().strip()
-            if not priority:  # If empty, set default to low
-                priority = "low"
-            if priority in ["low", "medium", "high"]:
-                break
-            print("Error: Priority must be low, medium, or high!")
-            
-        task = TodoTask(title, description, priority)
-    else:
-        task = DailyTask(title, description)  # Daily tasks are used for habits
-    
-    tasks.append(task)
-    print("Task created successfully!")
-    input("\nPress Enter to continue...")  # Added wait for input
+    print(f"Inventory: {character.carried}/{character.inventory_capacity()} items")
+    ask("\nPress Enter to continue...")
 
 def view_tasks(tasks, wait_for_input=True):
     if not tasks:
         print("\nNo tasks available.")
         if wait_for_input:
-            input("\nPress Enter to continue...")  
+            ask("\nPress Enter to continue...")  
         return
         
-    print("\nCurrent Tasks:")
-    for idx, task in enumerate(tasks):
-        task_type = "Daily" if isinstance(task, DailyTask) else "Todo"
-        priority = f" - Priority: {task._priority}" if isinstance(task, TodoTask) else ""
-        status = "Completed" if task._completed else "Pending"
-        print(f"{idx + 1}. [{task_type}] {task._title}{priority} - {status}")
+    sys.stdout.write("\nCurrent Tasks:\n" + "\n".join(format_task(task) for task in tasks) + "\n")
     if wait_for_input:
-        input("\nPress Enter to continue...")
+        ask("\nPress Enter to continue...")
 
-def complete_task(character, tasks):
-    view_tasks(tasks, wait_for_input=False)
-    if not tasks:
-        return
-        
-    try:
-        task_idx = int(input("\nEnter task number to complete: ")) - 1
-        if 0 <= task_idx < len(tasks):
-            task = tasks[task_idx]
-            
-            success = True  # Initialize success to a default value
-            if isinstance(task, DailyTask):
-                success = input("Was the task successful? (y/n): ").lower() == 'y'
-                status = task.complete(success)
-            else:
-                status = task.complete()
-                
-            if status == "already_completed":
-                print("This task has already been completed!")
-                return
-            
-            reward = task.calculate_reward() if status == "completed" else -5
+def page_through_tasks(renderer, prompt=None):
+    """Show the tasks one page at a time. With a prompt, return the ID the
+    player picked, or None if they went back."""
+    page = 0
+    while True:
+        renderer.show(page)
+        if not len(renderer.task_manager):
+            if prompt is None:
+                ask("\nPress Enter to continue...")
+            return None
             
-            if reward > 0:
-                character._xp += reward
-                print(f"Gained {reward} XP!")
-                if character._xp >= character.calculate_xp_needed():
-                    character.level_up()
-                    print("Level Up!")
+        hint = "n/p: next/previous page, g ID: go to task, Enter: back"
+        choice = ask(f"\n{prompt} ({hint}): " if prompt else f"\n{hint}: ").strip().lower()
+        if not choice:
+            return None
+        elif choice == "n":
+            page = min(page + 1, renderer.page_count() - 1)
+        elif choice == "p":
+            page = max(page - 1, 0)
+        elif choice.startswith("g"):
+            target = renderer.page_of(int(choice[1:])) if choice[1:].strip().isdigit() else None
+            if target is None:
+                print("Task not found!")
             else:
-                character._health += reward
-                print(f"Lost {abs(reward)} health points!")
-                
-            # Reduce stats after task completion
-            character._hunger = max(0, character._hunger - 1)
-            character._thirst = max(0, character._thirst - 1)
-            if not success and isinstance(task, DailyTask):
-                character._infection = min(100, character._infection + 1)
-                
-            # Add waiting menu after task completion
-            print("\nWhat would you like to do next?")
-            print("1. Complete another task")
-            print("2. Return to main menu")
-            while True:
-                choice = input("Choose an option (1-2): ").strip()
-                if choice == "1":
-                    return complete_task(character, tasks)  # Recursive call to complete another task
-                elif choice == "2":
-                    return  # Return to main menu
-                else:
-                    print("Invalid option! Please choose 1 or 2.")
-                    
-    except ValueError:
-        print("Invalid input!")
+                page = target
+        elif prompt is not None and choice.isdigit():
+            return int(choice)
+        else:
+            print("Invalid option!")
+
+PURCHASE_MESSAGES = {
+    "not_enough_xp": "Not enough XP!",
+    "not_hungry": "You're not hungry enough to eat this!",
+    "not_thirsty": "You're not thirsty enough to drink this!",
+    "not_infected": "You don't need medicine right now!",
+    "inventory_full": "Your inventory is full!",
+}
 
 def visit_marketplace(character):
-    items = [
-        Food("Food Ration", 10, 20),
-        Water("Water Bottle", 8, 15),
-        Medicine("Medkit", 15, 25)
-    ]
+    # Imported on first visit, like everything a session may never use
+    from models.consumables import catalog, purchase, store
+    item_ids = list(catalog())
     
     print("\nMarketplace:")
-    for idx, item in enumerate(items):
+    for idx, item_id in enumerate(item_ids):
+        item = catalog()[item_id]
         print(f"{idx + 1}. {item._name} - Cost: {item._cost} XP")
     
     try:
-        choice = int(input("Choose item to buy (0 to exit): ")) - 1
-        if 0 <= choice < len(items):
-            item = items[choice]
-            if character._xp >= item._cost:
-                # Check if using the item would exceed maximum stats
-                if isinstance(item, Food) and character._hunger + item._effect_value > 100:
-                    print("You're not hungry enough to eat this!")
-                elif isinstance(item, Water) and character._thirst + item._effect_value > 100:
-                    print("You're not thirsty enough to drink this!")
-                elif isinstance(item, Medicine) and character._infection - item._effect_value < 0:
-                    print("You don't need medicine right now!")
-                else:
-                    character._xp -= item._cost
-                    item.use(character)
-                    print(f"Used {item._name} successfully!")
+        choice = int(ask("Choose item to buy (0 to exit): ")) - 1
+        if 0 <= choice < len(item_ids):
+            quantity = ask("How many? [default: 1]: ").strip()
+            quantity = int(quantity) if quantity else 1
+            keep = ask("Use now or store in your inventory? (u/s) [default: u]: ").strip().lower() == "s"
+            item = catalog()[item_ids[choice]]
+            if keep:
+                result = store(character, item_ids[choice], quantity)
             else:
-                print("Not enough XP!")
+                result = purchase(character, item_ids[choice], quantity)
+            if result.status == "used":
+                print(f"Used {result.quantity} x {item._name} for {result.cost} XP!")
+            elif result.status == "stored":
+                print(f"Stored {result.quantity} x {item._name} for {result.cost} XP!")
+            else:
+                print(PURCHASE_MESSAGES.get(result.status, "Invalid quantity!"))
     except ValueError:
         print("Invalid input!")
 
+def open_inventory(character):
+    from models.consumables import catalog, use_many
+    held = [item_id for item_id in catalog() if item_id in character.inventory]
+    
+    print(f"\nInventory ({character.carried}/{character.inventory_capacity()} items):")
+    if not held:
+        print("Your inventory is empty.")
+        return
+    for idx, item_id in enumerate(held):
+        print(f"{idx + 1}. {catalog()[item_id]._name} x {character.inventory[item_id]}")
+    
+    try:
+        choice = int(ask("Choose item to use (0 to exit): ")) - 1
+        if 0 <= choice < len(held):
+            quantity = ask("How many? [default: 1]: ").strip()
+            result = use_many(character, held[choice], int(quantity) if quantity else 1)
+            if result.status == "used":
+                print(f"Used {result.quantity} x {catalog()[held[choice]]._name}!")
+            else:
+                print(PURCHASE_MESSAGES.get(result.status, "Invalid quantity!"))
+    except ValueError:
+        print("Invalid input!")
+
+def load_game(snapshots):
+    """Character and TaskManager from the snapshot of the last session if
+    the save has not changed since, otherwise from the save itself; None
+    if there is no save yet."""
+    cached = snapshots.load()
+    if cached is not None:
+        return cached
+    
+    game_state = DataManager.load_game_state()
+    if not game_state:
+        return None
+    character = DataManager.deserialize_character(game_state["character"])
+    state = game_state.get("state", {})
+    task_manager = TaskManager()
+    task_manager.load_tasks(game_state["tasks"], state.get("last_rollover"), state.get("schedule"))
+    # Every task is copied now, so the binary engine can unmap its save
+    DataManager.storage.close()
+    return character, task_manager
+
+def open_storage():
+    """Another backend once a save has been converted to it, else None.
+    Each engine is only imported when its save (its DEFAULT_FILE) exists,
+    so the JSON default never loads sqlite3 or the binary format."""
+    if os.path.exists("gamestate.db"):
+        from utils.sqlite_storage import SqliteStorage
+        return SqliteStorage()
+    if os.path.exists("gamestate.bin"):
+        from utils.binary_format import BinaryStorage
+        return BinaryStorage()
+    return None
+
 def main():
+    # Subsystems used once a game is running, not by importers of main
+    from utils.event_log import CompletionLog
+    from utils.snapshot_cache import SnapshotCache
+    from utils.undo_history import UndoHistory, history_file
+    # Held while the game state is being changed, so the background saver
+    # never serializes a half-applied action
+    state_lock = threading.Lock()
+    task_manager = saver = None
+    clean_exit = False
     try:
+        storage = open_storage()
+        if storage is not None:
+            DataManager.use_storage(storage)
+
         # Load game state or create new character
-        game_state = DataManager.load_game_state()
-        task_manager = TaskManager()
-        
-        if game_state:
-            # Initialize character and tasks from saved state
-            character = Survivor(game_state["character"]["_name"])
-            # Load all character stats from game_state
-            character._level = game_state["character"]["_level"]
-            character._xp = game_state["character"]["_xp"]
-            character._health = game_state["character"]["_health"]
-            character._hunger = game_state["character"]["_hunger"]
-            character._thirst = game_state["character"]["_thirst"]
-            character._infection = game_state["character"]["_infection"]
-            
-            # Load tasks from game_state
-            task_manager.load_tasks(game_state["tasks"])
+        snapshots = SnapshotCache(DataManager.storage)
+        loaded = load_game(snapshots)
+        if loaded:
+            character, task_manager = loaded
         else:
-            name = input("Enter your character name: ")
+            name = ask("Enter your character name: ")
             character = Survivor(name)
+            task_manager = TaskManager()
+            DataManager.record("character", character=DataManager.serialize_character(character))
+        task_manager.event_log = CompletionLog()
+        history = UndoHistory(task_manager, character)
+        undo_file = history_file(DataManager.storage)
+        if undo_file is not None:
+            history.load(undo_file)
         
+        # Engines without a journal get autosaved after every action
+        if not DataManager.storage.journaled:
+            from utils.background_saver import BackgroundSaver
+            def save():
+                with state_lock:
+                    game_state = DataManager.serialize_game_state(
+                        character, task_manager.get_tasks(), task_manager.state())
+                DataManager.storage.save_serialized(game_state)
+            saver = BackgroundSaver(save)
+        
+        renderer = TaskRenderer(task_manager)
+        with state_lock:
+            roll_over_daily_tasks(character, task_manager)
+            DataManager.save_changes(character, task_manager)
+        if saver is not None:
+            saver.mark_dirty()
         while True:
-            choice = display_menu()
-            
-            if choice == "1":
-                view_character_stats(character)
-            elif choice == "2":
-                create_task(task_manager)
-            elif choice == "3":
-                view_tasks(task_manager.get_tasks())
-            elif choice == "4":
-                complete_task(character, task_manager)
-            elif choice == "5":
-                visit_marketplace(character)
-            elif choice == "6":
-                delete_task(task_manager)
-            elif choice == "7":
-                settings_menu(character, task_manager)
-            elif choice == "8":
+            choice = display_menu(history)
+            if choice == "9":
                 break
-            else:
-                print("Invalid option!")
-                
+            
+            with state_lock, metrics.timer(f"menu.{MENU_STEPS.get(choice, 'invalid')}"):
+                if choice == "1":
+                    view_character_stats(character)
+                elif choice == "2":
+                    create_task(task_manager)
+                elif choice == "3":
+                    page_through_tasks(renderer)
+                elif choice == "4":
+                    complete_task(character, task_manager, renderer)
+                elif choice == "5":
+                    visit_marketplace(character)
+                elif choice == "6":
+                    open_inventory(character)
+                elif choice == "7":
+                    delete_task(task_manager, renderer)
+                elif choice == "8":
+                    settings_menu(character, task_manager)
+                elif choice in ("u", "r"):
+                    label = history.undo() if choice == "u" else history.redo()
+                    print(f"{'Undid' if choice == 'u' else 'Redid'}: {label}" if label else "Nothing to do!")
+                else:
+                    print("Invalid option!")
+                    
+                roll_over_daily_tasks(character, task_manager)
+                # No-op unless the action changed something
+                history.commit(MENU_STEPS.get(choice, "invalid").replace("_", " "))
+                # Only the fields the action changed are written
+                DataManager.save_changes(character, task_manager)
+            if saver is not None:
+                if saver.error is not None:
+                    print(f"Autosave failed: {saver.error}")
+                saver.mark_dirty()
+            
             # Check for game over condition
             if character._health <= 0:
                 print("Game Over! Your character has died.")
                 break
+        clean_exit = True
                 
     except Exception as e:
         print(f"An error occurred: {str(e)}")
     finally:
-        # Save game state before exit
-        DataManager.save_game_state(character, task_manager.get_tasks())
-        print("Game saved. Goodbye!")
+        if task_manager is None:
+            # Loading failed before there was a game to save
+            DataManager.close()
+        else:
+            # Save game state before exit; in journaled mode every change is
+            # already on disk, so only a running compaction needs to finish
+            if task_manager.event_log is not None:
+                task_manager.event_log.close()
+            saved = False
+            if saver is not None:
+                try:
+                    saver.close()
+                    saved = True
+                except Exception as e:
+                    # Write directly instead, below
+                    print(f"Autosave failed: {e}")
+            try:
+                if saved:
+                    pass
+                elif DataManager.storage.journaled:
+                    DataManager.close()
+                else:
+                    DataManager.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+                saved = True
+            except Exception as e:
+                print(f"Saving failed: {e}")
+            # Only a clean exit leaves the save matching the state in memory
+            if clean_exit and saved:
+                snapshots.save(character, task_manager)
+                if undo_file is not None:
+                    history.save(undo_file)
+            print("Game saved. Goodbye!" if saved else "The game could not be saved!")
 
 def create_task(task_manager):
     print("\nCreate New Task")
@@ -268,105 +376,107 @@ def create_task(task_manager):
         print("Task Types:")
         print("1. Todo")
         print("2. Habit")
-        task_type = input("Choose task type (1 or 2): ").strip()
+        task_type = ask("Choose task type (1 or 2): ").strip()
         if task_type in ["1", "2"]:
             break
         print("Error: Invalid task type! Please choose 1 for Todo or 2 for Habit.")
     
-    title = input("Enter task title: ").strip()
-    description = input("Enter task description (optional): ").strip()
+    title = ask("Enter task title: ").strip()
+    description = ask("Enter task description (optional): ").strip()
     
     if task_type == "1":
         while True:
-            priority = input("Enter priority (low/medium/high) [default: low]: ").lower().strip()
+            priority = ask("Enter priority (low/medium/high) [default: low]: ").lower().strip()
             if not priority:
                 priority = "low"
             if priority in ["low", "medium", "high"]:
                 break
             print("Error: Priority must be low, medium, or high!")
-            
-        if task_manager.create_task("todo", title, description, priority):
-            print("Task created successfully!")
+        
+        every_days = ask_days("Repeat every how many days? (1 = daily, 7 = weekly) [default: never]: ", 1)
+        if every_days is not None:
+            # Each repetition is due before the next one appears
+            task_id = task_manager.add_recurring_task(title, description, priority, every_days)
         else:
-            print("Failed to create task: Title is required!")
+            task_id = task_manager.create_task("todo", title, description, priority)
+            due_in = ask_days("Due in how many days? (0 = today) [default: no deadline]: ", 0)
+            if task_id is not None and due_in is not None:
+                task_manager.set_deadline(task_id, date.fromordinal(date.today().toordinal() + due_in))
     else:
-        if task_manager.create_task("daily", title, description):
-            print("Task created successfully!")
-        else:
-            print("Failed to create task: Title is required!")
+        task_id = task_manager.create_task("daily", title, description)
+
+    if task_id is not None:
+        print("Task created successfully!")
+    else:
+        print("Failed to create task: Title is required!")
     
-    input("\nPress Enter to continue...")
+    ask("\nPress Enter to continue...")
 
-def complete_task(character, task_manager):
-    tasks = task_manager.get_tasks()
-    view_tasks(tasks, wait_for_input=False)
-    if not tasks:
-        return
-        
-    try:
-        task_idx = int(input("\nEnter task number to complete: ")) - 1
-        if 0 <= task_idx < len(tasks):
-            task = tasks[task_idx]
-            
-            success = True
-            if isinstance(task, DailyTask):
-                success = input("Was the task successful? (y/n): ").lower() == 'y'
-            
-            status, reward = task_manager.complete_task(task_idx, character, success)
-            
-            if status == "already_completed":
-                print("This task has already been completed!")
-                return
-            elif status == "invalid_index":
-                print("Invalid task number!")
-                return
-            
-            if reward > 0:
-                character._xp += reward
-                print(f"Gained {reward} XP!")
-                if character._xp >= character.calculate_xp_needed():
-                    character.level_up()
-                    print("Level Up!")
-            else:
-                character._health += reward
-                print(f"Lost {abs(reward)} health points!")
-            
-            # Reduce stats after task completion
-            character._hunger = max(0, character._hunger - 1)
-            character._thirst = max(0, character._thirst - 1)
-            if not success and isinstance(task, DailyTask):
-                character._infection = min(100, character._infection + 1)
-            
-            # Add waiting menu after task completion
-            print("\nWhat would you like to do next?")
-            print("1. Complete another task")
-            print("2. Return to main menu")
-            while True:
-                choice = input("Choose an option (1-2): ").strip()
-                if choice == "1":
-                    return complete_task(character, task_manager)
-                elif choice == "2":
-                    return
-                else:
-                    print("Invalid option! Please choose 1 or 2.")
-                    
-    except ValueError:
-        print("Invalid input!")
+def ask_days(prompt, minimum):
+    while True:
+        days = ask(prompt).strip()
+        if not days:
+            return None
+        if days.isdigit() and int(days) >= minimum:
+            return int(days)
+        print(f"Error: Enter a whole number of days, at least {minimum}!")
 
-def delete_task(task_manager):
-    tasks = task_manager.get_tasks()
-    view_tasks(tasks, wait_for_input=False)
-    if not tasks:
-        return
+def complete_task(character, task_manager, renderer):
+    # Loop instead of recursing, so completing many tasks in a row can't
+    # hit the recursion limit
+    while True:
+        task_id = page_through_tasks(renderer, "Enter task ID to complete")
+        if task_id is None:
+            return
+        task = task_manager.get_task(task_id)
+        if task is None:
+            print("Invalid task ID!")
+            return
         
-    try:
-        task_idx = int(input("\nEnter task number to delete: ")) - 1
-        if task_manager.delete_task(task_idx):
-            print("Task deleted successfully!")
+        success = True
+        if isinstance(task, DailyTask):
+            success = ask("Was the task successful? (y/n): ").lower() == 'y'
+        
+        report = task_manager.complete_many([task.id], character, [success])
+        result = report.results[0]
+        
+        if result.status == "already_completed":
+            print("This task has already been completed!")
+            return
+        
+        if result.reward > 0:
+            print(f"Gained {result.reward} XP!")
+            if report.levels_gained:
+                print("Level Up!")
         else:
-            print("Invalid task number!")
-    except ValueError:
-        print("Invalid input!")
+            print(f"Lost {abs(result.reward)} health points!")
+        
+        # Add waiting menu after task completion
+        print("\nWhat would you like to do next?")
+        print("1. Complete another task")
+        print("2. Return to main menu")
+        while True:
+            choice = ask("Choose an option (1-2): ").strip()
+            if choice in ("1", "2"):
+                break
+            print("Invalid option! Please choose 1 or 2.")
+        if choice == "2":
+            return
+
+def delete_task(task_manager, renderer):
+    task_id = page_through_tasks(renderer, "Enter task ID to delete")
+    if task_id is None:
+        return
+    if task_manager.delete_task(task_id):
+        print("Task deleted successfully!")
+    else:
+        print("Invalid task ID!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Post-Apocalyptic RPG To-Do List")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write call counts, latencies and save sizes on exit (.json, otherwise Prometheus text)")
+    parser.add_argument("--profile", metavar="FILE", help="run cProfile for the session and write its stats here")
+    args = parser.parse_args()
+    with metrics.session(args.metrics, args.profile):
+        main()
\ No newline at end of file
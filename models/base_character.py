@@ -1,14 +1,21 @@
 from abc import ABC, abstractmethod
+from models.rules import MAX_HEALTH, MAX_STAT
 
 class BaseCharacter(ABC):
-    def __init__(self, name, level=1, xp=0, health=30):
+    __slots__ = ("_name", "_level", "_xp", "_health", "_hunger", "_thirst", "_infection", "_inventory",
+                 "_dirty_fields", "_tracker")
+
+    def __init__(self, name, level=1, xp=0, health=MAX_HEALTH):
         self._name = name
         self._level = max(1, level)
         self._xp = max(0, xp)
-        self._health = min(max(0, health), 30)
-        self._hunger = 100
-        self._thirst = 100
+        self._health = min(max(0, health), MAX_HEALTH)
+        self._hunger = MAX_STAT
+        self._thirst = MAX_STAT
         self._infection = 0
+        self._inventory = {}  # Item ID -> units held; replaced on change, never edited in place
+        self._dirty_fields = None  # Set of changed fields, created on first change
+        self._tracker = None  # Called as tracker(character, field, old value) after every tracked change
         
     @abstractmethod
     def calculate_xp_needed(self):
@@ -46,24 +53,87 @@ class BaseCharacter(ABC):
     @property
     def infection(self):
         return self._infection
+        
+    @property
+    def inventory(self):
+        return self._inventory
+        
+    @property
+    def carried(self):
+        return sum(self._inventory.values())
     
     # Setters with validation
+    @name.setter
+    def name(self, value):
+        if not value or not value.strip():
+            raise ValueError("Name must be a non-empty string")
+        old = self._name
+        self._name = value.strip()
+        self._mark_dirty("_name", old)
+        
+    @level.setter
+    def level(self, value):
+        old = self._level
+        self._level = max(1, value)
+        self._mark_dirty("_level", old)
+        
     @xp.setter
     def xp(self, value):
+        old = self._xp
         self._xp = max(0, value)
+        self._mark_dirty("_xp", old)
         
     @health.setter
     def health(self, value):
-        self._health = min(max(0, value), 30)
+        old = self._health
+        self._health = min(max(0, value), MAX_HEALTH)
+        self._mark_dirty("_health", old)
         
     @hunger.setter
     def hunger(self, value):
-        self._hunger = min(max(0, value), 100)
+        old = self._hunger
+        self._hunger = min(max(0, value), MAX_STAT)
+        self._mark_dirty("_hunger", old)
         
     @thirst.setter
     def thirst(self, value):
-        self._thirst = min(max(0, value), 100)
+        old = self._thirst
+        self._thirst = min(max(0, value), MAX_STAT)
+        self._mark_dirty("_thirst", old)
         
     @infection.setter
     def infection(self, value):
-        self._infection = min(max(0, value), 100)
\ No newline at end of file
+        old = self._infection
+        self._infection = min(max(0, value), MAX_STAT)
+        self._mark_dirty("_infection", old)
+        
+    @inventory.setter
+    def inventory(self, counts):
+        old = self._inventory
+        self._inventory = {item_id: count for item_id, count in counts.items() if count > 0}
+        self._mark_dirty("_inventory", old)
+        
+    def change_items(self, item_id, delta):
+        """Add units of an item, or remove them with a negative delta."""
+        self.inventory = {**self._inventory, item_id: self._inventory.get(item_id, 0) + delta}
+    
+    # Change tracking
+    @property
+    def dirty_fields(self):
+        return set(self._dirty_fields or ())
+        
+    def clear_dirty(self):
+        self._dirty_fields = None
+        
+    def __getstate__(self):
+        # Trackers belong to whoever is watching this session, not to
+        # pickled snapshots
+        state, slots = super().__getstate__()
+        return state, {**slots, "_tracker": None}
+        
+    def _mark_dirty(self, field, old):
+        if self._dirty_fields is None:
+            self._dirty_fields = set()
+        self._dirty_fields.add(field)
+        if self._tracker is not None:
+            self._tracker(self, field, old)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
 class BaseItem(ABC):
+    __slots__ = ("_name", "_cost", "_effect_value")
+
     def __init__(self, name, cost, effect_value):
         if not name or not isinstance(name, str):
             raise ValueError("Name must be a non-empty string")
@@ -24,5 +26,5 @@ class BaseItem(ABC):
         return self._effect_value
         
     @abstractmethod
-    def use(self, character):
+    def use(self, character, quantity=1):
         pass
\ No newline at end of file
@@ -1,13 +1,22 @@
 from abc import ABC, abstractmethod
 
 class BaseTask(ABC):
+    __slots__ = ("_id", "_title", "_description", "_completed", "_dirty_fields", "_tracker")
+
     def __init__(self, title, description=""):  # Set default empty string for description
         if not title or not isinstance(title, str):
             raise ValueError("Title must be a non-empty string")
             
+        self._id = None  # Assigned by TaskManager
         self._title = title.strip()
         self._description = description if description else ""
         self._completed = False
+        self._dirty_fields = None  # Set of changed fields, created on first change
+        self._tracker = None  # Called as tracker(task, field, old value) after every tracked change
+        
+    @property
+    def id(self):
+        return self._id
         
     @property
     def title(self):
@@ -21,11 +30,42 @@ class BaseTask(ABC):
     def completed(self):
         return self._completed
         
+    @title.setter
+    def title(self, value):
+        if not value or not isinstance(value, str):
+            raise ValueError("Title must be a non-empty string")
+        old = self._title
+        self._title = value.strip()
+        self._mark_dirty("_title", old)
+        
+    @description.setter
+    def description(self, value):
+        old = self._description
+        self._description = value if value else ""
+        self._mark_dirty("_description", old)
+        
     @completed.setter
     def completed(self, value):
         if not isinstance(value, bool):
             raise ValueError("Completed status must be a boolean")
+        old = self._completed
         self._completed = value
+        self._mark_dirty("_completed", old)
+        
+    # Change tracking
+    @property
+    def dirty_fields(self):
+        return set(self._dirty_fields or ())
+        
+    def clear_dirty(self):
+        self._dirty_fields = None
+        
+    def _mark_dirty(self, field, old):
+        if self._dirty_fields is None:
+            self._dirty_fields = set()
+        self._dirty_fields.add(field)
+        if self._tracker is not None:
+            self._tracker(self, field, old)
         
     @abstractmethod
     def complete(self):
@@ -33,4 +73,4 @@ class BaseTask(ABC):
         
     @abstractmethod
     def calculate_reward(self):
-        pass
\ No newline at end of file
+        pass
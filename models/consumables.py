@@ -1,13 +1,148 @@
+import json
+import os
+from typing import Dict, NamedTuple
 from models.base_item import BaseItem
+from models.rules import MAX_STAT
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "marketplace.json")
 
 class Food(BaseItem):
-    def use(self, character):
-        character._hunger += self._effect_value
+    __slots__ = ()
+
+    def use(self, character, quantity=1):
+        character.hunger += self._effect_value * quantity
 
 class Water(BaseItem):
-    def use(self, character):
-        character._thirst += self._effect_value
+    __slots__ = ()
+
+    def use(self, character, quantity=1):
+        character.thirst += self._effect_value * quantity
 
 class Medicine(BaseItem):
-    def use(self, character):
-        character._infection -= self._effect_value
\ No newline at end of file
+    __slots__ = ()
+
+    def use(self, character, quantity=1):
+        character.infection -= self._effect_value * quantity
+
+# Item type in the catalog file -> class
+ITEM_TYPES = {"food": Food, "water": Water, "medicine": Medicine}
+
+# Per item class: how far the stat it affects can move before it hits
+# its limit, and the status returned when there is no room at all
+HEADROOM = {
+    Food: (lambda character: MAX_STAT - character._hunger, "not_hungry"),
+    Water: (lambda character: MAX_STAT - character._thirst, "not_thirsty"),
+    Medicine: (lambda character: character._infection, "not_infected"),
+}
+
+class PurchaseResult(NamedTuple):
+    status: str
+    quantity: int
+    cost: int
+
+class UseResult(NamedTuple):
+    status: str
+    quantity: int
+
+_catalog = None
+
+def load_catalog(path=CATALOG_FILE) -> Dict[str, BaseItem]:
+    """Read the item catalog and make it the shared one. Items are only
+    read, never changed, so every caller gets the same instances."""
+    global _catalog
+    with open(path, "r") as f:
+        entries = json.load(f)
+    _catalog = {entry["id"]: ITEM_TYPES[entry["type"]](entry["name"], entry["cost"], entry["effect"])
+                for entry in entries}
+    return _catalog
+
+def catalog() -> Dict[str, BaseItem]:
+    return _catalog if _catalog is not None else load_catalog()
+
+def purchase(character, item_id, quantity=1) -> PurchaseResult:
+    """Buy up to quantity units of an item with XP and use them right away.
+
+    The quantity is cut down to what the character can afford and to the
+    units that still fit under the stat limit; the status is "used" if at
+    least one unit was bought, otherwise the reason nothing was.
+    """
+    item = catalog().get(item_id)
+    if item is None:
+        return PurchaseResult("unknown_item", 0, 0)
+    if quantity < 1:
+        return PurchaseResult("invalid_quantity", 0, 0)
+
+    useful, refusal = _useful_units(character, item, quantity)
+    affordable = _affordable_units(character, item, quantity)
+    if affordable < 1:
+        return PurchaseResult("not_enough_xp", 0, 0)
+    if useful < 1:
+        return PurchaseResult(refusal, 0, 0)
+
+    quantity = min(quantity, affordable, useful)
+    cost = item._cost * quantity
+    character.xp -= cost
+    item.use(character, quantity)
+    return PurchaseResult("used", quantity, cost)
+
+def store(character, item_id, quantity=1) -> PurchaseResult:
+    """Buy up to quantity units of an item with XP and put them in the
+    character's inventory.
+
+    The quantity is cut down to what the character can afford and to the
+    free room under their level's capacity; the status is "stored" if at
+    least one unit was bought, otherwise the reason nothing was.
+    """
+    item = catalog().get(item_id)
+    if item is None:
+        return PurchaseResult("unknown_item", 0, 0)
+    if quantity < 1:
+        return PurchaseResult("invalid_quantity", 0, 0)
+
+    affordable = _affordable_units(character, item, quantity)
+    room = character.inventory_capacity() - character.carried
+    if affordable < 1:
+        return PurchaseResult("not_enough_xp", 0, 0)
+    if room < 1:
+        return PurchaseResult("inventory_full", 0, 0)
+
+    quantity = min(quantity, affordable, room)
+    cost = item._cost * quantity
+    character.xp -= cost
+    character.change_items(item_id, quantity)
+    return PurchaseResult("stored", quantity, cost)
+
+def use_many(character, item_id, quantity=1) -> UseResult:
+    """Use up to quantity units of an item from the inventory at once.
+
+    The quantity is cut down to the units held and to those that still
+    fit under the stat limit, then the effect of all of them is applied
+    in one change of the stat.
+    """
+    item = catalog().get(item_id)
+    if item is None:
+        return UseResult("unknown_item", 0)
+    if quantity < 1:
+        return UseResult("invalid_quantity", 0)
+
+    held = character.inventory.get(item_id, 0)
+    useful, refusal = _useful_units(character, item, quantity)
+    if held < 1:
+        return UseResult("not_in_inventory", 0)
+    if useful < 1:
+        return UseResult(refusal, 0)
+
+    quantity = min(quantity, held, useful)
+    character.change_items(item_id, -quantity)
+    item.use(character, quantity)
+    return UseResult("used", quantity)
+
+def _affordable_units(character, item, quantity):
+    return character._xp // item._cost if item._cost else quantity
+
+def _useful_units(character, item, quantity):
+    """Units that still fit under the stat limit, and the status to
+    report when none do."""
+    headroom, refusal = HEADROOM[type(item)]
+    useful = headroom(character) // item._effect_value if item._effect_value else quantity
+    return useful, refusal
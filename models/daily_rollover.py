@@ -0,0 +1,105 @@
+import heapq
+from datetime import date
+from typing import Dict, List, Optional, Set
+from models.daily_task import DailyTask
+from models.rules import DAILY_FAILURE_REWARD, INFECTION_PER_FAILURE
+
+class DailyRollover:
+    """Resets daily tasks at day boundaries without scanning every task.
+
+    Each daily task sits in a bucket keyed by the day ordinal since which
+    it has been pending: the day after its last completion, or the day of
+    the last rollover for tasks that were not completed. Rolling over to
+    a new day only touches the buckets at or before today, so catching up
+    after N offline days costs O(affected tasks), not O(tasks x days).
+    """
+    # Same penalty as failing a daily task, applied per missed task-day
+    MISSED_DAY_HEALTH_PENALTY = -DAILY_FAILURE_REWARD
+    MISSED_DAY_INFECTION = INFECTION_PER_FAILURE
+
+    def __init__(self, last_rollover: Optional[str] = None):
+        self._last_rollover = _to_ordinal(last_rollover)
+        self._buckets: Dict[int, Set[int]] = {}
+        self._bucket_days: List[int] = []  # Min-heap of bucket keys
+        self._pending_since: Dict[int, int] = {}
+
+    @property
+    def last_rollover(self) -> Optional[str]:
+        if self._last_rollover is None:
+            return None
+        return date.fromordinal(self._last_rollover).strftime("%Y-%m-%d")
+
+    def track(self, task: DailyTask, new: bool = False, today: Optional[date] = None) -> None:
+        today = (today or date.today()).toordinal()
+        completed_on = _to_ordinal(task.last_completion_date)
+
+        if new:
+            pending_since = today
+        elif task._completed and completed_on is not None:
+            pending_since = completed_on + 1
+            if self._last_rollover is None:
+                # Without a recorded rollover there is no way to know what
+                # was missed, so older saves are not penalised retroactively
+                pending_since = max(pending_since, today)
+        elif self._last_rollover is not None:
+            pending_since = min(self._last_rollover, today)
+        else:
+            pending_since = today
+        self._move(task._id, pending_since)
+
+    def untrack(self, task_id: int) -> None:
+        pending_since = self._pending_since.pop(task_id, None)
+        bucket = self._buckets.get(pending_since)
+        if bucket is not None:
+            bucket.discard(task_id)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._bucket_days.clear()
+        self._pending_since.clear()
+
+    def mark_completed(self, task: DailyTask) -> None:
+        self._move(task._id, _to_ordinal(task.last_completion_date) + 1)
+
+    def roll_over(self, tasks: Dict[int, DailyTask], today: Optional[date] = None) -> tuple[List[DailyTask], int]:
+        """Reset every daily task that is due again today and count the
+        task-days that were missed since its last completion.
+
+        Returns the tasks that changed and the total missed days.
+        """
+        today = (today or date.today()).toordinal()
+        if self._last_rollover is not None and today <= self._last_rollover:
+            return [], 0
+
+        changed = []
+        missed_days = 0
+        due_ids = []
+        while self._bucket_days and self._bucket_days[0] <= today:
+            pending_since = heapq.heappop(self._bucket_days)
+            for task_id in self._buckets.pop(pending_since, ()):
+                missed_days += today - pending_since
+                due_ids.append(task_id)
+
+        for task_id in due_ids:
+            task = tasks[task_id]
+            if task._completed:
+                task.completed = False
+                changed.append(task)
+            self._move(task_id, today)
+
+        self._last_rollover = today
+        return changed, missed_days
+
+    def _move(self, task_id: int, pending_since: int) -> None:
+        self.untrack(task_id)
+        bucket = self._buckets.get(pending_since)
+        if bucket is None:
+            bucket = self._buckets[pending_since] = set()
+            heapq.heappush(self._bucket_days, pending_since)
+        bucket.add(task_id)
+        self._pending_since[task_id] = pending_since
+
+def _to_ordinal(date_str):
+    if not date_str:
+        return None
+    return date.fromisoformat(date_str).toordinal()
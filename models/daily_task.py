@@ -1,18 +1,100 @@
 from models.base_task import BaseTask
+from models.rules import DAILY_SUCCESS_REWARD, DAILY_FAILURE_REWARD, streak_bonus
 from datetime import datetime, date
 
+# Days of success/failure history kept per task, one bit per day; 63 so
+# the bitset fits a signed 64-bit integer in every save format
+HISTORY_DAYS = 63
+HISTORY_MASK = (1 << HISTORY_DAYS) - 1
+
 class DailyTask(BaseTask):
+    __slots__ = ("_last_completion_date", "_was_successful", "_streak", "_best_streak", "_history")
+
     def __init__(self, title, description=""):
-        self._title = title
-        self._description = description
-        self._completed = False
-        self.last_completion_date = None
-        self.was_successful = None  
+        super().__init__(title, description)
+        self._last_completion_date = None
+        self._was_successful = None
+        self._streak = 0
+        self._best_streak = 0
+        # Bit n is set if the task succeeded n days before last_completion_date
+        self._history = 0
+        
+    @property
+    def last_completion_date(self):
+        return self._last_completion_date
+        
+    @last_completion_date.setter
+    def last_completion_date(self, value):
+        old = self._last_completion_date
+        self._last_completion_date = value
+        self._mark_dirty("last_completion_date", old)
+        
+    @property
+    def was_successful(self):
+        return self._was_successful
+        
+    @was_successful.setter
+    def was_successful(self, value):
+        old = self._was_successful
+        self._was_successful = value
+        self._mark_dirty("was_successful", old)
+        
+    @property
+    def streak(self):
+        return self._streak
+        
+    @streak.setter
+    def streak(self, value):
+        old = self._streak
+        self._streak = value
+        self._mark_dirty("streak", old)
+        
+    @property
+    def best_streak(self):
+        return self._best_streak
+        
+    @best_streak.setter
+    def best_streak(self, value):
+        old = self._best_streak
+        self._best_streak = value
+        self._mark_dirty("best_streak", old)
+        
+    @property
+    def history(self):
+        return self._history
+        
+    @history.setter
+    def history(self, value):
+        old = self._history
+        self._history = value & HISTORY_MASK
+        self._mark_dirty("history", old)
         
     def complete(self, success=True):
         if self._completed:
             return "already_completed"
-        self._completed = True
+        today = date.today()
+        # A last completion dated after today (the clock went back, or an
+        # imported or edited save) counts as today, keeping the streak
+        gap = max(self._days_since_completion(today), 0)
+        
+        # Consecutive successful days extend the streak, anything else
+        # starts it over
+        if not success:
+            streak = 0
+        elif gap == 1:
+            streak = self.streak + 1
+        elif gap == 0:
+            streak = max(self.streak, 1)
+        else:
+            streak = 1
+        # Today's bit reflects the latest outcome, e.g. a failure after a
+        # success on the same day
+        self.history = ((self.history << min(gap, HISTORY_DAYS)) & ~1) | int(success)
+        self.streak = streak
+        if streak > self.best_streak:
+            self.best_streak = streak
+        
+        self.completed = True
         self.was_successful = success  
         self.last_completion_date = datetime.now().strftime("%Y-%m-%d")
         return "completed"
@@ -20,16 +102,35 @@ class DailyTask(BaseTask):
     def calculate_reward(self):
         if not self._completed:
             return 0
-        return 10 if self.was_successful else -5  
+        if not self.was_successful:
+            return DAILY_FAILURE_REWARD
+        return DAILY_SUCCESS_REWARD + streak_bonus(self.streak)
         
-    def _last_completion_date(self):
-        return self._last_completion_date
+    def current_streak(self, today=None):
+        # A streak survives until a whole day passes without a completion
+        return self.streak if self._days_since_completion(today or date.today()) <= 1 else 0
+        
+    def successes_in_window(self, days, today=None):
+        """Successful days among the last `days` days, ending today."""
+        if not self.last_completion_date:
+            return 0
+        # Bit n is the day n days before the last completion
+        offset = self._days_since_completion(today or date.today())
+        low, high = max(0, -offset), min(days - offset, HISTORY_DAYS)
+        if high <= low:
+            return 0
+        return (self.history >> low & ((1 << (high - low)) - 1)).bit_count()
         
-    def _completed(self):
-        return self._completed
+    def succeeded_on(self, day):
+        offset = -self._days_since_completion(day)
+        if not self.last_completion_date or not 0 <= offset < HISTORY_DAYS:
+            return False
+        return bool(self.history >> offset & 1)
         
-    def _description(self):
-        return self._description
+    def perfect_week(self, today=None):
+        return self.successes_in_window(7, today) == 7
         
-    def _title(self):
-        return self._title
\ No newline at end of file
+    def _days_since_completion(self, day):
+        if not self.last_completion_date:
+            return HISTORY_DAYS
+        return (day - date.fromisoformat(self.last_completion_date)).days
@@ -0,0 +1,52 @@
+# Reward and survival rules shared by the game and anything that needs
+# to reproduce its balance (batch completions, rollovers, simulations).
+
+# Stat limits; hunger, thirst and infection all range from 0 to MAX_STAT
+MAX_HEALTH = 30
+MAX_STAT = 100
+
+TODO_REWARDS = {"low": 3, "medium": 5, "high": 7}
+
+DAILY_SUCCESS_REWARD = 10
+DAILY_FAILURE_REWARD = -5
+
+# Applied to the character for every todo whose deadline passes before
+# it is completed, plus INFECTION_PER_FAILURE, like a failed daily
+DEADLINE_MISSED_PENALTY = DAILY_FAILURE_REWARD
+
+# Applied to the character once per completed task
+HUNGER_DECAY_PER_COMPLETION = 1
+THIRST_DECAY_PER_COMPLETION = 1
+INFECTION_PER_FAILURE = 1
+
+# XP needed to level up from level L is XP_BASE + (L - 1) * XP_PER_LEVEL.
+# XP is a balance that is spent at the marketplace, not consumed by
+# levelling, so reaching a level only needs the current XP to cover the
+# threshold of every level before it.
+XP_BASE = 50
+XP_PER_LEVEL = 10
+
+def xp_needed(level):
+    return XP_BASE + (level - 1) * XP_PER_LEVEL
+
+def level_for_xp(xp):
+    """Highest level an XP balance qualifies for, in O(1)."""
+    if xp < XP_BASE:
+        return 1
+    return (xp - XP_BASE) // XP_PER_LEVEL + 2
+
+# Units of marketplace items a character can carry at level L is
+# INVENTORY_BASE + (L - 1) * INVENTORY_PER_LEVEL
+INVENTORY_BASE = 10
+INVENTORY_PER_LEVEL = 5
+
+def inventory_capacity(level):
+    return INVENTORY_BASE + (level - 1) * INVENTORY_PER_LEVEL
+
+# Successful dailies earn this much extra XP per consecutive day before
+# today, up to MAX_STREAK_BONUS
+STREAK_BONUS_PER_DAY = 1
+MAX_STREAK_BONUS = 5
+
+def streak_bonus(streak):
+    return min(max(streak - 1, 0) * STREAK_BONUS_PER_DAY, MAX_STREAK_BONUS)
@@ -0,0 +1,186 @@
+import heapq
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Set
+
+# Heap entry kinds; deadlines sort first on the same day
+DEADLINE = 0
+RECURRENCE = 1
+
+class Recurrence(NamedTuple):
+    rule_id: int
+    title: str
+    description: str
+    priority: str
+    every_days: int
+    next_day: int  # Day ordinal of the next task to create
+
+class Scheduler:
+    """Todo deadlines and recurring todos on one min-heap of day ordinals.
+
+    A deadline on day D fires on day D + 1, once the task can no longer
+    be done in time; a recurrence fires on its next_day. Changing or
+    cancelling something leaves the old entry behind in the heap, and
+    due() skips it when it no longer matches the current deadline or rule.
+    So asking what is due costs O(log n) per entry popped, and only a peek
+    when nothing is due. Once stale entries make up more than half of the
+    heap it is rebuilt from the live ones, which keeps it within twice
+    the number of deadlines and rules at O(1) amortized cost per change.
+
+    Changes are tracked per task deadline and for the rules as a whole,
+    so a save only writes what changed; see pop_changes.
+    """
+
+    def __init__(self):
+        self._deadlines: Dict[int, int] = {}
+        self._rules: Dict[int, Recurrence] = {}
+        self._heap: List[tuple] = []  # (day, kind, task or rule ID)
+        self._next_rule_id = 1
+        self._changed_deadlines: Set[int] = set()
+        self._rules_changed = False
+
+    def deadline(self, task_id: int) -> Optional[str]:
+        day = self._deadlines.get(task_id)
+        return None if day is None else _to_date(day)
+
+    def set_deadline(self, task_id: int, due: date) -> None:
+        due = due.toordinal()
+        self._deadlines[task_id] = due
+        heapq.heappush(self._heap, (due + 1, DEADLINE, task_id))
+        self._changed_deadlines.add(task_id)
+        self._compact()
+
+    def cancel_deadline(self, task_id: int) -> None:
+        if self._deadlines.pop(task_id, None) is not None:
+            self._changed_deadlines.add(task_id)
+            self._compact()
+
+    def rules(self) -> List[Recurrence]:
+        return list(self._rules.values())
+
+    def add_rule(self, title: str, description: str, priority: str, every_days: int, start: date) -> int:
+        if every_days < 1:
+            raise ValueError("A task can repeat at most once a day")
+        rule = Recurrence(self._next_rule_id, title, description, priority, every_days, start.toordinal())
+        self._next_rule_id += 1
+        self._rules[rule.rule_id] = rule
+        heapq.heappush(self._heap, (rule.next_day, RECURRENCE, rule.rule_id))
+        self._rules_changed = True
+        return rule.rule_id
+
+    def remove_rule(self, rule_id: int) -> bool:
+        if self._rules.pop(rule_id, None) is None:
+            return False
+        self._rules_changed = True
+        self._compact()
+        return True
+
+    def clear(self) -> None:
+        # Saved as a clear of the whole schedule, not per deadline
+        self._deadlines.clear()
+        self._rules.clear()
+        self._heap.clear()
+        self._changed_deadlines.clear()
+        self._rules_changed = True
+
+    def due(self, today: Optional[date] = None) -> tuple[List[int], List[tuple[Recurrence, int]]]:
+        """Pop everything that fell due by today.
+
+        Returns the IDs of tasks whose deadline passed, and for each
+        recurrence that fired the rule and the day its task is for. A
+        recurrence that missed several occurrences while the game was
+        closed fires once, for the latest one.
+        """
+        today = (today or date.today()).toordinal()
+        expired = []
+        fired = []
+        heap = self._heap
+        while heap and heap[0][0] <= today:
+            day, kind, key = heapq.heappop(heap)
+            if kind == DEADLINE:
+                if self._deadlines.get(key) == day - 1:
+                    del self._deadlines[key]
+                    expired.append(key)
+                    self._changed_deadlines.add(key)
+                continue
+
+            rule = self._rules.get(key)
+            if rule is None or rule.next_day != day:
+                continue
+            latest = day + (today - day) // rule.every_days * rule.every_days
+            rule = self._rules[key] = rule._replace(next_day=latest + rule.every_days)
+            heapq.heappush(heap, (rule.next_day, RECURRENCE, key))
+            fired.append((rule, latest))
+            self._rules_changed = True
+        return expired, fired
+
+    def pop_changes(self) -> tuple[Dict[int, Optional[str]], Optional[dict]]:
+        """The new deadline (None if gone) of every task whose deadline
+        changed, and the new rules_state() if the rules changed, since the
+        last call."""
+        deadlines = {task_id: self.deadline(task_id) for task_id in sorted(self._changed_deadlines)}
+        rules = self.rules_state() if self._rules_changed else None
+        self._changed_deadlines = set()
+        self._rules_changed = False
+        return deadlines, rules
+
+    # Persistence, as the "schedule" entry of the saved state
+    def to_state(self) -> dict:
+        return {
+            "deadlines": {str(task_id): _to_date(day) for task_id, day in self._deadlines.items()},
+            **self.rules_state(),
+        }
+
+    def rules_state(self) -> dict:
+        """The "rules" and "next_rule_id" entries of to_state()."""
+        return {
+            "rules": [{"id": rule.rule_id, "title": rule.title, "description": rule.description,
+                       "priority": rule.priority, "every": rule.every_days, "next": _to_date(rule.next_day)}
+                      for rule in self._rules.values()],
+            "next_rule_id": self._next_rule_id,
+        }
+
+    def restore(self, state: dict) -> dict:
+        """Replace the deadlines and/or the rules with those of a to_state()
+        or rules_state() dict, e.g. to undo a change. Returns the replaced
+        part of the old state in the same form."""
+        old = {}
+        if "deadlines" in state:
+            old["deadlines"] = self.to_state()["deadlines"]
+            self._changed_deadlines.update(self._deadlines)
+            self._deadlines.clear()
+            for task_id, due in state["deadlines"].items():
+                self.set_deadline(int(task_id), date.fromisoformat(due))
+        if "rules" in state:
+            old.update(self.rules_state())
+            self._rules.clear()
+            for rule_data in state["rules"]:
+                rule = Recurrence(rule_data["id"], rule_data["title"], rule_data["description"],
+                                  rule_data["priority"], rule_data["every"],
+                                  date.fromisoformat(rule_data["next"]).toordinal())
+                self._rules[rule.rule_id] = rule
+                heapq.heappush(self._heap, (rule.next_day, RECURRENCE, rule.rule_id))
+            self._next_rule_id = state.get("next_rule_id", 1)
+            self._rules_changed = True
+            self._compact()
+        return old
+
+    def _compact(self) -> None:
+        live = len(self._deadlines) + len(self._rules)
+        if len(self._heap) - live <= len(self._heap) // 2:
+            return
+        self._heap[:] = ([(day + 1, DEADLINE, task_id) for task_id, day in self._deadlines.items()]
+                         + [(rule.next_day, RECURRENCE, rule.rule_id) for rule in self._rules.values()])
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def from_state(cls, state: Optional[dict]) -> "Scheduler":
+        scheduler = cls()
+        if state:
+            scheduler.restore({"deadlines": {}, "rules": [], **state})
+        # Loaded state matches what is on disk
+        scheduler._changed_deadlines = set()
+        scheduler._rules_changed = False
+        return scheduler
+
+def _to_date(ordinal):
+    return date.fromordinal(ordinal).strftime("%Y-%m-%d")
@@ -0,0 +1,129 @@
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator, List, Optional
+
+class SortedList:
+    """Values kept in sorted order with O(log n) insert, remove, rank and
+    positional lookups.
+
+    Values live in a list of sorted buckets of about LOAD values each,
+    plus the last value of every bucket to bisect on. A Fenwick tree over
+    the bucket sizes gives the number of values before any bucket, which
+    turns a rank into a bucket and an offset and back. An insert or
+    remove touches one small bucket; the tree is rebuilt lazily, only
+    after a bucket splits or empties.
+    """
+    LOAD = 1000  # Buckets split at twice this size
+
+    def __init__(self, values: Iterable = ()):
+        ordered = sorted(values)
+        self._buckets: List[list] = [ordered[i:i + self.LOAD] for i in range(0, len(ordered), self.LOAD)]
+        self._maxes: List = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._tree: Optional[List[int]] = None  # Fenwick tree over bucket sizes
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def add(self, value) -> None:
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([value])
+            self._maxes.append(value)
+            self._tree = None
+            return
+        i = min(bisect_left(self._maxes, value), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, value)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._tree = None
+        else:
+            self._add(i, 1)
+
+    def remove(self, value) -> None:
+        """Remove one occurrence of value, which must be present."""
+        i = bisect_left(self._maxes, value)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, value)]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._add(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._tree = None
+
+    def index(self, value) -> int:
+        """Number of values smaller than value."""
+        i = bisect_left(self._maxes, value)
+        if i == len(self._buckets):
+            return self._len
+        return self._count_before(i) + bisect_left(self._buckets[i], value)
+
+    def iter_from(self, position: int = 0, reverse: bool = False) -> Iterator:
+        """Values from position on, in order; with reverse, in reverse
+        order from position counted from the end."""
+        for chunk in self.chunks_from(position, reverse):
+            yield from chunk
+
+    def chunks_from(self, position: int = 0, reverse: bool = False) -> Iterator[list]:
+        """Like iter_from, but a bucket's worth of values at a time, for
+        callers that filter them in bulk."""
+        if not 0 <= position < self._len:
+            return
+        if not reverse:
+            i, j = self._locate(position)
+            yield self._buckets[i][j:]
+            yield from self._buckets[i + 1:]
+            return
+        i, j = self._locate(self._len - 1 - position)
+        yield self._buckets[i][j::-1]
+        for k in range(i - 1, -1, -1):
+            yield self._buckets[k][::-1]
+
+    # Fenwick tree
+    def _build_tree(self) -> List[int]:
+        tree = [0] * (len(self._buckets) + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+        return tree
+
+    def _add(self, i: int, delta: int) -> None:
+        tree = self._tree
+        if tree is None:
+            return  # Rebuilt from the buckets when next needed
+        i += 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, i: int) -> int:
+        tree = self._tree or self._build_tree()
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position: int) -> tuple[int, int]:
+        """(bucket, index in bucket) of the value at a 0-based position."""
+        tree = self._tree or self._build_tree()
+        i = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if i + step < len(tree) and tree[i + step] <= position:
+                i += step
+                position -= tree[i]
+            step >>= 1
+        return i, position
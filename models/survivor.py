@@ -1,12 +1,27 @@
 from models.base_character import BaseCharacter
+from models.rules import MAX_HEALTH, xp_needed, level_for_xp, inventory_capacity
 
 class Survivor(BaseCharacter):
+    __slots__ = ()
+
     def calculate_xp_needed(self):
-        return 50 + (self._level - 1) * 10
+        return xp_needed(self._level)
+        
+    def inventory_capacity(self):
+        return inventory_capacity(self._level)
         
     def level_up(self):
-        if self._xp >= self.calculate_xp_needed():
-            self._level += 1
-            self._health = 30
+        # Jumps straight to the highest level the current XP allows
+        new_level = level_for_xp(self._xp)
+        if new_level > self._level:
+            self.level = new_level
+            self.health = MAX_HEALTH
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def apply_xp(self, amount):
+        """Add XP and return the number of levels gained."""
+        old_level = self._level
+        self.xp += amount
+        self.level_up()
+        return self._level - old_level
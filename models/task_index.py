@@ -0,0 +1,333 @@
+import bisect
+import heapq
+import re
+import sys
+from functools import partial
+from itertools import islice
+from typing import Dict, List, Optional, Set
+from models.todo_task import TodoTask
+from models.daily_task import DailyTask
+from models.sorted_list import SortedList
+
+WORD = re.compile(r"\w+")
+GRAM_SIZE = 3
+
+PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+# Sort name -> (task field it orders by, sort key of the field's value)
+SORT_KEYS = {
+    "id": ("_id", None),
+    "title": ("_title", str.casefold),
+    "priority": ("_priority", lambda priority: PRIORITY_RANK.get(priority, -1)),
+    "completed": ("_completed", bool),
+    "completion_date": ("last_completion_date", lambda completion_date: completion_date or ""),
+}
+
+class TaskIndex:
+    """Secondary indexes over a TaskManager's tasks, kept up to date as
+    tasks are added, changed and removed.
+
+    Type, priority, completion status and completion date map to sets of
+    task IDs. Titles and descriptions are split into words and every
+    word is indexed by its trigrams, so a substring search only checks
+    the words that share the trigrams of the search term instead of
+    every task. Each sort order gets a SortedList of (sort key, ID) the
+    first time it is asked for, so a page of an unfiltered listing is an
+    O(log n) lookup at any offset, and a filtered one can walk the tasks
+    in order and stop once the page is full.
+
+    A change to a task only touches the indexes of the field that
+    changed.
+    """
+
+    def __init__(self, tasks: Dict[int, TodoTask | DailyTask]):
+        self._tasks = tasks  # The TaskManager's own dict, in ID order
+        self._by_type: Dict[str, Set[int]] = {"todo": set(), "daily": set()}
+        self._by_priority: Dict[str, Set[int]] = {priority: set() for priority in PRIORITY_RANK}
+        self._by_completed: Dict[bool, Set[int]] = {True: set(), False: set()}
+        self._by_date: Dict[str, Set[int]] = {}
+        self._dates: List[str] = []  # Sorted keys of _by_date
+        # A word used by a single task maps to its bare ID, which is far
+        # smaller than a one-element set when titles are mostly unique
+        self._by_word: Dict[str, int | Set[int]] = {}
+        self._by_gram: Dict[str, Set[str]] = {}
+        self._sorted: Dict[str, SortedList] = {}  # Sort name -> ordered index, built on demand
+        # What each task was indexed under, so changes can be undone
+        self._entries: Dict[int, tuple] = {}
+        for task in tasks.values():
+            self.add(task)
+
+    def add(self, task: TodoTask | DailyTask) -> None:
+        task_id = task._id
+        if isinstance(task, DailyTask):
+            task_type, priority, completion_date = "daily", None, task.last_completion_date
+        else:
+            task_type, priority, completion_date = "todo", task._priority, None
+        words = _words(task)
+
+        self._by_type[task_type].add(task_id)
+        if priority is not None:
+            self._by_priority[priority].add(task_id)
+        self._by_completed[task._completed].add(task_id)
+        if completion_date:
+            self._add_date(completion_date, task_id)
+        for word in words:
+            self._add_word(word, task_id)
+        for sort, index in self._sorted.items():
+            index.add(_sort_entry(sort, task))
+
+        self._entries[task_id] = (task_type, priority, task._completed, completion_date, words)
+
+    def remove(self, task: TodoTask | DailyTask) -> None:
+        task_id = task._id
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        task_type, priority, completed, completion_date, words = entry
+
+        self._by_type[task_type].discard(task_id)
+        if priority is not None:
+            self._by_priority[priority].discard(task_id)
+        self._by_completed[completed].discard(task_id)
+        if completion_date:
+            self._remove_date(completion_date, task_id)
+        for word in words:
+            self._remove_word(word, task_id)
+        for sort, index in self._sorted.items():
+            index.remove(_sort_entry(sort, task))
+
+    def update(self, task: TodoTask | DailyTask, field: str, old) -> None:
+        """Reindex a task after field changed from old to its current
+        value."""
+        task_id = task._id
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return
+        task_type, priority, completed, completion_date, words = entry
+        if field in ("_title", "_description"):
+            new_words = _words(task)
+            for word in set(words).difference(new_words):
+                self._remove_word(word, task_id)
+            for word in set(new_words).difference(words):
+                self._add_word(word, task_id)
+            words = new_words
+        elif field == "_priority":
+            self._by_priority[priority].discard(task_id)
+            priority = task._priority
+            self._by_priority[priority].add(task_id)
+        elif field == "_completed":
+            self._by_completed[completed].discard(task_id)
+            completed = task._completed
+            self._by_completed[completed].add(task_id)
+        elif field == "last_completion_date":
+            if completion_date:
+                self._remove_date(completion_date, task_id)
+            completion_date = task.last_completion_date
+            if completion_date:
+                self._add_date(completion_date, task_id)
+        else:
+            return  # Nothing is indexed by this field
+        self._entries[task_id] = (task_type, priority, completed, completion_date, words)
+
+        for sort, index in self._sorted.items():
+            sort_field, key = SORT_KEYS[sort]
+            if sort_field == field:
+                index.remove((key(old), task_id))
+                index.add((key(getattr(task, field)), task_id))
+
+    def query(self, task_type: Optional[str] = None, priority: Optional[str] = None,
+              completed: Optional[bool] = None, completed_since: Optional[str] = None,
+              completed_until: Optional[str] = None, search: Optional[str] = None,
+              sort: str = "id", descending: bool = False,
+              offset: int = 0, limit: Optional[int] = None) -> List[TodoTask | DailyTask]:
+        """Return the tasks matching every given filter, sorted by one of
+        SORT_KEYS (ties in ID order) and sliced by offset/limit.
+
+        Dates are "YYYY-MM-DD" strings and the range is inclusive; search
+        matches tasks whose title or description contains every word of
+        it, case-insensitively.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative")
+
+        candidates = []
+        if task_type is not None:
+            candidates.append(self._by_type.get(task_type, set()))
+        if priority is not None:
+            candidates.append(self._by_priority.get(priority, set()))
+        if completed is not None:
+            candidates.append(self._by_completed[bool(completed)])
+        if completed_since is not None or completed_until is not None:
+            candidates.append(self._completed_between(completed_since, completed_until))
+
+        # Each filter is (expected matches, membership test). A search
+        # term's tasks are collected into a set when that costs no more
+        # than what the other filters leave, or nothing at all because
+        # the term is one indexed word; otherwise each task's words are
+        # checked.
+        total = len(self._tasks)
+        wanted = None if limit is None else offset + limit
+        filters = [(len(candidate), candidate.__contains__) for candidate in candidates]
+        terms = set(WORD.findall(search.casefold())) if search else set()
+        for term in sorted(terms, key=len, reverse=True):
+            postings = self._postings(term)
+            matches = total if postings is None else sum(1 if isinstance(ids, int) else len(ids)
+                                                         for ids in postings)
+            narrowest = min(map(len, candidates), default=total)
+            if postings is None or (matches > narrowest and len(postings) > 1):
+                filters.append((min(matches, total), partial(self._contains_term, term)))
+            else:
+                task_ids = _union(postings)
+                candidates.append(task_ids)
+                filters.append((len(task_ids), task_ids.__contains__))
+
+        if not filters:
+            entries = islice(self._sort_index(sort).iter_from(offset, descending), limit)
+            if sort == "id":
+                return [self._tasks[task_id] for task_id in entries]
+            return [self._tasks[task_id] for _, task_id in entries]
+
+        narrowest = min(candidates, key=len, default=None)
+        tests = [test for _, test in sorted(filters, key=lambda item: item[0])]
+
+        # Walking the tasks in sort order stops after the requested page,
+        # which beats collecting every match when the filters are broad
+        match_rate = 1.0
+        for expected, _ in filters:
+            match_rate *= expected / total if total else 0.0
+        collect_cost = total if narrowest is None else len(narrowest)
+        if wanted is not None and match_rate and wanted / match_rate < collect_cost:
+            matches = []
+            for chunk in self._ordered_chunks(sort, descending):
+                # One C-level pass per filter over a bucket of IDs
+                for test in tests:
+                    chunk = list(filter(test, chunk))
+                matches += chunk
+                if len(matches) >= wanted:
+                    break
+            return [self._tasks[task_id] for task_id in matches[offset:wanted]]
+
+        tasks = [self._tasks[task_id] for task_id in (self._tasks if narrowest is None else narrowest)
+                 if all(test(task_id) for test in tests)]
+
+        field, sort_key = SORT_KEYS[sort]
+        if sort == "id":
+            key = _task_id
+        else:
+            def key(task):
+                return sort_key(getattr(task, field, None)), task._id
+        if wanted is None:
+            tasks.sort(key=key, reverse=descending)
+        elif descending:
+            tasks = heapq.nlargest(wanted, tasks, key=key)
+        else:
+            tasks = heapq.nsmallest(wanted, tasks, key=key)
+        return tasks[offset:]
+
+    def _ordered_chunks(self, sort: str, descending: bool):
+        """Every task ID in sort order, a few hundred at a time."""
+        if sort == "id":
+            # The TaskManager keeps its dict in ID order
+            task_ids = reversed(self._tasks) if descending else iter(self._tasks)
+            while chunk := list(islice(task_ids, SortedList.LOAD)):
+                yield chunk
+            return
+        for chunk in self._sort_index(sort).chunks_from(0, descending):
+            yield [task_id for _, task_id in chunk]
+
+    def _sort_index(self, sort: str) -> SortedList:
+        index = self._sorted.get(sort)
+        if index is None:
+            index = self._sorted[sort] = SortedList(_sort_entry(sort, task) for task in self._tasks.values())
+        return index
+
+    def _add_word(self, word: str, task_id: int) -> None:
+        postings = self._by_word.get(word)
+        if postings is None:
+            self._by_word[word] = task_id
+            for gram in _grams(word):
+                self._by_gram.setdefault(gram, set()).add(word)
+        elif isinstance(postings, int):
+            self._by_word[word] = {postings, task_id}
+        else:
+            postings.add(task_id)
+
+    def _remove_word(self, word: str, task_id: int) -> None:
+        postings = self._by_word[word]
+        if not isinstance(postings, int):
+            postings.discard(task_id)
+            if len(postings) == 1:
+                self._by_word[word] = postings.pop()
+        else:
+            del self._by_word[word]
+            for gram in _grams(word):
+                words_with_gram = self._by_gram[gram]
+                words_with_gram.discard(word)
+                if not words_with_gram:
+                    del self._by_gram[gram]
+
+    def _add_date(self, completion_date: str, task_id: int) -> None:
+        bucket = self._by_date.get(completion_date)
+        if bucket is None:
+            bucket = self._by_date[completion_date] = set()
+            bisect.insort(self._dates, completion_date)
+        bucket.add(task_id)
+
+    def _remove_date(self, completion_date: str, task_id: int) -> None:
+        bucket = self._by_date[completion_date]
+        bucket.discard(task_id)
+        if not bucket:
+            del self._by_date[completion_date]
+            del self._dates[bisect.bisect_left(self._dates, completion_date)]
+
+    def _completed_between(self, since: Optional[str], until: Optional[str]) -> Set[int]:
+        start = 0 if since is None else bisect.bisect_left(self._dates, since)
+        end = len(self._dates) if until is None else bisect.bisect_right(self._dates, until)
+        if end - start == 1:
+            return self._by_date[self._dates[start]]
+        task_ids = set()
+        for completion_date in self._dates[start:end]:
+            task_ids |= self._by_date[completion_date]
+        return task_ids
+
+    def _postings(self, term: str) -> Optional[List[int | Set[int]]]:
+        """Postings of every indexed word containing term, or None if the
+        term is too short to look up by its trigrams."""
+        if len(term) < GRAM_SIZE:
+            return None
+        grams = sorted((self._by_gram.get(gram, set()) for gram in _grams(term)), key=len)
+        return [self._by_word[word] for word in grams[0].intersection(*grams[1:]) if term in word]
+
+    def _contains_term(self, term: str, task_id: int) -> bool:
+        return any(term in word for word in self._entries[task_id][4])
+
+def _words(task: TodoTask | DailyTask) -> tuple:
+    return tuple({sys.intern(word) for word in WORD.findall(f"{task._title} {task._description}".casefold())})
+
+def _sort_entry(sort: str, task: TodoTask | DailyTask):
+    if sort == "id":
+        return task._id
+    field, key = SORT_KEYS[sort]
+    return key(getattr(task, field, None)), task._id
+
+def _task_id(task: TodoTask | DailyTask) -> int:
+    return task._id
+
+def _union(postings: List[int | Set[int]]) -> Set[int]:
+    if len(postings) == 1 and not isinstance(postings[0], int):
+        return postings[0]
+    task_ids = set()
+    for ids in postings:
+        if isinstance(ids, int):
+            task_ids.add(ids)
+        else:
+            task_ids |= ids
+    return task_ids
+
+def _grams(word: str) -> Set[str]:
+    # Words shorter than a trigram are indexed under themselves
+    if len(word) < GRAM_SIZE:
+        return {word}
+    return {word[i:i + GRAM_SIZE] for i in range(len(word) - GRAM_SIZE + 1)}
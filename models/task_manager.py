@@ -1,60 +1,435 @@
-from typing import List
+from datetime import date
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
 from .todo_task import TodoTask
 from .daily_task import DailyTask
 from .survivor import Survivor
+from .daily_rollover import DailyRollover
+from .task_index import TaskIndex
+from .scheduler import Scheduler
+from .rules import (HUNGER_DECAY_PER_COMPLETION, THIRST_DECAY_PER_COMPLETION, INFECTION_PER_FAILURE,
+                    DEADLINE_MISSED_PENALTY)
+
+class CompletionResult(NamedTuple):
+    task_id: int
+    status: str
+    reward: int
+
+class CompletionReport(NamedTuple):
+    results: List[CompletionResult]
+    xp_gained: int
+    health_change: int
+    levels_gained: int
+
+class TaskChanges(NamedTuple):
+    cleared: bool
+    created: List[TodoTask | DailyTask]
+    updated: List[tuple[TodoTask | DailyTask, Set[str]]]  # With their dirty fields
+    deleted: List[int]
+    deadlines: Dict[int, Optional[str]]  # New due date of each changed deadline, None if gone
+    rules: Optional[dict]  # New Scheduler.rules_state(), if the rules changed
+
+class ScheduleReport(NamedTuple):
+    expired: List[int]  # Todos whose deadline passed, penalised
+    created: List[int]  # Todos created by recurrences
+    health_change: int
 
 class TaskManager:
     def __init__(self):
-        self._tasks: List[TodoTask | DailyTask] = []
+        # Insertion-ordered, so iteration keeps the display order stable
+        self._tasks: Dict[int, TodoTask | DailyTask] = {}
+        self._next_id = 1
+        self._rollover = DailyRollover()
+        self._scheduler = Scheduler()
+        self._index: Optional[TaskIndex] = None  # Built by the first query()
+        self._reset_changes()
+        # Anything with append(task, reward, success), e.g. utils.event_log.CompletionLog
+        self.event_log = None
+        # Anything with task_created(task), task_changed(task, field, old),
+        # task_deleted(task), tasks_cleared(tasks), deadline_changed(task_id,
+        # old), schedule_changed(old_state) and clear(), e.g.
+        # utils.undo_history.UndoHistory
+        self.history = None
+        self._listeners: List[Callable[[str, Optional[int]], None]] = []
+    
+    def __len__(self) -> int:
+        return len(self._tasks)
+    
+    def __getstate__(self) -> dict:
+        # Listeners and the event log belong to the running session, and
+        # the index is cheaper to rebuild on demand than to pickle
+        state = self.__dict__.copy()
+        state["_index"] = None
+        state["event_log"] = None
+        state["history"] = None
+        state["_listeners"] = []
+        return state
+    
+    def add_listener(self, listener: Callable[[str, Optional[int]], None]) -> None:
+        """Call listener(event, task_id) after every change: "create",
+        "update" and "delete" with the task's ID, "clear" with None."""
+        self._listeners.append(listener)
     
-    def create_task(self, task_type: str, title: str, description: str, priority: str = "low") -> bool:
+    @property
+    def last_rollover(self) -> Optional[str]:
+        return self._rollover.last_rollover
+    
+    def state(self) -> dict:
+        """Everything besides tasks that a save has to keep."""
+        return {"last_rollover": self.last_rollover, "schedule": self._scheduler.to_state()}
+    
+    def create_task(self, task_type: str, title: str, description: str, priority: str = "low") -> Optional[int]:
         if not title.strip():
-            return False
+            return None
             
         if task_type == "todo":
             task = TodoTask(title, description, priority)
         else:
             task = DailyTask(title, description)
             
-        self._tasks.append(task)
+        task_id = self._add_task(task)
+        self._new_ids.add(task_id)
+        if isinstance(task, DailyTask):
+            self._rollover.track(task, new=True)
+        if self.history is not None:
+            self.history.task_created(task)
+        return task_id
+    
+    def get_task(self, task_id: int) -> Optional[TodoTask | DailyTask]:
+        return self._tasks.get(task_id)
+    
+    def delete_task(self, task_id: int) -> bool:
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return False
+        self._rollover.untrack(task_id)
+        self._change_deadline(task_id, None)
+        if self._index is not None:
+            self._index.remove(task)
+        self._notify("delete", task_id)
+        self._dirty_ids.discard(task_id)
+        if task_id in self._new_ids:
+            self._new_ids.discard(task_id)  # Never saved, nothing to delete
+        else:
+            self._deleted_ids.add(task_id)
+        if self.history is not None:
+            self.history.task_deleted(task)
         return True
     
-    def delete_task(self, task_idx: int) -> bool:
-        if 0 <= task_idx < len(self._tasks):
-            self._tasks.pop(task_idx)
-            return True
-        return False
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        deleted = 0
+        for task_id in task_ids:
+            if self.delete_task(task_id):
+                deleted += 1
+        return deleted
     
-    def complete_task(self, task_idx: int, character: Survivor, success: bool = True) -> tuple[str, int]:
-        if not (0 <= task_idx < len(self._tasks)):
-            return "invalid_index", 0
-            
-        task = self._tasks[task_idx]
+    def complete_task(self, task_id: int, character: Survivor, success: bool = True) -> tuple[str, int]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return "invalid_id", 0
         
         if isinstance(task, DailyTask):
             status = task.complete(success)
+            if status == "completed":
+                self._rollover.mark_completed(task)
         else:
             status = task.complete()
+            if status == "completed":
+                self._change_deadline(task_id, None)
             
         if status == "already_completed":
             return status, 0
             
         reward = task.calculate_reward() if status == "completed" else -5
+        if self.event_log is not None:
+            self.event_log.append(task, reward, success or not isinstance(task, DailyTask))
         return status, reward
     
+    def complete_many(self, task_ids: Iterable[int], character: Survivor,
+                      outcomes: Optional[Iterable[bool]] = None) -> CompletionReport:
+        """Complete a batch of tasks and apply their combined rewards and
+        stat decay to the character once.
+
+        outcomes gives the success flag for each daily task, in the same
+        order as task_ids; todos ignore it and it defaults to all True.
+        """
+        task_ids = list(task_ids)
+        outcomes = [True] * len(task_ids) if outcomes is None else list(outcomes)
+        if len(outcomes) != len(task_ids):
+            raise ValueError("outcomes must have one entry per task")
+        
+        results = []
+        xp_gained = health_change = completions = failures = 0
+        for task_id, success in zip(task_ids, outcomes):
+            status, reward = self.complete_task(task_id, character, success)
+            if status != "completed":
+                results.append(CompletionResult(task_id, status, 0))
+                continue
+            
+            results.append(CompletionResult(task_id, status, reward))
+            completions += 1
+            if reward > 0:
+                xp_gained += reward
+            else:
+                health_change += reward
+            if not success and isinstance(self._tasks[task_id], DailyTask):
+                failures += 1
+        
+        # Setters mark the field dirty, so leave untouched stats alone
+        levels_gained = character.apply_xp(xp_gained) if xp_gained else 0
+        if health_change:
+            character.health += health_change
+        if completions:
+            character.hunger -= completions * HUNGER_DECAY_PER_COMPLETION
+            character.thirst -= completions * THIRST_DECAY_PER_COMPLETION
+        if failures:
+            character.infection += failures * INFECTION_PER_FAILURE
+        
+        return CompletionReport(results, xp_gained, health_change, levels_gained)
+    
     def get_tasks(self) -> List[TodoTask | DailyTask]:
-        return self._tasks
+        return list(self._tasks.values())
+    
+    def query(self, task_type: Optional[str] = None, priority: Optional[str] = None,
+              completed: Optional[bool] = None, completed_since: Optional[str] = None,
+              completed_until: Optional[str] = None, search: Optional[str] = None,
+              sort: str = "id", descending: bool = False,
+              offset: int = 0, limit: Optional[int] = None) -> List[TodoTask | DailyTask]:
+        """Filtered, sorted page of tasks served from the indexes; see
+        TaskIndex.query. The indexes are built on the first call and kept
+        up to date from then on."""
+        if self._index is None:
+            self._index = TaskIndex(self._tasks)
+        return self._index.query(task_type, priority, completed, completed_since, completed_until,
+                                 search, sort, descending, offset, limit)
     
     def clear_tasks(self) -> None:
+        if self.history is not None:
+            self.history.tasks_cleared(self.get_tasks())
+            self.history.schedule_changed(self._scheduler.to_state())
         self._tasks.clear()
+        self._rollover.clear()
+        self._scheduler.clear()
+        self._index = None
+        self._reset_changes()
+        self._cleared = True
+        self._notify("clear", None)
     
-    def load_tasks(self, tasks_data: list) -> None:
+    def pop_changes(self) -> TaskChanges:
+        """Return what changed since the last call, so only that needs to
+        be written, and start tracking afresh."""
+        # IDs only grow, so sorting keeps creation order
+        created = [self._tasks[task_id] for task_id in sorted(self._new_ids)]
+        updated = [(self._tasks[task_id], self._tasks[task_id].dirty_fields)
+                   for task_id in sorted(self._dirty_ids - self._new_ids)]
+        deadlines, rules = self._scheduler.pop_changes()
+        changes = TaskChanges(self._cleared, created, updated, sorted(self._deleted_ids), deadlines, rules)
+        for task in created + [task for task, _ in updated]:
+            task.clear_dirty()
+        self._reset_changes()
+        return changes
+    
+    def roll_over(self, character: Survivor, today: Optional[date] = None) -> tuple[List[DailyTask], int]:
+        """Reset daily tasks for a new day and apply the penalty for every
+        missed task-day to the character in one step."""
+        previous_rollover = self._rollover.last_rollover
+        changed, missed_days = self._rollover.roll_over(self._tasks, today)
+        if missed_days:
+            character.health -= missed_days * DailyRollover.MISSED_DAY_HEALTH_PENALTY
+            character.infection += missed_days * DailyRollover.MISSED_DAY_INFECTION
+        # Undoing across a day boundary would bring back tasks the rollover
+        # already reset, so undo history covers one day
+        if self.history is not None and self._rollover.last_rollover != previous_rollover:
+            self.history.clear()
+        return changed, missed_days
+    
+    def load_tasks(self, tasks_data: list, last_rollover: Optional[str] = None,
+                   schedule: Optional[dict] = None) -> None:
         self._tasks.clear()
+        self._next_id = 1
+        self._rollover = DailyRollover(last_rollover)
+        self._scheduler = Scheduler.from_state(schedule)
+        self._index = None
+        self._reset_changes()
+        self._notify("clear", None)
+        in_order = True
         for task_data in tasks_data:
-            if "priority" in task_data:
-                task = TodoTask(task_data["_title"], task_data["_description"], 
-                              task_data.get("_priority", "low"))
-            else:
-                task = DailyTask(task_data["_title"], task_data["_description"])
-            task._completed = task_data["_completed"]
-            self._tasks.append(task)
\ No newline at end of file
+            task = self.build_task(task_data)
+            task.clear_dirty()  # Loaded state matches what is on disk
+            in_order = in_order and (task_data.get("_id") or self._next_id) >= self._next_id
+            self._add_task(task, task_data.get("_id"))
+            if isinstance(task, DailyTask):
+                self._rollover.track(task)
+        # A journal can list a task put back by undo after newer ones
+        if not in_order:
+            self._sort_by_id()
+    
+    # Deadlines and recurring todos
+    def deadline(self, task_id: int) -> Optional[str]:
+        return self._scheduler.deadline(task_id)
+    
+    def set_deadline(self, task_id: int, due: Optional[date]) -> bool:
+        """Give a pending todo a due date, or take it away with None. If it
+        is still pending after that day, run_schedule() penalises it."""
+        task = self._tasks.get(task_id)
+        if not isinstance(task, TodoTask) or task._completed:
+            return False
+        self._change_deadline(task_id, due)
+        self._notify("update", task_id)
+        return True
+    
+    def add_recurring_task(self, title: str, description: str, priority: str = "low",
+                           every_days: int = 1, today: Optional[date] = None) -> Optional[int]:
+        """Create a todo now and again every every_days days. Each one is
+        due the day before the next is created. Returns the first todo's
+        ID."""
+        today = today or date.today()
+        task_id = self.create_task("todo", title, description, priority)
+        if task_id is None:
+            return None
+        if self.history is not None:
+            self.history.schedule_changed(self._scheduler.rules_state())
+        self._scheduler.add_rule(title, description, priority, every_days,
+                                 date.fromordinal(today.toordinal() + every_days))
+        self.set_deadline(task_id, date.fromordinal(today.toordinal() + every_days - 1))
+        return task_id
+    
+    def remove_recurrence(self, rule_id: int) -> bool:
+        old = self._scheduler.rules_state()
+        if not self._scheduler.remove_rule(rule_id):
+            return False
+        if self.history is not None:
+            self.history.schedule_changed(old)
+        return True
+    
+    def recurrences(self):
+        return self._scheduler.rules()
+    
+    def run_schedule(self, character: Survivor, today: Optional[date] = None) -> ScheduleReport:
+        """Penalise todos whose deadline passed and create the todos of
+        recurrences that fell due, applying the penalties to the character
+        in one step like complete_many does."""
+        expired_ids, fired = self._scheduler.due(today)
+        expired = []
+        for task_id in expired_ids:
+            task = self._tasks.get(task_id)
+            if task is not None and not task._completed:
+                expired.append(task_id)
+                self._notify("update", task_id)  # Its due date is gone
+        health_change = len(expired) * DEADLINE_MISSED_PENALTY
+        if expired:
+            character.health += health_change
+            character.infection += len(expired) * INFECTION_PER_FAILURE
+        
+        created = []
+        for rule, day in fired:
+            task_id = self.create_task("todo", rule.title, rule.description, rule.priority)
+            if task_id is not None:
+                self.set_deadline(task_id, date.fromordinal(day + rule.every_days - 1))
+                created.append(task_id)
+        return ScheduleReport(expired, created, health_change)
+    
+    @staticmethod
+    def build_task(task_data: dict) -> TodoTask | DailyTask:
+        """Task object for a serialized task, without an ID."""
+        if "_priority" in task_data:
+            task = TodoTask(task_data["_title"], task_data["_description"], 
+                          task_data.get("_priority", "low"))
+        else:
+            task = DailyTask(task_data["_title"], task_data["_description"])
+            task.last_completion_date = task_data.get("last_completion_date")
+            task.was_successful = task_data.get("was_successful")
+            task.streak = task_data.get("streak", 0)
+            task.best_streak = task_data.get("best_streak", 0)
+            task.history = task_data.get("history", 0)
+        task._completed = task_data["_completed"]
+        return task
+    
+    def restore_tasks(self, tasks: List[TodoTask | DailyTask]) -> None:
+        """Put back tasks removed by delete_task or clear_tasks, with their
+        old IDs; they are saved as created again."""
+        last_id = next(reversed(self._tasks), 0)
+        for task in tasks:
+            self._add_task(task, task._id)
+            self._new_ids.add(task._id)
+            if isinstance(task, DailyTask):
+                self._rollover.track(task)
+            if self.history is not None:
+                self.history.task_created(task)
+        if tasks and min(task._id for task in tasks) < last_id:
+            self._sort_by_id()
+    
+    def restore_deadline(self, task_id: int, due: Optional[str]) -> None:
+        """Put back a deadline as deadline() returned it, whether or not the
+        task is pending yet, e.g. before its completion is undone."""
+        self._change_deadline(task_id, None if due is None else date.fromisoformat(due))
+        if task_id in self._tasks:
+            self._notify("update", task_id)
+    
+    def restore_schedule(self, state: dict) -> dict:
+        """Put back deadlines and/or rules saved with Scheduler.to_state()
+        or rules_state(); returns what they replaced, in the same form."""
+        old = self._scheduler.restore(state)
+        if self.history is not None:
+            self.history.schedule_changed(old)
+        for task_id in {*old.get("deadlines", ()), *state.get("deadlines", ())}:
+            if int(task_id) in self._tasks:
+                self._notify("update", int(task_id))
+        return old
+    
+    def set_field(self, task_id: int, field: str, value) -> None:
+        """Set a field by its change-tracking name (see dirty_fields), for
+        putting back an old value."""
+        task = self._tasks[task_id]
+        setattr(task, field.lstrip("_"), value)
+        if isinstance(task, DailyTask):
+            self._rollover.track(task)
+    
+    def _add_task(self, task: TodoTask | DailyTask, task_id: Optional[int] = None) -> int:
+        # Saves from before task IDs existed get fresh ones in load order
+        if task_id is None:
+            task_id = self._next_id
+        task._id = task_id
+        task._tracker = self._track
+        self._tasks[task_id] = task
+        if self._index is not None:
+            self._index.add(task)
+        self._notify("create", task_id)
+        self._next_id = max(self._next_id, task_id + 1)
+        return task_id
+    
+    def _change_deadline(self, task_id: int, due: Optional[date]) -> None:
+        if self.history is None:
+            old = None
+        else:
+            old = self._scheduler.deadline(task_id)
+        if due is None:
+            self._scheduler.cancel_deadline(task_id)
+        else:
+            self._scheduler.set_deadline(task_id, due)
+        if self.history is not None and self._scheduler.deadline(task_id) != old:
+            self.history.deadline_changed(task_id, old)
+    
+    def _sort_by_id(self) -> None:
+        # Display order is ID order; in place since the index shares the dict.
+        # Listeners already got a "create" for every restored task
+        ordered = sorted(self._tasks.items())
+        self._tasks.clear()
+        self._tasks.update(ordered)
+    
+    def _track(self, task: TodoTask | DailyTask, field: str, old) -> None:
+        self._dirty_ids.add(task._id)
+        if self._index is not None:
+            self._index.update(task, field, old)
+        self._notify("update", task._id)
+        if self.history is not None:
+            self.history.task_changed(task, field, old)
+    
+    def _notify(self, event: str, task_id: Optional[int]) -> None:
+        for listener in self._listeners:
+            listener(event, task_id)
+    
+    def _reset_changes(self) -> None:
+        self._cleared = False
+        self._new_ids: Set[int] = set()
+        self._dirty_ids: Set[int] = set()
+        self._deleted_ids: Set[int] = set()
\ No newline at end of file
@@ -0,0 +1,238 @@
+import sys
+from array import array
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+from models.todo_task import TodoTask
+from models.daily_task import DailyTask, HISTORY_MASK
+
+PRIORITIES = ["low", "medium", "high"]
+PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+
+TODO, DAILY = 0, 1
+NO_VALUE = -1  # Missing priority / success flag
+NO_DATE = 0    # Missing completion date (ordinals start at 1)
+
+class TaskStore:
+    """Columnar storage for very large task lists.
+
+    Each field lives in its own array instead of one object per task:
+    flags and priorities as small ints, completion dates as day ordinals
+    and descriptions, which repeat a lot, as interned strings. Tasks are exposed
+    through TodoTaskView/DailyTaskView, which read and write the columns
+    directly. Deleted rows are tombstoned until compact() is called.
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._kinds = array("b")
+        self._completed = array("b")
+        self._priorities = array("b")
+        self._successful = array("b")
+        self._completion_days = array("l")
+        self._streaks = array("l")
+        self._best_streaks = array("l")
+        self._histories = array("q")
+        self._alive = array("b")
+        self._titles: List[str] = []
+        self._descriptions: List[str] = []
+        self._rows: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator["TaskView"]:
+        for row, alive in enumerate(self._alive):
+            if alive:
+                yield self._view(row)
+
+    def __contains__(self, task_id):
+        return task_id in self._rows
+
+    def get(self, task_id: int) -> Optional["TaskView"]:
+        row = self._rows.get(task_id)
+        return None if row is None else self._view(row)
+
+    def add(self, task: TodoTask | DailyTask) -> int:
+        if task._id in self._rows:
+            raise ValueError(f"Task {task._id} is already stored")
+
+        row = len(self._ids)
+        self._ids.append(task._id)
+        self._titles.append(task._title)
+        self._descriptions.append(sys.intern(task._description))
+        self._completed.append(task._completed)
+        self._alive.append(True)
+        if isinstance(task, DailyTask):
+            self._kinds.append(DAILY)
+            self._priorities.append(NO_VALUE)
+            self._successful.append(NO_VALUE if task.was_successful is None else task.was_successful)
+            self._completion_days.append(_to_ordinal(task.last_completion_date))
+            self._streaks.append(task.streak)
+            self._best_streaks.append(task.best_streak)
+            self._histories.append(task.history)
+        else:
+            self._kinds.append(TODO)
+            self._priorities.append(PRIORITY_CODES[task._priority])
+            self._successful.append(NO_VALUE)
+            self._completion_days.append(NO_DATE)
+            self._streaks.append(0)
+            self._best_streaks.append(0)
+            self._histories.append(0)
+        self._rows[task._id] = row
+        return row
+
+    def extend(self, tasks) -> None:
+        for task in tasks:
+            self.add(task)
+
+    def delete(self, task_id: int) -> bool:
+        row = self._rows.pop(task_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._titles[row] = self._descriptions[row] = ""
+        return True
+
+    def compact(self) -> None:
+        """Drop tombstoned rows, keeping the remaining rows in order."""
+        keep = [row for row, alive in enumerate(self._alive) if alive]
+        for name in ("_ids", "_kinds", "_completed", "_priorities",
+                     "_successful", "_completion_days", "_streaks", "_best_streaks",
+                     "_histories", "_alive"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[row] for row in keep)))
+        self._titles = [self._titles[row] for row in keep]
+        self._descriptions = [self._descriptions[row] for row in keep]
+        self._rows = {task_id: row for row, task_id in enumerate(self._ids)}
+
+    def to_task(self, task_id: int) -> Optional[TodoTask | DailyTask]:
+        """Materialize a full task object for a stored row."""
+        view = self.get(task_id)
+        if view is None:
+            return None
+
+        if isinstance(view, DailyTaskView):
+            task = DailyTask(view._title, view._description)
+            task.last_completion_date = view.last_completion_date
+            task.was_successful = view.was_successful
+            task.streak = view.streak
+            task.best_streak = view.best_streak
+            task.history = view.history
+        else:
+            task = TodoTask(view._title, view._description, view._priority)
+        task._id = task_id
+        task._completed = view._completed
+        task.clear_dirty()
+        return task
+
+    def _view(self, row):
+        if self._kinds[row] == DAILY:
+            return DailyTaskView(self, row)
+        return TodoTaskView(self, row)
+
+class TaskView:
+    """Lightweight handle onto one TaskStore row, using the same
+    attribute names as the task classes."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    @property
+    def _id(self):
+        return self._store._ids[self._row]
+
+    @property
+    def _title(self):
+        return self._store._titles[self._row]
+
+    @property
+    def _description(self):
+        return self._store._descriptions[self._row]
+
+    @property
+    def _completed(self):
+        return bool(self._store._completed[self._row])
+
+    @_completed.setter
+    def _completed(self, value):
+        self._store._completed[self._row] = value
+
+    id = _id
+    title = _title
+    description = _description
+    completed = _completed
+
+class TodoTaskView(TaskView):
+    __slots__ = ()
+
+    @property
+    def _priority(self):
+        return PRIORITIES[self._store._priorities[self._row]]
+
+    priority = _priority
+    complete = TodoTask.complete
+    calculate_reward = TodoTask.calculate_reward
+
+class DailyTaskView(TaskView):
+    __slots__ = ()
+
+    @property
+    def last_completion_date(self):
+        return _from_ordinal(self._store._completion_days[self._row])
+
+    @last_completion_date.setter
+    def last_completion_date(self, value):
+        self._store._completion_days[self._row] = _to_ordinal(value)
+
+    @property
+    def was_successful(self):
+        value = self._store._successful[self._row]
+        return None if value == NO_VALUE else bool(value)
+
+    @was_successful.setter
+    def was_successful(self, value):
+        self._store._successful[self._row] = NO_VALUE if value is None else value
+
+    @property
+    def streak(self):
+        return self._store._streaks[self._row]
+
+    @streak.setter
+    def streak(self, value):
+        self._store._streaks[self._row] = value
+
+    @property
+    def best_streak(self):
+        return self._store._best_streaks[self._row]
+
+    @best_streak.setter
+    def best_streak(self, value):
+        self._store._best_streaks[self._row] = value
+
+    @property
+    def history(self):
+        return self._store._histories[self._row]
+
+    @history.setter
+    def history(self, value):
+        self._store._histories[self._row] = value & HISTORY_MASK
+
+    complete = DailyTask.complete
+    calculate_reward = DailyTask.calculate_reward
+    current_streak = DailyTask.current_streak
+    successes_in_window = DailyTask.successes_in_window
+    succeeded_on = DailyTask.succeeded_on
+    perfect_week = DailyTask.perfect_week
+    _days_since_completion = DailyTask._days_since_completion
+
+def _to_ordinal(date_str):
+    if not date_str:
+        return NO_DATE
+    return date.fromisoformat(date_str).toordinal()
+
+def _from_ordinal(ordinal):
+    if ordinal == NO_DATE:
+        return None
+    return date.fromordinal(ordinal).strftime("%Y-%m-%d")
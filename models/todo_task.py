@@ -1,17 +1,33 @@
 from models.base_task import BaseTask
+from models.rules import TODO_REWARDS
 
 class TodoTask(BaseTask):
+    __slots__ = ("_priority",)
+
     def __init__(self, title, description, priority="low"):
         super().__init__(title, description)
+        if priority not in TODO_REWARDS:
+            raise ValueError("Priority must be low, medium, or high")
         self._priority = priority
         
+    @property
+    def priority(self):
+        return self._priority
+        
+    @priority.setter
+    def priority(self, value):
+        if value not in TODO_REWARDS:
+            raise ValueError("Priority must be low, medium, or high")
+        old = self._priority
+        self._priority = value
+        self._mark_dirty("_priority", old)
+        
     def calculate_reward(self):
-        rewards = {"low": 3, "medium": 5, "high": 7}
-        return rewards[self._priority]
+        return TODO_REWARDS[self._priority]
         
     def complete(self):
         if self._completed:
             return "already_completed"  # Return a status code instead of printing
-        self._completed = True
+        self.completed = True
         return "completed"
         return self.calculate_reward()
\ No newline at end of file
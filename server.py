@@ -0,0 +1,429 @@
+"""Multi-profile HTTP/JSON service over TaskManager and Survivor.
+
+Usage: python server.py [--host HOST] [--port PORT] [--data-dir DIR] [--max-profiles N]
+                        [--metrics]
+
+Endpoints (every profile lives in DATA_DIR/<name>.json, its completion
+history in DATA_DIR/<name>.events):
+    POST   /profiles                          {"name": ...}
+    GET    /profiles/<name>/stats
+    GET    /profiles/<name>/tasks             ?offset=&limit=&type=&priority=&completed=
+                                              &since=&until=&q=&sort=&desc=
+    POST   /profiles/<name>/tasks             {"type", "title", "description", "priority",
+                                               "due": "YYYY-MM-DD", "every": <days>}
+    POST   /profiles/<name>/tasks/complete    {"ids": [...], "outcomes": [...]}
+    POST   /profiles/<name>/tasks/<id>/complete  {"success": true}
+    DELETE /profiles/<name>/tasks/<id>
+    POST   /profiles/<name>/marketplace/purchase  {"item": <id or index>, "quantity": 1, "store": false}
+    POST   /profiles/<name>/inventory/use     {"item": <id or index>, "quantity": 1}
+    GET    /profiles/<name>/rank
+    GET    /leaderboard                       ?offset=&limit=
+    GET    /metrics                           only with --metrics, see utils.metrics
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+from collections import OrderedDict
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from models.consumables import catalog, purchase, store, use_many
+from utils.data_manager import DataManager, JsonStorage
+from utils.event_log import CompletionLog
+from utils.leaderboard import Leaderboard
+from utils import metrics
+
+PROFILE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class Profile:
+    def __init__(self, name, storage, character, task_manager):
+        self.name = name
+        self.storage = storage
+        self.character = character
+        self.task_manager = task_manager
+        self.task_manager.event_log = CompletionLog(os.path.splitext(storage.save_file)[0] + ".events")
+        self.lock = asyncio.Lock()
+        self.dirty = False
+
+    def snapshot(self):
+        # Taken under the profile lock, written to disk outside of it
+        return DataManager.serialize_game_state(self.character, self.task_manager.get_tasks(),
+                                                self.task_manager.state())
+
+class ProfileRegistry:
+    """Keeps up to max_profiles profiles in memory (least recently used
+    are evicted) and coalesces their writes into periodic saves."""
+
+    def __init__(self, data_dir, max_profiles=1000, flush_interval=2.0):
+        self.data_dir = data_dir
+        self.max_profiles = max_profiles
+        self.flush_interval = flush_interval
+        self._profiles = OrderedDict()
+        self._loading = {}
+        self._saving = {}
+        # Every profile on disk, kept current by the loaded ones
+        self.leaderboard = Leaderboard()
+        os.makedirs(data_dir, exist_ok=True)
+
+    async def build_leaderboard(self):
+        self.leaderboard = await asyncio.to_thread(Leaderboard.from_saves, self.data_dir)
+
+    def _storage(self, name):
+        return JsonStorage(os.path.join(self.data_dir, f"{name}.json"), journaled=False)
+
+    async def create(self, name):
+        if not isinstance(name, str) or not PROFILE_NAME.match(name):
+            raise HttpError(400, "Invalid profile name")
+        storage = self._storage(name)
+        if name in self._profiles or os.path.exists(storage.save_file):
+            raise HttpError(409, "Profile already exists")
+
+        profile = Profile(name, storage, Survivor(name), TaskManager())
+        profile.task_manager.roll_over(profile.character)
+        profile.dirty = True
+        await self._insert(profile)
+        return profile
+
+    async def get(self, name):
+        if not PROFILE_NAME.match(name):
+            raise HttpError(404, "Profile not found")
+        profile = self._profiles.get(name)
+        if profile is not None:
+            self._profiles.move_to_end(name)
+            return profile
+
+        # Concurrent requests for the same cold profile share one load
+        loading = self._loading.get(name)
+        if loading is None:
+            loading = self._loading[name] = asyncio.ensure_future(self._load(name))
+        try:
+            return await loading
+        finally:
+            self._loading.pop(name, None)
+
+    async def _load(self, name):
+        # An evicted profile must hit the disk before it is read back
+        pending = self._saving.get(name)
+        if pending is not None:
+            await pending
+
+        storage = self._storage(name)
+        game_state = await asyncio.to_thread(storage.load_game_state)
+        if game_state is None:
+            raise HttpError(404, "Profile not found")
+
+        task_manager = TaskManager()
+        state = game_state.get("state", {})
+        task_manager.load_tasks(game_state["tasks"], state.get("last_rollover"), state.get("schedule"))
+        profile = Profile(name, storage, DataManager.deserialize_character(game_state["character"]), task_manager)
+        await self._insert(profile)
+        return profile
+
+    def is_loaded(self, profile):
+        return self._profiles.get(profile.name) is profile
+
+    async def _insert(self, profile):
+        self._profiles[profile.name] = profile
+        self.leaderboard.track(profile.name, profile.character)
+        # Profiles in use by a request are skipped, at most one pass over
+        # the whole cache
+        for _ in range(len(self._profiles)):
+            if len(self._profiles) <= self.max_profiles:
+                break
+            name, evicted = self._profiles.popitem(last=False)
+            if evicted.lock.locked():
+                self._profiles[name] = evicted
+                continue
+            evicted.task_manager.event_log.close()
+            self.leaderboard.untrack(evicted.character)
+            await self._save(evicted)
+
+    async def _save(self, profile):
+        async with profile.lock:
+            if not profile.dirty:
+                return
+            snapshot = profile.snapshot()
+            profile.dirty = False
+            # Writes of one profile are chained so they land in order
+            previous = self._saving.get(profile.name)
+            write = asyncio.ensure_future(_write(previous, profile.storage, snapshot))
+            self._saving[profile.name] = write
+        try:
+            await write
+        finally:
+            if self._saving.get(profile.name) is write:
+                del self._saving[profile.name]
+
+    async def flush(self):
+        for profile in list(self._profiles.values()):
+            await self._save(profile)
+
+    async def run_flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+async def _write(previous, storage, snapshot):
+    if previous is not None:
+        await asyncio.wait([previous])
+    await asyncio.to_thread(storage.save_serialized, snapshot)
+
+class GameService:
+    def __init__(self, registry):
+        self.registry = registry
+
+    async def handle(self, method, path, query, body):
+        parts = [part for part in path.split("/") if part]
+        if parts == ["metrics"] and method == "GET" and metrics.enabled():
+            return 200, metrics.registry.to_dict()
+        if parts == ["leaderboard"] and method == "GET":
+            return 200, self._leaderboard(query)
+        if parts == ["profiles"] and method == "POST":
+            profile = await self.registry.create(body.get("name"))
+            return 201, self._stats(profile)
+        if len(parts) < 3 or parts[0] != "profiles":
+            raise HttpError(404, "Not found")
+
+        route = parts[2:]
+        profile = await self.registry.get(parts[1])
+        await profile.lock.acquire()
+        # The profile may have been evicted while this request waited
+        while not self.registry.is_loaded(profile):
+            profile.lock.release()
+            profile = await self.registry.get(parts[1])
+            await profile.lock.acquire()
+        try:
+            previous_rollover = profile.task_manager.last_rollover
+            profile.task_manager.roll_over(profile.character)
+            if profile.task_manager.last_rollover != previous_rollover:
+                profile.dirty = True
+            schedule = profile.task_manager.run_schedule(profile.character)
+            if schedule.expired or schedule.created:
+                profile.dirty = True
+
+            if route == ["stats"] and method == "GET":
+                return 200, self._stats(profile)
+            if route == ["rank"] and method == "GET":
+                return 200, {"rank": self.registry.leaderboard.rank(profile.name),
+                             "profiles": len(self.registry.leaderboard)}
+            if route == ["tasks"] and method == "GET":
+                return 200, self._list_tasks(profile, query)
+            if route == ["tasks"] and method == "POST":
+                return 201, self._create_task(profile, body)
+            if route == ["tasks", "complete"] and method == "POST":
+                task_ids, outcomes = body.get("ids", []), body.get("outcomes")
+                if not isinstance(task_ids, list) or not all(_is_int(task_id) for task_id in task_ids):
+                    raise HttpError(400, "ids must be a list of task IDs")
+                if outcomes is not None and not isinstance(outcomes, list):
+                    raise HttpError(400, "outcomes must be a list")
+                return 200, self._complete(profile, task_ids, outcomes)
+            if len(route) == 3 and route[0] == "tasks" and route[2] == "complete" and method == "POST":
+                return 200, self._complete(profile, [_task_id(route[1])], [body.get("success", True)])
+            if len(route) == 2 and route[0] == "tasks" and method == "DELETE":
+                if not profile.task_manager.delete_task(_task_id(route[1])):
+                    raise HttpError(404, "Task not found")
+                profile.dirty = True
+                return 200, {"deleted": True}
+            if route == ["marketplace", "purchase"] and method == "POST":
+                return 200, self._purchase(profile, body)
+            if route == ["inventory", "use"] and method == "POST":
+                return 200, self._use(profile, body)
+        finally:
+            profile.lock.release()
+        raise HttpError(404, "Not found")
+
+    def _stats(self, profile):
+        stats = DataManager.serialize_character(profile.character)
+        stats = {key.lstrip("_"): value for key, value in stats.items()}
+        stats["xp_needed"] = profile.character.calculate_xp_needed()
+        stats["inventory_capacity"] = profile.character.inventory_capacity()
+        return stats
+
+    def _leaderboard(self, query):
+        try:
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["10"])[0])
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        if offset < 0 or not 0 <= limit <= 1000:
+            raise HttpError(400, "offset must be >= 0 and limit between 0 and 1000")
+        leaderboard = self.registry.leaderboard
+        return {"profiles": len(leaderboard),
+                "standings": [standing._asdict() for standing in leaderboard.top(limit, offset)]}
+
+    def _list_tasks(self, profile, query):
+        def param(name, default=None):
+            return query.get(name, [default])[0]
+        completed = param("completed")
+        try:
+            tasks = profile.task_manager.query(
+                task_type=param("type"), priority=param("priority"),
+                completed=None if completed is None else completed.lower() in ("1", "true"),
+                completed_since=param("since"), completed_until=param("until"), search=param("q"),
+                sort=param("sort", "id"), descending=param("desc", "0").lower() in ("1", "true"),
+                offset=int(param("offset", "0")), limit=int(param("limit", "100")))
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return {"tasks": [_task_data(profile, task) for task in tasks]}
+
+    def _create_task(self, profile, body):
+        task_type = body.get("type", "todo")
+        priority = body.get("priority", "low")
+        if task_type not in ("todo", "daily") or priority not in ("low", "medium", "high"):
+            raise HttpError(400, "Invalid task type or priority")
+        every, due = body.get("every"), body.get("due")
+        if (every is not None or due is not None) and task_type != "todo":
+            raise HttpError(400, "Only todos can have a deadline or repeat")
+        if every is not None and (not _is_int(every) or every < 1):
+            raise HttpError(400, "every must be a number of days")
+        due = None if due is None else date.fromisoformat(str(due))
+
+        task_manager = profile.task_manager
+        title, description = body.get("title", ""), body.get("description", "")
+        if not isinstance(title, str) or not isinstance(description, str):
+            raise HttpError(400, "title and description must be strings")
+        if every is not None:
+            task_id = task_manager.add_recurring_task(title, description, priority, every)
+        else:
+            task_id = task_manager.create_task(task_type, title, description, priority)
+        if task_id is None:
+            raise HttpError(400, "Title is required")
+        if due is not None and every is None:
+            task_manager.set_deadline(task_id, due)
+        profile.dirty = True
+        return _task_data(profile, task_manager.get_task(task_id))
+
+    def _complete(self, profile, task_ids, outcomes):
+        try:
+            report = profile.task_manager.complete_many(task_ids, profile.character, outcomes)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        profile.dirty = True
+        return {
+            "results": [result._asdict() for result in report.results],
+            "xp_gained": report.xp_gained,
+            "health_change": report.health_change,
+            "levels_gained": report.levels_gained,
+        }
+
+    def _purchase(self, profile, body):
+        item_id, quantity = _item_choice(body)
+        buy = store if body.get("store") else purchase
+        result = buy(profile.character, item_id, quantity)
+        if result.status in ("used", "stored"):
+            profile.dirty = True
+        return {**result._asdict(), "stats": self._stats(profile)}
+
+    def _use(self, profile, body):
+        item_id, quantity = _item_choice(body)
+        result = use_many(profile.character, item_id, quantity)
+        if result.status == "used":
+            profile.dirty = True
+        return {**result._asdict(), "stats": self._stats(profile)}
+
+def _item_choice(body):
+    item_ids = list(catalog())
+    choice = body.get("item")
+    if isinstance(choice, int) and 0 <= choice < len(item_ids):
+        choice = item_ids[choice]
+    quantity = body.get("quantity", 1)
+    if choice not in item_ids or not isinstance(quantity, int):
+        raise HttpError(400, "Invalid item")
+    return choice, quantity
+
+def _task_data(profile, task):
+    task_data = DataManager.serialize_task(task)
+    task_data["due"] = profile.task_manager.deadline(task._id)
+    return task_data
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _task_id(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(404, "Task not found")
+
+async def _handle_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            raw_body = await reader.readexactly(length) if length else b""
+
+            url = urlsplit(target)
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+                if not isinstance(body, dict):
+                    raise HttpError(400, "Body must be a JSON object")
+                status, payload = await service.handle(method, url.path, parse_qs(url.query), body)
+            except HttpError as e:
+                status, payload = e.status, {"error": e.message}
+            except (ValueError, json.JSONDecodeError):
+                status, payload = 400, {"error": "Invalid request"}
+
+            data = json.dumps(payload).encode()
+            writer.write(f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                         f"Content-Type: application/json\r\n"
+                         f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host="127.0.0.1", port=8080, data_dir="profiles", max_profiles=1000):
+    registry = ProfileRegistry(data_dir, max_profiles)
+    await registry.build_leaderboard()
+    service = GameService(registry)
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port)
+    flusher = asyncio.ensure_future(registry.run_flusher())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        await registry.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-Apocalyptic RPG To-Do List service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="profiles")
+    parser.add_argument("--max-profiles", type=int, default=1000)
+    parser.add_argument("--metrics", action="store_true", help="instrument hot paths and serve GET /metrics")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.max_profiles))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+# Modules import each other as models.x and utils.x from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_manager import DataManager, JsonStorage
+
+@pytest.fixture
+def storage(tmp_path):
+    """A journaled JSON save in tmp_path, installed as DataManager's
+    storage for the test."""
+    previous = DataManager.storage
+    storage = JsonStorage(str(tmp_path / "gamestate.json"))
+    DataManager.storage = storage
+    yield storage
+    storage.close()
+    DataManager.storage = previous
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+import pytest
+from models.daily_task import DailyTask
+from models.todo_task import TodoTask
+from utils.event_log import CompletionLog
+
+pytest.importorskip("numpy")
+analytics = pytest.importorskip("utils.analytics")
+
+DAY = date(2026, 3, 2)  # A Monday
+
+def at(day_offset):
+    return datetime(2026, 3, 2 + day_offset, 12).timestamp()
+
+def task(cls, task_id, *args):
+    task = cls(f"task {task_id}", "", *args)
+    task._id = task_id
+    return task
+
+@pytest.fixture
+def logs(tmp_path):
+    first, second = str(tmp_path / "a.events"), str(tmp_path / "b.events")
+    log = CompletionLog(first)
+    log.append(task(TodoTask, 1, "high"), 7, when=at(0))
+    log.append(task(DailyTask, 2), 10, when=at(0))
+    log.append(task(DailyTask, 2), -5, success=False, when=at(1))
+    log.append(task(DailyTask, 2), 10, when=at(8))
+    log.close()
+    log = CompletionLog(second)
+    log.append(task(DailyTask, 2), -5, success=False, when=at(1))
+    log.close()
+    return first, second
+
+def test_completion_rates(logs):
+    events, _ = analytics.load_events(logs[0])
+    assert analytics.completion_rates(events) == {
+        ("todo", "high"): {"completions": 1, "successes": 1, "failure_rate": 0.0},
+        ("daily", None): {"completions": 3, "successes": 2, "failure_rate": pytest.approx(1 / 3)},
+    }
+
+def test_daily_and_weekly_rollups(logs):
+    events, _ = analytics.load_events(logs[0])
+    daily = analytics.daily_rollup(events)
+    assert daily["start_day"].tolist() == [DAY.toordinal(), DAY.toordinal() + 1, DAY.toordinal() + 8]
+    assert daily["completions"].tolist() == [2, 1, 1]
+    assert daily["xp"].tolist() == [17, 0, 10]
+    assert daily["health_lost"].tolist() == [0, 5, 0]
+    weekly = analytics.weekly_rollup(events)
+    assert weekly["start_day"].tolist() == [DAY.toordinal(), DAY.toordinal() + 7]
+    assert weekly["successes"].tolist() == [2, 1]
+    days, xp = analytics.xp_curve(events)
+    assert xp.tolist() == [17, 17, 27]
+
+def test_failure_rates_by_task_keep_profiles_apart(logs):
+    events, profiles = analytics.load_events(*logs)
+    owners, task_ids, completions, failure_rates = analytics.failure_rates_by_task(events, profiles)
+    assert owners.tolist() == [0, 1] and task_ids.tolist() == [2, 2]
+    assert completions.tolist() == [3, 1]
+    assert failure_rates.tolist() == pytest.approx([1 / 3, 1.0])
+
+def test_no_logs_means_no_events():
+    events, profiles = analytics.load_events()
+    assert len(events) == 0 and len(profiles) == 0
+    assert analytics.daily_rollup(events)["completions"].tolist() == []
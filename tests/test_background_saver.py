@@ -0,0 +1,25 @@
+import pytest
+from utils.background_saver import BackgroundSaver
+
+def test_close_raises_failed_save():
+    def save():
+        raise OSError("disk full")
+    saver = BackgroundSaver(save, delay=0)
+    saver.mark_dirty()
+    with pytest.raises(OSError, match="disk full"):
+        saver.close()
+    assert not saver._thread.is_alive()
+
+def test_later_save_clears_error():
+    calls = []
+    def save():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("disk full")
+    saver = BackgroundSaver(save, delay=0)
+    saver.mark_dirty()
+    with pytest.raises(OSError):
+        saver.flush()
+    saver.mark_dirty()
+    saver.close()
+    assert saver.error is None and len(calls) == 2
@@ -0,0 +1,60 @@
+import pytest
+from models.task_manager import TaskManager
+from utils.binary_format import BinarySave, BinaryStorage, VERSION, write_binary
+
+STATE = {"last_rollover": "2026-10-17"}
+
+def sample_state():
+    return {
+        "character": {"_name": "Tester", "_level": 2, "_xp": 40, "_health": 100, "_hunger": 100,
+                      "_thirst": 100, "_infection": 0, "_inventory": {"water": 2, "bandage": 1}},
+        "tasks": [{"_id": 3, "_title": "Scout", "_description": "", "_completed": False, "_priority": "high"},
+                  {"_id": 7, "_title": "Stretch", "_description": "Every morning", "_completed": True,
+                   "last_completion_date": "2026-10-17", "was_successful": True, "streak": 4,
+                   "best_streak": 9, "history": 0b1011}],
+        "state": STATE,
+    }
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "gamestate.bin")
+    game_state = sample_state()
+    write_binary(game_state, path)
+    storage = BinaryStorage(path)
+    loaded = storage.load_game_state()
+    assert loaded["character"] == game_state["character"]
+    assert list(loaded["tasks"]) == game_state["tasks"]
+    assert loaded["tasks"][1] == game_state["tasks"][1]
+    assert loaded["state"] == STATE
+    storage.close()
+
+def test_rejects_other_versions(tmp_path):
+    path = tmp_path / "gamestate.bin"
+    write_binary(sample_state(), str(path))
+    data = bytearray(path.read_bytes())
+    data[4:6] = (VERSION + 1).to_bytes(2, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version"):
+        BinarySave(str(path))
+
+def test_close_unmaps_the_save(tmp_path):
+    storage = BinaryStorage(str(tmp_path / "gamestate.bin"))
+    write_binary(sample_state(), storage.save_file)
+    game_state = storage.load_game_state()
+    mapping = storage._save._map
+    TaskManager().load_tasks(game_state["tasks"])
+    storage.close()
+    assert mapping.closed
+
+def test_save_over_the_loaded_file(tmp_path):
+    storage = BinaryStorage(str(tmp_path / "gamestate.bin"))
+    write_binary(sample_state(), storage.save_file)
+    game_state = storage.load_game_state()
+    mapping = storage._save._map
+    game_state["character"]["_xp"] = 55
+    storage.save_serialized(game_state)
+    assert mapping.closed
+
+    reloaded = storage.load_game_state()
+    assert reloaded["character"]["_xp"] == 55
+    assert list(reloaded["tasks"]) == sample_state()["tasks"]
+    storage.close()
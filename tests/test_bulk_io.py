@@ -0,0 +1,50 @@
+import json
+import pytest
+from utils import bulk_io
+
+CSV = """title,type,description,priority
+Scavenge,todo,north side,high
+Stretch,daily,,
+,todo,no title,low
+Barricade,todo,,urgent
+Boil water,,,
+"""
+
+@pytest.fixture
+def save_file(tmp_path, storage, request):
+    # storage puts DataManager's engine back after the test
+    return str(tmp_path / f"save.{request.param}")
+
+def export(save_file, path, *args):
+    assert bulk_io.main(["export", str(path), "--save", save_file, *args]) == 0
+    if str(path).endswith(".jsonl"):
+        return [json.loads(line) for line in path.read_text().splitlines()]
+    return path.read_text().splitlines()
+
+@pytest.mark.parametrize("save_file", ["json", "db", "bin"], indirect=True)
+def test_import_then_export_round_trip(save_file, tmp_path, capsys):
+    source = tmp_path / "tasks.csv"
+    source.write_text(CSV)
+    assert bulk_io.main(["import", str(source), "--save", save_file, "--chunk-size", "2"]) == 0
+    output = capsys.readouterr()
+    assert "Imported 3 task(s), rejected 2 row(s)." in output.out
+    assert "tasks.csv:4: title is required" in output.err
+    assert "tasks.csv:5: unknown priority 'urgent'" in output.err
+
+    rows = export(save_file, tmp_path / "out.jsonl")
+    assert [(row["id"], row["type"], row["title"], row["priority"]) for row in rows] == [
+        (1, "todo", "Scavenge", "high"), (2, "daily", "Stretch", None), (3, "todo", "Boil water", "low")]
+    assert rows[0]["description"] == "north side" and rows[1]["streak"] == 0
+
+    lines = export(save_file, tmp_path / "out.csv")
+    assert lines[0] == ",".join(bulk_io.EXPORT_COLUMNS) and len(lines) == 4
+
+@pytest.mark.parametrize("save_file", ["json", "db"], indirect=True)
+def test_filtered_and_paged_export(save_file, tmp_path):
+    source = tmp_path / "tasks.jsonl"
+    source.write_text("\n".join(json.dumps({"title": f"task {i}", "priority": ["low", "high"][i % 2]})
+                                for i in range(10)) + "\n{not json\n")
+    bulk_io.main(["import", str(source), "--save", save_file])
+    rows = export(save_file, tmp_path / "out.jsonl", "--priority", "high", "--offset", "1", "--limit", "2")
+    assert [row["title"] for row in rows] == ["task 3", "task 5"]
+    assert export(save_file, tmp_path / "out.jsonl", "--type", "daily") == []
@@ -0,0 +1,30 @@
+import pickle
+import pytest
+from models.survivor import Survivor
+from models.todo_task import TodoTask
+
+def tracked(obj):
+    changes = []
+    obj._tracker = lambda changed, field, old: changes.append((changed, field, old))
+    return changes
+
+@pytest.mark.parametrize("obj, field, value", [
+    (Survivor("me"), "health", 40),
+    (TodoTask("Scavenge", ""), "title", "Scavenge food"),
+])
+def test_tracker_gets_old_value_and_dirty_set_is_lazy(obj, field, value):
+    assert obj._dirty_fields is None and obj.dirty_fields == set()
+    changes = tracked(obj)
+    old = getattr(obj, field)
+    setattr(obj, field, value)
+    assert changes == [(obj, "_" + field, old)]
+    assert obj.dirty_fields == {"_" + field}
+    obj.clear_dirty()
+    assert obj._dirty_fields is None
+
+def test_pickled_character_drops_tracker():
+    character = Survivor("me")
+    tracked(character)
+    character.xp = 5
+    copy = pickle.loads(pickle.dumps(character))
+    assert copy._tracker is None and copy.dirty_fields == {"_xp"}
@@ -0,0 +1,51 @@
+from models.consumables import Food, catalog, purchase, store, use_many
+from models.rules import MAX_STAT
+from models.survivor import Survivor
+
+def character_with(xp, **stats):
+    character = Survivor("me")
+    character.xp = xp
+    for stat, value in stats.items():
+        setattr(character, stat, value)
+    return character
+
+def test_purchase_is_cut_to_affordable_and_useful_units():
+    character = character_with(100, hunger=50)
+    # 50 hunger headroom fits two 20-point rations out of five asked for
+    assert purchase(character, "food_ration", 5) == ("used", 2, 20)
+    assert (character.xp, character.hunger) == (80, 90)
+    character = character_with(16, thirst=0)
+    assert purchase(character, "water_bottle", 5) == ("used", 2, 16)
+    assert (character.xp, character.thirst) == (0, 30)
+
+def test_purchase_refusals_leave_the_character_alone():
+    character = character_with(100)
+    assert purchase(character, "food_ration") == ("not_hungry", 0, 0)
+    assert purchase(character, "medkit") == ("not_infected", 0, 0)
+    assert purchase(character, "nothing") == ("unknown_item", 0, 0)
+    assert purchase(character, "food_ration", 0) == ("invalid_quantity", 0, 0)
+    assert purchase(character_with(5, hunger=0), "food_ration") == ("not_enough_xp", 0, 0)
+    assert (character.xp, character.hunger) == (100, MAX_STAT)
+
+def test_catalog_is_loaded_once_and_shared():
+    assert catalog() is catalog()
+    assert isinstance(catalog()["food_ration"], Food)
+
+def test_store_is_cut_to_free_inventory_room():
+    character = character_with(1000)
+    room = character.inventory_capacity()
+    assert store(character, "food_ration", room - 2) == ("stored", room - 2, (room - 2) * 10)
+    assert store(character, "medkit", 5) == ("stored", 2, 30)
+    assert character.inventory == {"food_ration": room - 2, "medkit": 2}
+    assert store(character, "water_bottle") == ("inventory_full", 0, 0)
+
+def test_use_many_applies_held_units_in_one_change():
+    character = character_with(1000, hunger=10)
+    store(character, "food_ration", 6)
+    character.clear_dirty()
+    # 90 hunger headroom fits four 20-point rations
+    assert use_many(character, "food_ration", 6) == ("used", 4)
+    assert character.hunger == 90 and character.inventory == {"food_ration": 2}
+    assert character.dirty_fields == {"_hunger", "_inventory"}
+    assert use_many(character, "food_ration") == ("not_hungry", 0)
+    assert use_many(character, "medkit") == ("not_in_inventory", 0)
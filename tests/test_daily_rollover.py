@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from models.daily_rollover import DailyRollover
+from models.daily_task import DailyTask
+
+DAY = date(2026, 3, 2)
+
+def daily(task_id, completed_on=None):
+    task = DailyTask(f"task {task_id}")
+    task._id = task_id
+    if completed_on is not None:
+        task._completed = True
+        task._last_completion_date = completed_on.strftime("%Y-%m-%d")
+    return task
+
+def test_catching_up_counts_missed_days_per_task():
+    rollover = DailyRollover(DAY.strftime("%Y-%m-%d"))
+    tasks = {1: daily(1, DAY), 2: daily(2), 3: daily(3, DAY - timedelta(days=1))}
+    for task in tasks.values():
+        rollover.track(task, today=DAY)
+    changed, missed = rollover.roll_over(tasks, DAY + timedelta(days=3))
+    # Task 1 was done on DAY, the others have been pending since DAY
+    assert sorted(task.id for task in changed) == [1, 3]
+    assert missed == 2 + 3 + 3
+    assert not any(task.completed for task in tasks.values())
+    assert rollover.last_rollover == "2026-03-05"
+
+def test_only_due_buckets_are_touched():
+    rollover = DailyRollover(DAY.strftime("%Y-%m-%d"))
+    tasks = {1: daily(1, DAY), 2: daily(2, DAY + timedelta(days=4))}
+    for task in tasks.values():
+        rollover.track(task, today=DAY)
+    changed, missed = rollover.roll_over(tasks, DAY + timedelta(days=1))
+    assert [task.id for task in changed] == [1] and missed == 0
+    assert tasks[2].completed
+    assert rollover.roll_over(tasks, DAY + timedelta(days=1)) == ([], 0)
+
+def test_completion_and_untrack_move_tasks_between_buckets():
+    rollover = DailyRollover(DAY.strftime("%Y-%m-%d"))
+    tasks = {1: daily(1), 2: daily(2)}
+    for task in tasks.values():
+        rollover.track(task, today=DAY)
+    tasks[1]._completed = True
+    tasks[1]._last_completion_date = (DAY + timedelta(days=1)).strftime("%Y-%m-%d")
+    rollover.mark_completed(tasks[1])
+    rollover.untrack(2)
+    changed, missed = rollover.roll_over(tasks, DAY + timedelta(days=2))
+    assert [task.id for task in changed] == [1] and missed == 0
+
+def test_without_a_recorded_rollover_nothing_counts_as_missed():
+    rollover = DailyRollover()
+    tasks = {1: daily(1, DAY - timedelta(days=10)), 2: daily(2)}
+    for task in tasks.values():
+        rollover.track(task, today=DAY)
+    changed, missed = rollover.roll_over(tasks, DAY)
+    assert [task.id for task in changed] == [1] and missed == 0
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+from models.daily_task import DailyTask
+
+def test_complete_after_future_last_completion():
+    task = DailyTask("Water the plants")
+    task.last_completion_date = (date.today() + timedelta(days=3)).strftime("%Y-%m-%d")
+    task.streak = 4
+    task.history = 0b101
+
+    assert task.complete(True) == "completed"
+    assert task.streak == 4
+    assert task.history == 0b101
+    assert task.last_completion_date == date.today().strftime("%Y-%m-%d")
+
+def test_streak_counts_consecutive_days():
+    task = DailyTask("Stretch")
+    task.last_completion_date = (date.today() - timedelta(days=1)).strftime("%Y-%m-%d")
+    task.streak = 2
+    task.history = 0b11
+    task.complete(True)
+    assert (task.streak, task.history) == (3, 0b111)
+
+def test_failure_after_success_on_the_same_day_clears_the_day():
+    task = DailyTask("Stretch")
+    task.complete(True)
+    task.completed = False
+    task.complete(False)
+    assert (task.streak, task.history) == (0, 0)
+    assert not task.succeeded_on(date.today())
@@ -0,0 +1,170 @@
+import os
+import json
+from datetime import date
+import pytest
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils.data_manager import DataManager, JsonStorage
+from utils.sqlite_storage import SqliteStorage
+from utils.undo_history import UndoHistory
+
+@pytest.fixture(params=["json", "sqlite"])
+def engine(request, tmp_path):
+    """Each journaled storage engine, installed as DataManager's storage,
+    and a function opening its save afresh."""
+    if request.param == "json":
+        def open_storage():
+            return JsonStorage(str(tmp_path / "gamestate.json"))
+    else:
+        def open_storage():
+            return SqliteStorage(str(tmp_path / "gamestate.db"))
+    previous = DataManager.storage
+    DataManager.storage = open_storage()
+    yield open_storage
+    DataManager.storage.close()
+    DataManager.storage = previous
+
+def reload(open_storage):
+    DataManager.storage.close()
+    storage = open_storage()
+    game_state = storage.load_game_state()
+    storage.close()
+    task_manager = TaskManager()
+    task_manager.load_tasks(game_state["tasks"], schedule=game_state["state"].get("schedule"))
+    return task_manager
+
+def test_deadline_changes_are_journaled_per_task(storage):
+    character = Survivor("Tester")
+    task_manager = TaskManager()
+    for title in ("one", "two", "three"):
+        task_manager.set_deadline(task_manager.create_task("todo", title, ""), date(2026, 10, 20))
+    DataManager.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+    task_manager.pop_changes()
+
+    task_manager.set_deadline(2, date(2026, 10, 25))
+    task_manager.complete_many([3], character)
+    DataManager.save_changes(character, task_manager)
+
+    with open(storage.journal_file) as f:
+        records = [json.loads(line) for line in f]
+    assert [(record["id"], record["due"]) for record in records if record["op"] == "deadline"] == \
+        [(2, "2026-10-25"), (3, None)]
+    assert not any(record["op"] in ("state", "rules") for record in records)
+
+def test_schedule_reloads_after_reset_and_undo(engine):
+    character = Survivor("Tester")
+    task_manager = TaskManager()
+    history = UndoHistory(task_manager, character)
+    task_id = task_manager.create_task("todo", "Boil water", "")
+    task_manager.set_deadline(task_id, date(2026, 10, 20))
+    task_manager.add_recurring_task("Scout", "", every_days=3, today=date(2026, 10, 18))
+    history.commit("set up")
+    DataManager.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+    task_manager.pop_changes()
+    schedule = task_manager.state()["schedule"]
+
+    task_manager.clear_tasks()
+    history.commit("reset")
+    DataManager.save_changes(character, task_manager)
+    assert reload(engine).state()["schedule"] == {"deadlines": {}, "rules": [], "next_rule_id": 2}
+
+    history.undo()
+    DataManager.save_changes(character, task_manager)
+    assert reload(engine).state()["schedule"] == schedule
+
+def saved(storage):
+    """The game state a fresh JsonStorage reads from storage's files."""
+    return JsonStorage(storage.save_file).load_game_state()
+
+def serialized(task_manager):
+    return [DataManager.serialize_task(task) for task in task_manager.get_tasks()]
+
+def journaled_session(storage):
+    """Creates, a delete, a re-create of the deleted task by undo, an
+    update and a new task, all saved as journal records after a snapshot."""
+    character = Survivor("Tester")
+    task_manager = TaskManager()
+    history = UndoHistory(task_manager, character)
+    DataManager.save_game_state(character, [], task_manager.state())
+    for title in ("one", "two", "three"):
+        task_manager.create_task("todo", title, "")
+    history.commit("create")
+    DataManager.save_changes(character, task_manager)
+    task_manager.delete_task(2)
+    history.commit("delete")
+    DataManager.save_changes(character, task_manager)
+    history.undo()
+    DataManager.save_changes(character, task_manager)
+    task_manager.get_task(3).title = "three, renamed"
+    task_manager.create_task("daily", "four", "")
+    character.xp += 5
+    DataManager.save_changes(character, task_manager)
+    return character, task_manager
+
+def test_journal_replays_creates_deletes_and_recreates(storage):
+    character, task_manager = journaled_session(storage)
+    game_state = saved(storage)
+    assert game_state["tasks"] == serialized(task_manager)
+    assert game_state["character"]["_xp"] == character.xp
+    assert game_state["journal_seq"] == storage._journal_seq
+
+def test_compaction_folds_journal_into_snapshot(storage):
+    character, task_manager = journaled_session(storage)
+    storage.compact_journal()
+    assert not os.path.exists(storage.journal_file)
+    with open(storage.save_file) as f:
+        assert json.load(f)["tasks"] == serialized(task_manager)
+
+    # Records after compaction keep their sequence numbers going
+    task_manager.delete_task(1)
+    DataManager.save_changes(character, task_manager)
+    assert saved(storage)["tasks"] == serialized(task_manager)
+
+def test_interrupted_save_applies_nothing_twice(storage):
+    character, task_manager = journaled_session(storage)
+    # Killed after writing a whole save but before removing the journal
+    # it replaces; replaying "create" for task 1 would bring it back
+    task_manager.delete_task(1)
+    task_manager.pop_changes()
+    game_state = DataManager.serialize_game_state(character, task_manager.get_tasks(), task_manager.state())
+    game_state["journal_seq"] = storage._journal_seq
+    storage._write_snapshot(game_state)
+    assert saved(storage)["tasks"] == serialized(task_manager)
+
+    # The same when the leftover journal was being compacted
+    os.replace(storage.journal_file, storage._compacting_file())
+    task_manager.create_task("todo", "five", "")
+    DataManager.save_changes(character, task_manager)
+    assert saved(storage)["tasks"] == serialized(task_manager)
+    storage.compact_journal()
+    assert not os.path.exists(storage._compacting_file())
+    assert saved(storage)["tasks"] == serialized(task_manager)
+
+def test_torn_journal_record_is_ignored(storage):
+    character, task_manager = journaled_session(storage)
+    with open(storage.journal_file, "a") as f:
+        f.write('{"seq": 999, "op": "delete", "i')
+    assert saved(storage)["tasks"] == serialized(task_manager)
+
+def test_load_tasks_pages_filtered_records(engine):
+    character = Survivor("Tester")
+    task_manager = TaskManager()
+    for i in range(12):
+        task_manager.create_task("todo" if i % 3 else "daily", f"task {i}", "", "high" if i % 2 else "low")
+    task_manager.complete_task(1, character)
+    task_manager.complete_task(6, character)
+    DataManager.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+
+    storage = DataManager.storage
+    assert [task["_id"] for task in storage.load_tasks(task_type="todo", priority="high")] == [2, 6, 8, 12]
+    assert [task["_id"] for task in storage.load_tasks(task_type="todo", offset=2, limit=3)] == [5, 6, 8]
+    assert [task["_id"] for task in DataManager.load_tasks(completed=True)] == [1, 6]
+    assert [task["_id"] for task in storage.load_tasks(completed_since="2000-01-01")] == [1]
+    assert storage.load_tasks(completed_until="2000-01-01") == []
+
+def test_sqlite_filters_use_indexes(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "gamestate.db"))
+    plan = " ".join(row[-1] for row in storage._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE priority = ? ORDER BY id", ("high",)))
+    assert "idx_tasks_priority" in plan
+    storage.close()
@@ -0,0 +1,33 @@
+from models.survivor import Survivor
+from utils.data_manager import JsonStorage
+from utils.leaderboard import Leaderboard, main
+
+def test_ranks_by_level_then_xp_then_name():
+    leaderboard = Leaderboard.from_profiles([("b", 2, 70), ("a", 2, 70), ("c", 3, 0), ("d", 1, 10)])
+    assert [standing.name for standing in leaderboard.top(10)] == ["c", "a", "b", "d"]
+    assert leaderboard.rank("d") == 4
+    assert [standing.rank for standing in leaderboard.top(2, offset=1)] == [2, 3]
+
+def test_tracked_character_moves_up():
+    leaderboard = Leaderboard.from_profiles([("a", 2, 60), ("b", 1, 30)])
+    character = Survivor("me")
+    leaderboard.track("me", character)
+    assert leaderboard.rank("me") == 3
+    character.apply_xp(100)
+    assert leaderboard.rank("me") == 1
+    leaderboard.untrack(character)
+    character.level = 1
+    assert leaderboard.rank("me") == 1
+    leaderboard.remove("me")
+    assert leaderboard.rank("me") is None and len(leaderboard) == 2
+
+def test_from_saves_reads_every_json_profile(tmp_path, capsys):
+    for name, xp in (("ann", 0), ("bob", 200)):
+        character = Survivor(name)
+        character.apply_xp(xp)
+        JsonStorage(str(tmp_path / f"{name}.json")).save_game_state(character, [])
+    (tmp_path / "notes.txt").write_text("not a save")
+    leaderboard = Leaderboard.from_saves(str(tmp_path))
+    assert [standing.name for standing in leaderboard.top()] == ["bob", "ann"]
+    assert main([str(tmp_path), "--rank", "ann"]) == 0
+    assert "ann: rank 2" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import json
+import time
+import pytest
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils import metrics
+from utils.data_manager import DataManager
+
+@pytest.fixture
+def registry():
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.disable()
+    metrics.registry.reset()
+
+def test_disabled_metrics_change_nothing(registry):
+    original = TaskManager.create_task
+    with metrics.timer("menu.add"):
+        TaskManager().create_task("todo", "a", "")
+    assert TaskManager.create_task is original
+    assert registry.to_dict() == {"calls": {}, "bytes": {}}
+
+def test_enable_times_calls_and_disable_restores(registry):
+    original = TaskManager.create_task
+    serialize = vars(DataManager)["serialize_game_state"]
+    metrics.enable()
+    TaskManager().create_task("todo", "a", "")
+    DataManager.serialize_game_state(Survivor("me"), [])
+    metrics.disable()
+    calls = registry.to_dict()["calls"]
+    assert calls["TaskManager.create_task"]["count"] == 1
+    assert calls["DataManager.serialize_game_state"]["count"] == 1
+    assert TaskManager.create_task is original
+    assert vars(DataManager)["serialize_game_state"] is serialize
+
+def test_menu_step_timer_leaves_out_waiting(registry):
+    metrics.enable()
+    with metrics.timer("menu.add"):
+        with metrics.waiting():
+            time.sleep(0.05)
+    histogram = registry.calls["menu.add"]
+    assert histogram.count == 1 and histogram.total < 0.05
+
+def test_session_writes_prometheus_and_json(registry, tmp_path):
+    for name in ("metrics.prom", "metrics.json"):
+        with metrics.session(str(tmp_path / name)):
+            TaskManager().create_task("todo", "a", "")
+        assert not metrics.enabled()
+    assert 'rpg_call_seconds_count{op="TaskManager.create_task"} 1' in (tmp_path / "metrics.prom").read_text()
+    written = json.loads((tmp_path / "metrics.json").read_text())
+    assert written["calls"]["TaskManager.create_task"]["count"] == 2
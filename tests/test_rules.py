@@ -0,0 +1,21 @@
+from models.rules import MAX_HEALTH, level_for_xp, xp_needed
+from models.survivor import Survivor
+
+def reference_level(xp):
+    # Level up one step at a time while XP covers the current threshold
+    level = 1
+    while xp >= xp_needed(level):
+        level += 1
+    return level
+
+def test_level_for_xp_matches_levelling_step_by_step():
+    for xp in range(0, 2000):
+        assert level_for_xp(xp) == reference_level(xp), xp
+
+def test_apply_xp_jumps_several_levels_at_once():
+    character = Survivor("me")
+    character.health = 1
+    assert character.apply_xp(xp_needed(8)) == 8
+    assert character.level == 9
+    assert character.health == MAX_HEALTH
+    assert character.apply_xp(1) == 0
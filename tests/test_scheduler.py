@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+from models.scheduler import Scheduler
+
+DAY = date(2026, 3, 2)
+
+def test_deadline_expires_the_day_after_it_is_due():
+    scheduler = Scheduler()
+    scheduler.set_deadline(1, DAY)
+    scheduler.set_deadline(2, DAY + timedelta(days=5))
+    assert scheduler.due(DAY) == ([], [])
+    assert scheduler.due(DAY + timedelta(days=1)) == ([1], [])
+    assert scheduler.deadline(1) is None and scheduler.deadline(2) == "2026-03-07"
+
+def test_moved_or_cancelled_deadline_does_not_expire():
+    scheduler = Scheduler()
+    scheduler.set_deadline(1, DAY)
+    scheduler.set_deadline(1, DAY + timedelta(days=3))
+    scheduler.set_deadline(2, DAY)
+    scheduler.cancel_deadline(2)
+    assert scheduler.due(DAY + timedelta(days=1)) == ([], [])
+    assert scheduler.due(DAY + timedelta(days=4)) == ([1], [])
+
+def test_recurrence_fires_once_for_the_latest_missed_day():
+    scheduler = Scheduler()
+    rule_id = scheduler.add_rule("Water", "", "low", 3, DAY)
+    (rule, day), = scheduler.due(DAY)[1]
+    assert (rule.rule_id, day, rule.next_day) == (rule_id, DAY.toordinal(), DAY.toordinal() + 3)
+    (rule, day), = scheduler.due(DAY + timedelta(days=10))[1]
+    assert day == DAY.toordinal() + 9 and rule.next_day == DAY.toordinal() + 12
+    assert scheduler.due(DAY + timedelta(days=11)) == ([], [])
+    scheduler.remove_rule(rule_id)
+    assert scheduler.due(DAY + timedelta(days=30)) == ([], [])
+
+def test_stale_entries_are_compacted():
+    scheduler = Scheduler()
+    scheduler.add_rule("Water", "", "low", 1, DAY)
+    for offset in range(1000):
+        scheduler.set_deadline(offset % 10, DAY + timedelta(days=offset))
+    assert len(scheduler._heap) <= 2 * 11
+    expired, fired = scheduler.due(DAY + timedelta(days=2000))
+    assert sorted(expired) == list(range(10)) and len(fired) == 1
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import pytest
+from server import GameService, HttpError, ProfileRegistry, _handle_connection
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+@pytest.fixture
+def service(tmp_path):
+    service = GameService(ProfileRegistry(str(tmp_path)))
+    run(service.handle("POST", "/profiles", {}, {"name": "ann"}))
+    return service
+
+def test_create_and_complete_tasks(service):
+    status, task = run(service.handle("POST", "/profiles/ann/tasks", {}, {"title": "Boil water",
+                                                                          "priority": "high"}))
+    assert status == 201 and task["_title"] == "Boil water"
+    status, report = run(service.handle("POST", "/profiles/ann/tasks/complete", {}, {"ids": [task["_id"], 99]}))
+    assert [result["status"] for result in report["results"]] == ["completed", "invalid_id"]
+    assert report["xp_gained"] > 0
+    status, page = run(service.handle("GET", "/profiles/ann/tasks", {"completed": ["1"]}, {}))
+    assert [task_data["_title"] for task_data in page["tasks"]] == ["Boil water"]
+
+@pytest.mark.parametrize("path, body", [
+    ("/profiles", {"name": 5}),
+    ("/profiles/ann/tasks", {"title": 5}),
+    ("/profiles/ann/tasks", {"title": "Scout", "description": ["x"]}),
+    ("/profiles/ann/tasks", {"title": "Scout", "every": True}),
+    ("/profiles/ann/tasks/complete", {"ids": [[1]]}),
+    ("/profiles/ann/tasks/complete", {"ids": 1}),
+    ("/profiles/ann/tasks/complete", {"ids": [1], "outcomes": True}),
+    ("/profiles/ann/tasks/complete", {"ids": [1], "outcomes": [True, False]}),
+])
+def test_bad_bodies_are_rejected(service, path, body):
+    with pytest.raises(HttpError) as error:
+        run(service.handle("POST", path, {}, body))
+    assert error.value.status == 400
+
+def test_bad_body_gets_a_response(service):
+    async def request():
+        server = await asyncio.start_server(
+            lambda reader, writer: _handle_connection(service, reader, writer), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"title": 5}).encode()
+            writer.write(b"POST /profiles/ann/tasks HTTP/1.1\r\nConnection: close\r\n"
+                         b"Content-Length: %d\r\n\r\n" % len(body) + body)
+            response = await reader.read()
+            writer.close()
+            return response
+    assert run(request()).startswith(b"HTTP/1.1 400")
+
+def test_rank_follows_completions(service):
+    run(service.handle("POST", "/profiles", {}, {"name": "bob"}))
+    status, task = run(service.handle("POST", "/profiles/bob/tasks", {}, {"title": "Scout", "priority": "high"}))
+    run(service.handle("POST", "/profiles/bob/tasks/complete", {}, {"ids": [task["_id"]]}))
+    assert run(service.handle("GET", "/profiles/bob/rank", {}, {})) == (200, {"rank": 1, "profiles": 2})
+    assert run(service.handle("GET", "/profiles/ann/rank", {}, {})) == (200, {"rank": 2, "profiles": 2})
+    status, page = run(service.handle("GET", "/leaderboard", {"offset": ["1"], "limit": ["5"]}, {}))
+    assert page == {"profiles": 2, "standings": [{"rank": 2, "name": "ann", "level": 1, "xp": 0}]}
+    with pytest.raises(HttpError) as error:
+        run(service.handle("GET", "/leaderboard", {"limit": ["x"]}, {}))
+    assert error.value.status == 400
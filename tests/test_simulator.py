@@ -0,0 +1,39 @@
+import argparse
+import pytest
+import models.rules as rules
+
+np = pytest.importorskip("numpy")
+simulator = pytest.importorskip("utils.simulator")
+
+def test_same_seed_gives_the_same_run():
+    first = simulator.simulate(simulator.PROFILES["casual"], 50, 30, 7)
+    second = simulator.simulate(simulator.PROFILES["casual"], 50, 30, 7)
+    assert all(np.array_equal(first[key], second[key]) for key in first)
+    assert len(first["level"]) == 50 and (first["spent"] <= first["earned"]).all()
+
+def test_missed_dailies_kill_through_the_rollover():
+    # Six dailies never done cost 30 health at the first rollover
+    profile = simulator.PROFILES["casual"]._replace(todos_per_day=0.0, dailies=6, attempt_rate=0.0)
+    results = simulator.simulate(profile, 10, 5, 1)
+    assert (results["death_day"] == 1).all()
+    assert (results["infection"] == 6 * rules.INFECTION_PER_FAILURE).all()
+
+def test_level_table_matches_the_rules():
+    xp = np.array([0, 49, 50, 59, 60, 5000])
+    assert simulator._LevelTable()(xp).tolist() == [rules.level_for_xp(int(x)) for x in xp]
+
+def test_run_shards_and_keeps_overrides_in_the_workers():
+    failure_reward = rules.DAILY_FAILURE_REWARD
+    results = simulator.run(simulator.PROFILES["struggling"], 20, 10, workers=2, seed=3,
+                            overrides={"DAILY_FAILURE_REWARD": -1})
+    assert len(results["death_day"]) == 20
+    assert rules.DAILY_FAILURE_REWARD == failure_reward
+    summary = simulator.summarize(results, 10)
+    assert summary["survivors"] == 20 and 0 <= summary["death_rate"] <= 1
+
+def test_parse_override():
+    assert simulator.parse_override("MAX_STAT=80") == ("MAX_STAT", 80)
+    with pytest.raises(argparse.ArgumentTypeError):
+        simulator.parse_override("MAX_STAT")
+    with pytest.raises(argparse.ArgumentTypeError):
+        simulator.parse_override("MAX_STAT=high")
@@ -0,0 +1,52 @@
+import os
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils.snapshot_cache import SnapshotCache
+
+def saved_game(storage):
+    character = Survivor("me")
+    task_manager = TaskManager()
+    task_manager.create_task("todo", "Scavenge", "", "high")
+    storage.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+    task_manager.pop_changes()
+    return character, task_manager
+
+def test_hit_returns_a_working_session(storage):
+    character, task_manager = saved_game(storage)
+    cache = SnapshotCache(storage)
+    cache.save(character, task_manager)
+    assert cache.path == os.path.splitext(storage.save_file)[0] + ".snapshot"
+
+    loaded_character, loaded_manager = cache.load()
+    assert loaded_character.name == "me" and loaded_manager.get_task(1).title == "Scavenge"
+    # Tasks still report changes to the unpickled manager
+    loaded_manager.get_task(1).title = "Scavenge food"
+    assert [(task.id, fields) for task, fields in loaded_manager.pop_changes().updated] == [(1, {"_title"})]
+
+def test_touched_save_with_the_same_contents_still_hits(storage):
+    cache = SnapshotCache(storage)
+    cache.save(*saved_game(storage))
+    stat = os.stat(storage.save_file)
+    os.utime(storage.save_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.load() is not None
+
+def test_changed_save_misses(storage):
+    character, task_manager = saved_game(storage)
+    cache = SnapshotCache(storage)
+    cache.save(character, task_manager)
+    task_manager.create_task("todo", "Barricade", "")
+    storage.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+    assert cache.load() is None
+
+def test_invalidated_old_or_corrupt_snapshots_miss(storage, monkeypatch):
+    cache = SnapshotCache(storage)
+    cache.save(*saved_game(storage))
+    monkeypatch.setattr(SnapshotCache, "VERSION", SnapshotCache.VERSION + 1)
+    assert cache.load() is None
+    monkeypatch.undo()
+    assert cache.load() is not None
+    with open(cache.path, "wb") as f:
+        f.write(b"not a pickle")
+    assert cache.load() is None
+    cache.invalidate()
+    assert not os.path.exists(cache.path) and cache.load() is None
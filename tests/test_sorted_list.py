@@ -0,0 +1,30 @@
+import random
+from models.sorted_list import SortedList
+
+def test_matches_a_sorted_python_list(monkeypatch):
+    # Tiny buckets so splits, empty buckets and tree rebuilds all happen
+    monkeypatch.setattr(SortedList, "LOAD", 4)
+    rng = random.Random(7)
+    expected = sorted(rng.randrange(200) for _ in range(50))
+    values = SortedList(expected)
+    for step in range(3000):
+        if expected and rng.random() < 0.45:
+            value = rng.choice(expected)
+            expected.remove(value)
+            values.remove(value)
+        else:
+            value = rng.randrange(200)
+            expected.append(value)
+            expected.sort()
+            values.add(value)
+        if step % 50 == 0:
+            assert list(values) == expected and len(values) == len(expected)
+            probe = rng.randrange(-1, 201)
+            assert values.index(probe) == sum(1 for value in expected if value < probe)
+            start = rng.randrange(len(expected) + 2)
+            assert list(values.iter_from(start)) == expected[start:]
+            assert list(values.iter_from(start, reverse=True)) == expected[::-1][start:]
+
+def test_empty():
+    values = SortedList()
+    assert list(values.iter_from(0)) == [] and values.index(3) == 0
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+import main
+from utils.binary_format import BinaryStorage
+from utils.sqlite_storage import SqliteStorage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_main_defers_engines_and_subsystems(tmp_path):
+    modules = ["sqlite3", "utils.sqlite_storage", "utils.binary_format", "utils.event_log",
+               "utils.snapshot_cache", "utils.undo_history"]
+    output = subprocess.run(
+        [sys.executable, "-c", f"import sys, main; print([m for m in {modules!r} if m in sys.modules])"],
+        cwd=tmp_path, env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+def test_open_storage_follows_existing_save(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert main.open_storage() is None
+
+    open(BinaryStorage.DEFAULT_FILE, "wb").close()
+    assert isinstance(main.open_storage(), BinaryStorage)
+
+    open(SqliteStorage.DEFAULT_FILE, "wb").close()
+    storage = main.open_storage()
+    assert isinstance(storage, SqliteStorage)
+    storage.close()
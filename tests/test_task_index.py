@@ -0,0 +1,78 @@
+import random
+import pytest
+from models.sorted_list import SortedList
+from models.task_manager import TaskManager
+from models.task_index import SORT_KEYS
+from models.todo_task import TodoTask
+
+WORDS = ["water", "scavenge", "radio", "fence", "garden", "medkit", "map", "boots"]
+
+def brute_force(task_manager, task_type=None, priority=None, completed=None, completed_since=None,
+                completed_until=None, search=None, sort="id", descending=False, offset=0, limit=None):
+    tasks = []
+    for task in task_manager.get_tasks():
+        completion_date = getattr(task, "last_completion_date", None)
+        text = f"{task.title} {task.description}".casefold().split()
+        if ((task_type is None or (task_type == "todo") == isinstance(task, TodoTask))
+                and (priority is None or getattr(task, "_priority", None) == priority)
+                and (completed is None or task.completed == completed)
+                and (completed_since is None or (completion_date or "") >= completed_since)
+                and (completed_until is None or (completion_date and completion_date <= completed_until))
+                and all(any(term in word for word in text) for term in (search or "").casefold().split())):
+            tasks.append(task)
+    field, key = SORT_KEYS[sort]
+    tasks.sort(key=lambda task: (task.id if key is None else key(getattr(task, field, None)), task.id),
+               reverse=descending)
+    end = None if limit is None else offset + limit
+    return [task.id for task in tasks[offset:end]]
+
+def random_title(rng):
+    return " ".join(rng.sample(WORDS, 2)) + f" {rng.randrange(50)}"
+
+@pytest.mark.parametrize("query_first", [False, True])
+def test_query_matches_brute_force_through_changes(monkeypatch, query_first):
+    monkeypatch.setattr(SortedList, "LOAD", 8)
+    rng = random.Random(3)
+    task_manager = TaskManager()
+    if query_first:
+        task_manager.query()  # Indexes exist before any task does
+    for step in range(1500):
+        action = rng.random()
+        task_ids = [task.id for task in task_manager.get_tasks()]
+        if action < 0.35 or not task_ids:
+            task_type = rng.choice(["todo", "daily"])
+            task_manager.create_task(task_type, random_title(rng), rng.choice(WORDS),
+                                     rng.choice(["low", "medium", "high"]))
+        elif action < 0.45:
+            task_manager.delete_task(rng.choice(task_ids))
+        else:
+            task = task_manager.get_task(rng.choice(task_ids))
+            change = rng.randrange(4)
+            if change == 0:
+                task.title = random_title(rng)
+            elif change == 1:
+                task.description = rng.choice(WORDS)
+            elif change == 2 and isinstance(task, TodoTask):
+                task.priority = rng.choice(["low", "medium", "high"])
+            elif not task.completed:
+                task.completed = True
+                if not isinstance(task, TodoTask):
+                    task.last_completion_date = f"2024-01-{rng.randrange(1, 29):02d}"
+
+        if step % 25 == 0:
+            filters = rng.choice([{}, {"task_type": "todo"}, {"priority": "high"}, {"completed": False},
+                                  {"completed_since": "2024-01-10", "completed_until": "2024-01-20"},
+                                  {"search": rng.choice(WORDS)[:4]}, {"search": "ma"},
+                                  {"search": "garden", "completed": True}])
+            page = {"sort": rng.choice(list(SORT_KEYS)), "descending": rng.random() < 0.5,
+                    "offset": rng.randrange(0, 30), "limit": rng.choice([None, 1, 5, 40])}
+            expected = brute_force(task_manager, **filters, **page)
+            assert [task.id for task in task_manager.query(**filters, **page)] == expected, (filters, page)
+
+def test_index_is_built_on_first_query_only():
+    task_manager = TaskManager()
+    task_manager.create_task("todo", "fix the radio", "", "high")
+    assert task_manager._index is None
+    assert [task.id for task in task_manager.query(search="radio")] == [1]
+    task_manager.clear_tasks()
+    assert task_manager._index is None and task_manager.query() == []
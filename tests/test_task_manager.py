@@ -0,0 +1,40 @@
+import pytest
+from models.rules import (DAILY_FAILURE_REWARD, HUNGER_DECAY_PER_COMPLETION, INFECTION_PER_FAILURE,
+                          MAX_STAT, TODO_REWARDS)
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+
+def test_invalid_priority_leaves_no_task_behind():
+    task_manager = TaskManager()
+    with pytest.raises(ValueError):
+        task_manager.create_task("todo", "x", "", "urgent")
+    assert len(task_manager) == 0
+    assert task_manager.pop_changes().created == []
+    assert task_manager.query() == []
+    assert task_manager.create_task("todo", "y", "", "high") == 1
+
+def test_complete_many_applies_combined_rewards_once():
+    task_manager = TaskManager()
+    character = Survivor("me")
+    character.health = 20
+    todo = task_manager.create_task("todo", "a", "", "high")
+    daily = task_manager.create_task("daily", "b", "")
+    character.clear_dirty()
+    report = task_manager.complete_many([todo, daily, 99], character, [True, False, True])
+    assert [result.status for result in report.results] == ["completed", "completed", "invalid_id"]
+    assert (report.xp_gained, report.health_change) == (TODO_REWARDS["high"], DAILY_FAILURE_REWARD)
+    assert character.xp == TODO_REWARDS["high"]
+    assert character.health == 20 + DAILY_FAILURE_REWARD
+    assert character.hunger == MAX_STAT - 2 * HUNGER_DECAY_PER_COMPLETION
+    assert character.infection == INFECTION_PER_FAILURE
+
+def test_complete_many_leaves_unchanged_stats_clean():
+    task_manager = TaskManager()
+    character = Survivor("me")
+    todo = task_manager.create_task("todo", "a", "")
+    character.clear_dirty()
+    task_manager.complete_many([todo], character)
+    assert character.dirty_fields == {"_xp", "_hunger", "_thirst"}
+    character.clear_dirty()
+    task_manager.complete_many([todo, 99], character)
+    assert character.dirty_fields == set()
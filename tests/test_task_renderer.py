@@ -0,0 +1,36 @@
+from models.task_manager import TaskManager
+from utils.task_renderer import TaskRenderer
+
+def make_renderer(count, page_size=2):
+    task_manager = TaskManager()
+    for i in range(count):
+        task_manager.create_task("todo", f"task {i}", "")
+    return task_manager, TaskRenderer(task_manager, page_size)
+
+def test_changed_task_row_is_rendered_again():
+    task_manager, renderer = make_renderer(3)
+    assert "task 0 - Priority: low - Pending" in renderer.render(0)
+    task_manager.get_task(1).title = "renamed"
+    page = renderer.render(0)
+    assert "1. [Todo] renamed" in page and "task 0" not in page
+    assert "2. [Todo] task 1" in page
+
+def test_delete_and_restore_keep_the_id_list_in_place():
+    task_manager, renderer = make_renderer(5)
+    renderer.render(0)
+    order = renderer._order
+    task = task_manager.get_task(2)
+    task_manager.delete_task(2)
+    assert renderer._order is order and order == [1, 3, 4, 5]
+    assert renderer.page_of(2) is None and renderer.page_of(3) == 0
+    task_manager.restore_tasks([task])
+    assert renderer._order is order and order == [1, 2, 3, 4, 5]
+    assert renderer.page_of(5) == 2
+    task_manager.create_task("todo", "new", "")
+    assert order[-1] == 6
+
+def test_clear_empties_the_pages():
+    task_manager, renderer = make_renderer(3)
+    renderer.render(0)
+    task_manager.clear_tasks()
+    assert "No tasks available" in renderer.render(0)
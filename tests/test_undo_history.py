@@ -0,0 +1,107 @@
+from datetime import date
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from utils.data_manager import DataManager, JsonStorage
+from utils.task_renderer import TaskRenderer
+from utils.undo_history import UndoHistory
+
+def load(storage):
+    game_state = JsonStorage(storage.save_file).load_game_state()
+    task_manager = TaskManager()
+    task_manager.load_tasks(game_state["tasks"], game_state["state"].get("last_rollover"))
+    return task_manager
+
+def test_undone_delete_reloads_in_id_order(storage):
+    character = Survivor("Tester")
+    task_manager = TaskManager()
+    history = UndoHistory(task_manager, character)
+    for title in ("one", "two", "three"):
+        task_manager.create_task("todo", title, "")
+    history.commit("create tasks")
+    DataManager.save_game_state(character, task_manager.get_tasks(), task_manager.state())
+    task_manager.pop_changes()
+
+    task_manager.delete_task(1)
+    history.commit("delete task")
+    DataManager.save_changes(character, task_manager)
+    assert history.undo() == "delete task"
+    DataManager.save_changes(character, task_manager)
+
+    reloaded = load(storage)
+    assert [task.id for task in reloaded.get_tasks()] == [1, 2, 3]
+    renderer = TaskRenderer(reloaded, page_size=2)
+    assert [renderer.page_of(task_id) for task_id in (1, 2, 3)] == [0, 0, 1]
+
+def test_load_tasks_sorts_out_of_order_ids():
+    task_manager = TaskManager()
+    task_manager.load_tasks([{"_id": id, "_title": str(id), "_description": "", "_completed": False,
+                              "_priority": "low"} for id in (2, 1, 3)])
+    assert [task.id for task in task_manager.get_tasks()] == [1, 2, 3]
+    assert TaskRenderer(task_manager).page_of(1) == 0
+
+def scheduled_manager():
+    character = Survivor("Tester")
+    task_manager = TaskManager()
+    history = UndoHistory(task_manager, character)
+    task_id = task_manager.create_task("todo", "Boil water", "")
+    task_manager.set_deadline(task_id, date(2026, 10, 20))
+    task_manager.add_recurring_task("Scout", "", every_days=3, today=date(2026, 10, 18))
+    history.commit("set up")
+    return character, task_manager, history, task_id
+
+def test_undone_completion_keeps_deadline():
+    character, task_manager, history, task_id = scheduled_manager()
+    task_manager.complete_many([task_id], character)
+    history.commit("complete")
+    assert task_manager.deadline(task_id) is None
+
+    history.undo()
+    assert not task_manager.get_task(task_id).completed
+    assert task_manager.deadline(task_id) == "2026-10-20"
+    history.redo()
+    assert task_manager.deadline(task_id) is None
+
+def test_undone_delete_keeps_deadline():
+    character, task_manager, history, task_id = scheduled_manager()
+    task_manager.delete_many([task_id, 2])
+    history.commit("delete")
+
+    history.undo()
+    assert task_manager.deadline(task_id) == "2026-10-20"
+    assert task_manager.deadline(2) == "2026-10-20"
+    history.redo()
+    assert task_manager.deadline(task_id) is None
+    assert len(task_manager) == 0
+
+def test_undone_reset_restores_schedule():
+    character, task_manager, history, task_id = scheduled_manager()
+    rules = task_manager.recurrences()
+    task_manager.clear_tasks()
+    history.commit("reset")
+    assert task_manager.recurrences() == []
+
+    history.undo()
+    assert task_manager.recurrences() == rules
+    assert task_manager.deadline(task_id) == "2026-10-20"
+
+def test_undone_recurrence_redoes_with_deadline():
+    character, task_manager, history, task_id = scheduled_manager()
+    history.undo()
+    assert len(task_manager) == 0
+    assert task_manager.recurrences() == []
+
+    history.redo()
+    assert len(task_manager.recurrences()) == 1
+    assert task_manager.deadline(2) == "2026-10-20"
+
+def test_schedule_steps_survive_save(tmp_path):
+    character, task_manager, history, task_id = scheduled_manager()
+    task_manager.clear_tasks()
+    history.commit("reset")
+    history.save(str(tmp_path / "gamestate.undo"))
+
+    reloaded = UndoHistory(task_manager, character)
+    assert reloaded.load(str(tmp_path / "gamestate.undo"))
+    reloaded.undo()
+    assert len(task_manager.recurrences()) == 1
+    assert task_manager.deadline(task_id) == "2026-10-20"
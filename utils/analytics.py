@@ -0,0 +1,133 @@
+"""Completion statistics computed from utils.event_log files with NumPy.
+
+Usage: python -m utils.analytics completions.events [more.events ...]
+
+Requires numpy. Every function takes the structured array returned by
+load_events(), so one load serves all of them and several profiles can
+be analysed together.
+"""
+import sys
+from datetime import date
+import numpy as np
+from utils.event_log import EVENT, TODO, DAILY, PRIORITIES, NO_PRIORITY
+
+EVENT_DTYPE = np.dtype({
+    "names": ["task_id", "timestamp", "day", "reward", "kind", "priority", "successful"],
+    "formats": ["<i8", "<i8", "<i4", "<i4", "i1", "i1", "i1"],
+    "offsets": [0, 8, 16, 20, 24, 25, 26],
+    "itemsize": EVENT.size,
+})
+
+def load_events(*paths):
+    """Read one or more event logs. Returns the events and, for each
+    event, the index of the file it came from."""
+    parts = [np.fromfile(path, dtype=EVENT_DTYPE) for path in paths]
+    if not parts:
+        return np.empty(0, dtype=EVENT_DTYPE), np.empty(0, dtype=np.int32)
+    profiles = np.repeat(np.arange(len(parts), dtype=np.int32), [len(part) for part in parts])
+    return np.concatenate(parts), profiles
+
+def completion_rates(events):
+    """Completions, successes and failure rate per task type and priority."""
+    # One bucket per (type, priority) pair; priorities shift by one so
+    # that dailies (-1) get bucket 0
+    groups = events["kind"].astype(np.int64) * (len(PRIORITIES) + 1) + events["priority"] + 1
+    size = (DAILY + 1) * (len(PRIORITIES) + 1)
+    completions = np.bincount(groups, minlength=size)
+    successes = np.bincount(groups, weights=events["successful"], minlength=size).astype(np.int64)
+
+    rates = {}
+    for kind, name, priorities in ((TODO, "todo", range(len(PRIORITIES))), (DAILY, "daily", [NO_PRIORITY])):
+        for priority in priorities:
+            group = kind * (len(PRIORITIES) + 1) + priority + 1
+            if not completions[group]:
+                continue
+            key = (name, PRIORITIES[priority] if priority != NO_PRIORITY else None)
+            rates[key] = {
+                "completions": int(completions[group]),
+                "successes": int(successes[group]),
+                "failure_rate": float(1 - successes[group] / completions[group]),
+            }
+    return rates
+
+def rollup(events, period_days=1):
+    """Completions, successes, XP gained and health lost per period.
+
+    Periods are day ordinals divided by period_days; with 7, weeks start
+    on Monday. Returns the first day of each period that has events and
+    one array per measure.
+    """
+    if not len(events):
+        empty = np.empty(0, dtype=np.int64)
+        return {"start_day": empty, "completions": empty, "successes": empty,
+                "xp": empty, "health_lost": empty}
+    periods = (events["day"].astype(np.int64) - 1) // period_days
+    first = periods.min()
+    periods -= first
+    rewards = events["reward"].astype(np.int64)
+
+    completions = np.bincount(periods)
+    active = np.nonzero(completions)[0]
+    def total(weights):
+        return np.bincount(periods, weights=weights, minlength=len(completions))[active].astype(np.int64)
+    return {
+        "start_day": (active + first) * period_days + 1,
+        "completions": completions[active],
+        "successes": total(events["successful"]),
+        "xp": total(np.maximum(rewards, 0)),
+        "health_lost": total(np.maximum(-rewards, 0)),
+    }
+
+def daily_rollup(events):
+    return rollup(events, 1)
+
+def weekly_rollup(events):
+    return rollup(events, 7)
+
+def xp_curve(events):
+    """Cumulative XP earned from tasks at the end of each active day."""
+    daily = daily_rollup(events)
+    return daily["start_day"], np.cumsum(daily["xp"])
+
+def failure_rates_by_task(events, profiles=None):
+    """Failure rate of every daily task that was completed at least once.
+
+    Returns (profile, task_id, completions, failure_rate) arrays; profile
+    is 0 for every task when profiles is not given.
+    """
+    dailies = events["kind"] == DAILY
+    task_ids = events["task_id"][dailies]
+    owners = np.zeros(len(task_ids), dtype=np.int64) if profiles is None else profiles[dailies].astype(np.int64)
+
+    # One integer key per (profile, task) pair, so np.unique stays 1-D
+    span = int(task_ids.max()) + 1 if len(task_ids) else 1
+    keys, inverse = np.unique(owners * span + task_ids, return_inverse=True)
+    completions = np.bincount(inverse, minlength=len(keys))
+    successes = np.bincount(inverse, weights=events["successful"][dailies], minlength=len(keys))
+    return keys // span, keys % span, completions, 1 - successes / completions
+
+def _format_day(ordinal):
+    return date.fromordinal(int(ordinal)).strftime("%Y-%m-%d")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.analytics EVENT_LOG [EVENT_LOG ...]")
+        sys.exit(1)
+    events, profiles = load_events(*sys.argv[1:])
+    print(f"{len(events)} completions from {len(sys.argv) - 1} log(s)")
+
+    print("\nBy task type and priority:")
+    for (task_type, priority), stats in completion_rates(events).items():
+        label = task_type if priority is None else f"{task_type}/{priority}"
+        print(f"  {label:12} {stats['completions']:>8} completed  {stats['failure_rate']:>6.1%} failed")
+
+    weekly = weekly_rollup(events)
+    print("\nLast weeks:")
+    for start, completions, xp, health_lost in list(zip(
+            weekly["start_day"], weekly["completions"], weekly["xp"], weekly["health_lost"]))[-8:]:
+        print(f"  {_format_day(start)}  {completions:>6} completed  +{xp} XP  -{health_lost} health")
+
+    days, xp = xp_curve(events)
+    if len(days):
+        print(f"\nXP earned: {xp[-1]} over {len(days)} active day(s), "
+              f"{_format_day(days[0])} to {_format_day(days[-1])}")
@@ -0,0 +1,72 @@
+import threading
+
+class BackgroundSaver:
+    """Writes the game state from a background thread.
+
+    Callers only report that the state is dirty; bursts of notifications
+    within `delay` seconds are coalesced into one write. `save` is called
+    on the worker thread and is responsible for taking a consistent
+    snapshot (usually under a lock shared with the code that mutates the
+    state) before writing it.
+    """
+
+    def __init__(self, save, delay=0.5):
+        self._save = save
+        self._delay = delay
+        self._condition = threading.Condition()
+        self._dirty = False
+        self._saving = False
+        self._urgent = False
+        self._closed = False
+        self.error = None  # Exception of the last save if it failed, else None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        with self._condition:
+            self._dirty = True
+            self._condition.notify_all()
+
+    def flush(self):
+        """Block until every change reported so far has been written, and
+        raise the error of the last save if it failed."""
+        with self._condition:
+            self._urgent = True
+            self._condition.notify_all()
+            while (self._dirty or self._saving) and self._thread.is_alive():
+                self._condition.wait()
+            self._urgent = False
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """Flush and stop the worker; raises like flush(), after stopping."""
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._dirty and not self._closed:
+                    self._condition.wait()
+                if not self._dirty:
+                    return
+                # Give more changes a moment to arrive before writing
+                self._condition.wait_for(lambda: self._urgent or self._closed, timeout=self._delay)
+                self._dirty = False
+                self._saving = True
+
+            try:
+                self._save()
+                self.error = None  # Each save writes the whole state
+            except Exception as e:
+                self.error = e
+            finally:
+                with self._condition:
+                    self._saving = False
+                    self._condition.notify_all()
@@ -0,0 +1,268 @@
+"""Compact, versioned binary save format that can be loaded with mmap.
+
+Layout (little-endian):
+    header      magic, version, inventory item count, task count, string
+                count and the offset of every section below
+    character   one fixed-size record, then one (item ID, units) record
+                per inventory item
+    tasks       fixed-size records in display order
+    string index one u64 offset per string into the string data
+    strings     UTF-8 data of every title, description and the name
+    state       JSON blob with the extra "state" values
+
+Tasks are only decoded when they are accessed, so opening a large save
+costs a header read instead of parsing the whole file.
+
+Usage: python -m utils.binary_format to-binary gamestate.json gamestate.bin
+       python -m utils.binary_format to-json gamestate.bin gamestate.json
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from datetime import date
+from utils.data_manager import StorageEngine, JsonStorage, atomic_open
+
+MAGIC = b"RPGB"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHIIQQQQQQ")
+CHARACTER = struct.Struct("<Iiqiiii")
+INVENTORY_ITEM = struct.Struct("<II")
+TASK = struct.Struct("<qbbbbiIIiiq")
+OFFSET = struct.Struct("<Q")
+
+TODO, DAILY = 0, 1
+PRIORITIES = ["low", "medium", "high"]
+NO_VALUE = -1
+NO_DATE = 0
+
+class BinarySave:
+    """Read-only view over a binary save file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.inventory_count, self.task_count, self.string_count, self._character_offset,
+         self._tasks_offset, self._index_offset, self._strings_offset,
+         self._state_offset, self._end) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a binary save file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{path} has save format version {version}, expected {VERSION}")
+
+    def string(self, index):
+        start = OFFSET.unpack_from(self._map, self._index_offset + index * OFFSET.size)[0]
+        if index + 1 < self.string_count:
+            end = OFFSET.unpack_from(self._map, self._index_offset + (index + 1) * OFFSET.size)[0]
+        else:
+            end = self._state_offset - self._strings_offset
+        return self._map[self._strings_offset + start:self._strings_offset + end].decode("utf-8")
+
+    def character(self):
+        name, level, xp, health, hunger, thirst, infection = CHARACTER.unpack_from(self._map, self._character_offset)
+        return {
+            "_name": self.string(name),
+            "_level": level,
+            "_xp": xp,
+            "_health": health,
+            "_hunger": hunger,
+            "_thirst": thirst,
+            "_infection": infection,
+            "_inventory": dict(self._inventory_items())
+        }
+
+    def _inventory_items(self):
+        offset = self._character_offset + CHARACTER.size
+        for _ in range(self.inventory_count):
+            item_id, count = INVENTORY_ITEM.unpack_from(self._map, offset)
+            yield self.string(item_id), count
+            offset += INVENTORY_ITEM.size
+
+    def task(self, position):
+        return self._task_data(TASK.unpack_from(self._map, self._tasks_offset + position * TASK.size))
+
+    def iter_tasks(self):
+        records = memoryview(self._map)[self._tasks_offset:self._index_offset]
+        try:
+            for record in TASK.iter_unpack(records):
+                yield self._task_data(record)
+        finally:
+            records.release()
+
+    def _task_data(self, record):
+        (task_id, kind, completed, priority, was_successful, completion_day,
+         title, description, streak, best_streak, history) = record
+        task_data = {
+            "_id": task_id,
+            "_title": self.string(title),
+            "_description": self.string(description),
+            "_completed": bool(completed),
+        }
+        if kind == TODO:
+            task_data["_priority"] = PRIORITIES[priority]
+        else:
+            task_data["last_completion_date"] = (
+                None if completion_day == NO_DATE else date.fromordinal(completion_day).strftime("%Y-%m-%d"))
+            task_data["was_successful"] = None if was_successful == NO_VALUE else bool(was_successful)
+            task_data["streak"] = streak
+            task_data["best_streak"] = best_streak
+            task_data["history"] = history
+        return task_data
+
+    def state(self):
+        return json.loads(self._map[self._state_offset:self._end] or b"{}")
+
+    def game_state(self):
+        return {"character": self.character(), "tasks": LazyTaskList(self), "state": self.state()}
+
+    def close(self):
+        self._map.close()
+
+class LazyTaskList(Sequence):
+    """Task records of a BinarySave, decoded one by one on access."""
+
+    def __init__(self, save):
+        self._save = save
+
+    def __len__(self):
+        return self._save.task_count
+
+    def __iter__(self):
+        return self._save.iter_tasks()
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._save.task(i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("task index out of range")
+        return self._save.task(position)
+
+def write_binary(game_state, path):
+    """Write a serialized game state (the JSON layout) as a binary save."""
+    strings = {}
+    def intern(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    character = game_state["character"]
+    character_record = CHARACTER.pack(
+        intern(character["_name"]), character["_level"], character["_xp"], character["_health"],
+        character["_hunger"], character["_thirst"], character["_infection"])
+    inventory = character.get("_inventory") or {}
+    for item_id, count in inventory.items():
+        character_record += INVENTORY_ITEM.pack(intern(item_id), count)
+
+    task_records = bytearray()
+    for position, task_data in enumerate(game_state["tasks"]):
+        if "_priority" in task_data:
+            kind, priority, was_successful, completion_day = (
+                TODO, PRIORITIES.index(task_data["_priority"]), NO_VALUE, NO_DATE)
+            streak = best_streak = history = 0
+        else:
+            kind, priority = DAILY, NO_VALUE
+            was_successful = task_data.get("was_successful")
+            was_successful = NO_VALUE if was_successful is None else int(was_successful)
+            completion_date = task_data.get("last_completion_date")
+            completion_day = date.fromisoformat(completion_date).toordinal() if completion_date else NO_DATE
+            streak, best_streak, history = (
+                task_data.get("streak", 0), task_data.get("best_streak", 0), task_data.get("history", 0))
+        task_id = task_data.get("_id")
+        task_records += TASK.pack(
+            position + 1 if task_id is None else task_id, kind, int(task_data["_completed"]), priority,
+            was_successful, completion_day, intern(task_data["_title"]), intern(task_data["_description"]),
+            streak, best_streak, history)
+
+    string_index = bytearray()
+    string_data = bytearray()
+    for value in strings:
+        string_index += OFFSET.pack(len(string_data))
+        string_data += value.encode("utf-8")
+    state = json.dumps(game_state.get("state") or {}, separators=(",", ":")).encode("utf-8")
+
+    character_offset = HEADER.size
+    tasks_offset = character_offset + len(character_record)
+    index_offset = tasks_offset + len(task_records)
+    strings_offset = index_offset + len(string_index)
+    state_offset = strings_offset + len(string_data)
+    end = state_offset + len(state)
+    header = HEADER.pack(MAGIC, VERSION, len(inventory), len(game_state["tasks"]), len(strings), character_offset,
+                         tasks_offset, index_offset, strings_offset, state_offset, end)
+
+    with atomic_open(path, "wb") as f:
+        for section in (header, character_record, task_records, string_index, string_data, state):
+            f.write(section)
+
+class BinaryStorage(StorageEngine):
+    """Storage engine for binary saves. Loading maps the file and hands out
+    tasks lazily; saving rewrites the whole file."""
+    DEFAULT_FILE = "gamestate.bin"
+
+    journaled = False
+
+    def __init__(self, save_file=DEFAULT_FILE):
+        self.save_file = save_file
+        self._save = None
+
+    def load_game_state(self):
+        if not os.path.exists(self.save_file):
+            return None
+        self.close()
+        self._save = BinarySave(self.save_file)
+        return self._save.game_state()
+
+    def save_serialized(self, game_state):
+        if isinstance(game_state["tasks"], LazyTaskList):
+            # Read them before the mapping is closed below
+            game_state = {**game_state, "tasks": list(game_state["tasks"])}
+        # A mapped file can't be replaced on Windows
+        self.close()
+        write_binary(game_state, self.save_file)
+
+    def record(self, op, **payload):
+        pass  # Whole-file format: changes are written by save_game_state
+
+    def source_files(self):
+        return [self.save_file]
+
+    def close(self):
+        """Unmap the loaded save. Task lists handed out by load_game_state
+        can't be read after this, so close once they have been copied."""
+        if self._save is not None:
+            self._save.close()
+            self._save = None
+
+def json_to_binary(json_file, binary_file):
+    game_state = JsonStorage(json_file).load_game_state()
+    if game_state is None:
+        return False
+    write_binary(game_state, binary_file)
+    return True
+
+def binary_to_json(binary_file, json_file):
+    save = BinarySave(binary_file)
+    game_state = save.game_state()
+    game_state["tasks"] = list(game_state["tasks"])
+    JsonStorage(json_file).save_serialized(game_state)
+    save.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-json"):
+        print("Usage: python -m utils.binary_format to-binary|to-json SOURCE DESTINATION")
+        sys.exit(1)
+    if sys.argv[1] == "to-binary":
+        if not json_to_binary(sys.argv[2], sys.argv[3]):
+            print("No save file found.")
+            sys.exit(1)
+    else:
+        binary_to_json(sys.argv[2], sys.argv[3])
+    print("Save converted successfully!")
@@ -0,0 +1,231 @@
+"""Import tasks from, or export them to, CSV and JSONL files without the
+interactive menus.
+
+Usage: python -m utils.bulk_io import tasks.csv [--save gamestate.json]
+       python -m utils.bulk_io export tasks.jsonl [--save gamestate.db]
+                  [--type todo|daily] [--priority P] [--completed | --pending]
+                  [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--offset N] [--limit N]
+
+The format follows the file extension unless --format is given. Imported
+rows need a title and may set type (todo/daily, default todo),
+description and priority (low/medium/high, default low); bad rows are
+reported on stderr and skipped. Files are streamed a chunk at a time, so
+the size of the file does not change how much memory the pipeline uses.
+An export with filters or a page reads only the matching records, from
+the indexed tables on SQLite saves.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+from typing import NamedTuple
+from models.survivor import Survivor
+from models.task_manager import TaskManager
+from models.rules import TODO_REWARDS
+from utils.data_manager import DataManager, JsonStorage
+from utils.sqlite_storage import SqliteStorage
+from utils.binary_format import BinaryStorage
+
+FORMATS = ("csv", "jsonl")
+EXPORT_COLUMNS = ["id", "type", "title", "description", "priority", "completed",
+                  "last_completion_date", "was_successful", "streak", "best_streak"]
+
+class BadRow(NamedTuple):
+    line: int
+    error: str
+
+class ImportReport(NamedTuple):
+    imported: int
+    rejected: int
+
+def detect_format(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of: {', '.join(FORMATS)}")
+    return fmt
+
+# Import pipeline: read_rows -> validate_rows -> chunks -> import_tasks
+
+def read_rows(f, fmt):
+    """Yield (line number, row dict or BadRow) for every record in f."""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, BadRow(line_number, f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            row = BadRow(line_number, "expected a JSON object")
+        yield line_number, row
+
+def validate_rows(rows):
+    """Turn raw rows into (task_type, title, description, priority)
+    tuples, passing problems on as BadRow."""
+    for line_number, row in rows:
+        if isinstance(row, BadRow):
+            yield row
+            continue
+        title = str(row.get("title") or "").strip()
+        task_type = str(row.get("type") or "todo").strip().lower()
+        priority = str(row.get("priority") or "low").strip().lower()
+        if not title:
+            yield BadRow(line_number, "title is required")
+        elif task_type not in ("todo", "daily"):
+            yield BadRow(line_number, f"unknown type {task_type!r}")
+        elif task_type == "todo" and priority not in TODO_REWARDS:
+            yield BadRow(line_number, f"unknown priority {priority!r}")
+        else:
+            yield task_type, title, str(row.get("description") or ""), priority
+
+def chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def import_tasks(task_manager, f, fmt, chunk_size=1000, on_bad_row=None, on_chunk=None):
+    """Create a task for every valid row of f. on_bad_row(BadRow) is called
+    for rejected rows and on_chunk() after each chunk, e.g. to save."""
+    imported = rejected = 0
+    for chunk in chunks(validate_rows(read_rows(f, fmt)), chunk_size):
+        for item in chunk:
+            if isinstance(item, BadRow):
+                rejected += 1
+                if on_bad_row is not None:
+                    on_bad_row(item)
+            else:
+                task_manager.create_task(*item)
+                imported += 1
+        if on_chunk is not None:
+            on_chunk()
+    return ImportReport(imported, rejected)
+
+def export_rows(tasks_data):
+    for task_data in tasks_data:
+        daily = "_priority" not in task_data
+        yield {
+            "id": task_data.get("_id"),
+            "type": "daily" if daily else "todo",
+            "title": task_data["_title"],
+            "description": task_data["_description"],
+            "priority": task_data.get("_priority"),
+            "completed": task_data["_completed"],
+            "last_completion_date": task_data.get("last_completion_date"),
+            "was_successful": task_data.get("was_successful"),
+            "streak": task_data.get("streak", 0) if daily else None,
+            "best_streak": task_data.get("best_streak", 0) if daily else None,
+        }
+
+def export_tasks(tasks_data, f, fmt):
+    """Write serialized task records to f one at a time."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in export_rows(tasks_data):
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in export_rows(tasks_data):
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+def storage_for(save_file=None):
+    """Storage engine for save_file, picked by extension; without one the
+    same save main.py would use."""
+    if save_file is None:
+        if os.path.exists(SqliteStorage.DEFAULT_FILE):
+            return SqliteStorage()
+        if os.path.exists(BinaryStorage.DEFAULT_FILE):
+            return BinaryStorage()
+        return JsonStorage()
+    extension = os.path.splitext(save_file)[1].lower()
+    if extension == ".db":
+        return SqliteStorage(save_file)
+    if extension == ".bin":
+        return BinaryStorage(save_file)
+    return JsonStorage(save_file)
+
+def run_import(path, fmt, storage, chunk_size, character_name):
+    DataManager.use_storage(storage)
+    game_state = DataManager.load_game_state()
+    task_manager = TaskManager()
+    if game_state:
+        character = DataManager.deserialize_character(game_state["character"])
+        state = game_state.get("state", {})
+        task_manager.load_tasks(game_state["tasks"], state.get("last_rollover"), state.get("schedule"))
+    else:
+        character = Survivor(character_name)
+        DataManager.record("character", character=DataManager.serialize_character(character))
+
+    def report_bad_row(bad_row):
+        print(f"{path}:{bad_row.line}: {bad_row.error}", file=sys.stderr)
+
+    def save_chunk():
+        # Journaled engines get each chunk as row-level records
+        DataManager.save_changes(character, task_manager)
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        report = import_tasks(task_manager, f, fmt, chunk_size, report_bad_row, save_chunk)
+    if not storage.journaled:
+        DataManager.save_game_state(character, task_manager.get_tasks(),
+                                    task_manager.state())
+    DataManager.close()
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export tasks as CSV or JSONL")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("file", help="CSV or JSONL file to read or write")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--save", help="save file to use (.json, .db or .bin); default: the game's save")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--name", default="Survivor", help="character name if the save does not exist yet")
+    export_filters = parser.add_argument_group("export filters")
+    export_filters.add_argument("--type", choices=["todo", "daily"])
+    export_filters.add_argument("--priority", choices=list(TODO_REWARDS))
+    completion = export_filters.add_mutually_exclusive_group()
+    completion.add_argument("--completed", action="store_true", default=None)
+    completion.add_argument("--pending", dest="completed", action="store_false")
+    export_filters.add_argument("--since", help="last completed on or after this day")
+    export_filters.add_argument("--until", help="last completed on or before this day")
+    export_filters.add_argument("--offset", type=int, default=0)
+    export_filters.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        fmt = detect_format(args.file, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    storage = storage_for(args.save)
+
+    if args.command == "import":
+        report = run_import(args.file, fmt, storage, args.chunk_size, args.name)
+        print(f"Imported {report.imported} task(s), rejected {report.rejected} row(s).")
+        return 0
+
+    filters = (args.type, args.completed, args.priority, args.since, args.until)
+    if any(value is not None for value in filters) or args.offset or args.limit is not None:
+        tasks_data = storage.load_tasks(*filters, args.offset, args.limit)
+    else:
+        tasks_data = storage.iter_tasks()  # Streamed, however large the save
+    with open(args.file, "w", newline="", encoding="utf-8") as f:
+        count = export_tasks(tasks_data, f, fmt)
+    storage.close()
+    print(f"Exported {count} task(s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,400 @@
 import json
 import os
-from datetime import date
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import islice
 from models.survivor import Survivor
-from models.todo_task import TodoTask
 from models.daily_task import DailyTask
 
-class DataManager:
+@contextmanager
+def atomic_open(path, mode="w"):
+    """Write to a temp file, fsync it and rename it over path, so a crash
+    mid-write never leaves a truncated save behind."""
+    temp_file = path + ".tmp"
+    with open(temp_file, mode) as f:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+class StorageEngine(ABC):
+    """Backend used by DataManager to persist the character and tasks.
+
+    Mutations are reported through record() with the same ops the JSON
+    journal uses: create, update, delete, clear, character, state,
+    deadline and rules. "state" stores one JSON value under a key, for
+    subsystems that keep more than the character and task list.
+    "deadline" and "rules" change parts of the "schedule" state (see
+    models.scheduler), one task's due date or the recurrences, and "clear"
+    drops the schedule along with the tasks.
+    """
+
+    @abstractmethod
+    def load_game_state(self):
+        pass
+
+    def save_game_state(self, character, tasks, state=None):
+        self.save_serialized(DataManager.serialize_game_state(character, tasks, state))
+
+    @abstractmethod
+    def save_serialized(self, game_state):
+        """Write an already serialized game state as the whole save."""
+        pass
+
+    @abstractmethod
+    def record(self, op, **payload):
+        pass
+
+    def iter_tasks(self):
+        """Yield every saved task record. Engines that can read tasks
+        incrementally override this to avoid loading them all at once."""
+        game_state = self.load_game_state()
+        if game_state is not None:
+            yield from game_state["tasks"]
+
+    def load_tasks(self, task_type=None, completed=None, priority=None, completed_since=None,
+                   completed_until=None, offset=0, limit=None):
+        """Return one page of the saved task records matching the filters,
+        in ID order, for screens that don't need the whole list. Engines
+        with indexed tables override this to read only those rows."""
+        tasks = (task_data for task_data in self.iter_tasks()
+                 if self.matches(task_data, task_type, completed, priority, completed_since, completed_until))
+        return list(islice(tasks, offset, None if limit is None else offset + limit))
+
     @staticmethod
-    def save_game_state(character, tasks):
-        game_state = {
-            "character": {
-                "_name": character._name,
-                "_level": character._level,
-                "_xp": character._xp,
-                "_health": character._health,
-                "_hunger": character._hunger,
-                "_thirst": character._thirst,
-                "_infection": character._infection
-            },
-            "tasks": []
-        }
-        
-        for task in tasks:
-            task_data = {
-                "_title": task._title,
-                "_description": task._description,
-                "_completed": task._completed,
-            }
-            
-            if isinstance(task, DailyTask):
-                task_data["last_completion_date"] = task.last_completion_date
-                task_data["was_successful"] = task.was_successful  # Save success status
-            else:
-                task_data["_priority"] = task._priority
-                
-            game_state["tasks"].append(task_data)
-            
-        with open("gamestate.json", "w") as f:
+    def matches(task_data, task_type=None, completed=None, priority=None, completed_since=None,
+                completed_until=None):
+        if task_type is not None and ("_priority" in task_data) != (task_type == "todo"):
+            return False
+        if completed is not None and task_data["_completed"] != completed:
+            return False
+        if priority is not None and task_data.get("_priority") != priority:
+            return False
+        if completed_since is not None or completed_until is not None:
+            completion_date = task_data.get("last_completion_date")
+            if completion_date is None:
+                return False
+            if completed_since is not None and completion_date < completed_since:
+                return False
+            if completed_until is not None and completion_date > completed_until:
+                return False
+        return True
+
+    def close(self):
+        pass
+
+    def source_files(self):
+        """Files the saved state is read from, so caches of it can tell
+        when it changed."""
+        return []
+
+    def snapshot_state(self):
+        """Engine state that loading would set up and that must survive a
+        start from utils.snapshot_cache instead; see restore_snapshot_state."""
+        return None
+
+    def restore_snapshot_state(self, state):
+        pass
+
+class JsonStorage(StorageEngine):
+    DEFAULT_FILE = "gamestate.json"
+    # Journal size (bytes) after which it gets folded into a new snapshot
+    COMPACT_THRESHOLD = 1024 * 1024
+
+    def __init__(self, save_file=DEFAULT_FILE, journaled=True):
+        self.save_file = save_file
+        self.journal_file = os.path.splitext(save_file)[0] + ".journal"
+        self.journaled = journaled
+        self._journal_lock = threading.Lock()
+        self._journal_seq = 0
+        self._compaction_thread = None
+
+    def save_serialized(self, game_state):
+        self.close()
+        with self._journal_lock:
+            game_state["journal_seq"] = self._journal_seq
+            self._write_snapshot(game_state)
+            # Everything in the journal is now part of the snapshot
+            for path in (self.journal_file, self._compacting_file()):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def load_game_state(self):
+        try:
+            with open(self.save_file, "r") as f:
+                game_state = json.load(f)
+        except FileNotFoundError:
+            game_state = None
+
+        records = self._read_journal(self._compacting_file())
+        records += self._read_journal(self.journal_file)
+        game_state = self._replay(game_state, records)
+
+        if game_state is not None:
+            self._journal_seq = game_state.get("journal_seq", 0)
+        return game_state
+
+    # Journal
+    def record(self, op, **payload):
+        """Append one mutation record to the journal instead of rewriting
+        the whole save."""
+        if not self.journaled:
+            return
+
+        with self._journal_lock:
+            self._journal_seq += 1
+            record = {"seq": self._journal_seq, "op": op, **payload}
+            with open(self.journal_file, "a") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            journal_size = os.path.getsize(self.journal_file)
+
+        if journal_size >= self.COMPACT_THRESHOLD:
+            self.compact_journal(background=True)
+
+    def compact_journal(self, background=False):
+        thread = self._compaction_thread
+        if thread is not None and thread.is_alive():
+            return
+
+        if background:
+            self._compaction_thread = threading.Thread(target=self._compact, daemon=True)
+            self._compaction_thread.start()
+        else:
+            self._compact()
+
+    def close(self):
+        """Wait for a running compaction so the process can exit safely."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+            self._compaction_thread = None
+
+    def _compact(self):
+        # Move the journal aside so new mutations keep appending to a fresh
+        # file while the old records are folded into the snapshot.
+        compacting = self._compacting_file()
+        with self._journal_lock:
+            if not os.path.exists(compacting):
+                if not os.path.exists(self.journal_file):
+                    return
+                os.replace(self.journal_file, compacting)
+
+        try:
+            with open(self.save_file, "r") as f:
+                game_state = json.load(f)
+        except FileNotFoundError:
+            game_state = None
+
+        game_state = self._replay(game_state, self._read_journal(compacting))
+        if game_state is not None:
+            self._write_snapshot(game_state)
+        os.remove(compacting)
+
+    def source_files(self):
+        return [self.save_file, self.journal_file, self._compacting_file()]
+
+    def snapshot_state(self):
+        # New journal records must keep numbering after the loaded ones
+        return self._journal_seq
+
+    def restore_snapshot_state(self, state):
+        self._journal_seq = state
+
+    def _compacting_file(self):
+        return self.journal_file + ".compacting"
+
+    def _write_snapshot(self, game_state):
+        with atomic_open(self.save_file) as f:
             json.dump(game_state, f, indent=4)
-            
+
     @staticmethod
-    def load_game_state():
+    def _read_journal(path):
+        records = []
         try:
-            with open("gamestate.json", "r") as f:
-                game_state = json.load(f)
-                return game_state
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # Torn write at the end of the journal
         except FileNotFoundError:
-            return None
\ No newline at end of file
+            pass
+        return records
+
+    @staticmethod
+    def _replay(game_state, records):
+        if game_state is None:
+            tasks = {}
+        else:
+            tasks = JsonStorage._tasks_by_id(game_state["tasks"])
+
+        for record in records:
+            # Records already folded into the snapshot are skipped, so a
+            # crash between writing the snapshot and removing the journal
+            # does not apply anything twice.
+            if game_state is not None and record["seq"] <= game_state.get("journal_seq", 0):
+                continue
+
+            op = record["op"]
+            if op == "character":
+                if game_state is None:
+                    game_state = {"character": {}, "tasks": []}
+                game_state["character"].update(record["character"])
+            elif game_state is None:
+                continue
+            elif op in ("create", "update"):
+                tasks[record["task"]["_id"]] = record["task"]
+            elif op == "delete":
+                tasks.pop(record["id"], None)
+            elif op == "clear":
+                tasks.clear()
+                game_state.get("state", {}).pop("schedule", None)
+            elif op == "state":
+                game_state.setdefault("state", {})[record["key"]] = record["value"]
+            elif op == "deadline":
+                deadlines = JsonStorage._schedule(game_state).setdefault("deadlines", {})
+                if record["due"] is None:
+                    deadlines.pop(str(record["id"]), None)
+                else:
+                    deadlines[str(record["id"])] = record["due"]
+            elif op == "rules":
+                JsonStorage._schedule(game_state).update(rules=record["rules"], next_rule_id=record["next_rule_id"])
+
+            game_state["journal_seq"] = record["seq"]
+
+        if game_state is not None:
+            # Tasks put back by undo are journaled after newer ones
+            game_state["tasks"] = [tasks[task_id] for task_id in sorted(tasks)]
+        return game_state
+
+    @staticmethod
+    def _schedule(game_state):
+        return game_state.setdefault("state", {}).setdefault("schedule", {})
+
+    @staticmethod
+    def _tasks_by_id(tasks_data):
+        # Saves from before task IDs existed are numbered in list order,
+        # the same way TaskManager.load_tasks numbers them
+        tasks = {}
+        next_id = 1
+        for task_data in tasks_data:
+            task_id = task_data.get("_id")
+            if task_id is None:
+                task_id = next_id
+                task_data["_id"] = task_id
+            tasks[task_id] = task_data
+            next_id = max(next_id, task_id + 1)
+        return tasks
+
+class DataManager:
+    storage = JsonStorage()
+
+    @staticmethod
+    def use_storage(storage):
+        DataManager.storage.close()
+        DataManager.storage = storage
+
+    @staticmethod
+    def serialize_character(character):
+        return {
+            "_name": character._name,
+            "_level": character._level,
+            "_xp": character._xp,
+            "_health": character._health,
+            "_hunger": character._hunger,
+            "_thirst": character._thirst,
+            "_infection": character._infection,
+            "_inventory": dict(character._inventory)
+        }
+
+    @staticmethod
+    def serialize_game_state(character, tasks, state=None):
+        return {
+            "character": DataManager.serialize_character(character),
+            "tasks": [DataManager.serialize_task(task) for task in tasks],
+            "state": state or {}
+        }
+
+    @staticmethod
+    def deserialize_character(character_data):
+        character = Survivor(character_data["_name"])
+        character._level = character_data["_level"]
+        character._xp = character_data["_xp"]
+        character._health = character_data["_health"]
+        character._hunger = character_data["_hunger"]
+        character._thirst = character_data["_thirst"]
+        character._infection = character_data["_infection"]
+        # Saves from before the inventory have none
+        character._inventory = dict(character_data.get("_inventory") or {})
+        return character
+
+    @staticmethod
+    def serialize_task(task):
+        task_data = {
+            "_id": task._id,
+            "_title": task._title,
+            "_description": task._description,
+            "_completed": task._completed,
+        }
+
+        if isinstance(task, DailyTask):
+            task_data["last_completion_date"] = task.last_completion_date
+            task_data["was_successful"] = task.was_successful  # Save success status
+            task_data["streak"] = task.streak
+            task_data["best_streak"] = task.best_streak
+            task_data["history"] = task.history
+        else:
+            task_data["_priority"] = task._priority
+
+        return task_data
+
+    @staticmethod
+    def save_game_state(character, tasks, state=None):
+        DataManager.storage.save_game_state(character, tasks, state)
+
+    @staticmethod
+    def load_game_state():
+        return DataManager.storage.load_game_state()
+
+    @staticmethod
+    def load_tasks(task_type=None, completed=None, priority=None, completed_since=None,
+                   completed_until=None, offset=0, limit=None):
+        """Return only the task records matching the filters, for screens
+        that don't need the whole list; see StorageEngine.load_tasks."""
+        return DataManager.storage.load_tasks(task_type, completed, priority, completed_since,
+                                              completed_until, offset, limit)
+
+    @staticmethod
+    def record(op, **payload):
+        DataManager.storage.record(op, **payload)
+
+    @staticmethod
+    def save_changes(character, task_manager):
+        """Record only what changed since the last call: tasks that were
+        created, updated or deleted, the deadlines that changed, the
+        recurrences if they changed and the character fields that were
+        set."""
+        changes = task_manager.pop_changes()
+        if changes.cleared:
+            DataManager.record("clear")
+        for task_id in changes.deleted:
+            DataManager.record("delete", id=task_id)
+        for task in changes.created:
+            DataManager.record("create", task=DataManager.serialize_task(task))
+        for task, fields in changes.updated:
+            DataManager.record("update", task=DataManager.serialize_task(task), fields=sorted(fields))
+        for task_id, due in changes.deadlines.items():
+            DataManager.record("deadline", id=task_id, due=due)
+        if changes.rules is not None:
+            DataManager.record("rules", **changes.rules)
+
+        dirty_fields = character.dirty_fields
+        if dirty_fields:
+            character_data = DataManager.serialize_character(character)
+            DataManager.record("character", character={field: character_data[field] for field in dirty_fields})
+            character.clear_dirty()
+
+    @staticmethod
+    def close():
+        DataManager.storage.close()
@@ -0,0 +1,59 @@
+"""Append-only log of task completions.
+
+Every completion is one fixed-size little-endian record, so the file can
+be appended to without reading it and loaded straight into a NumPy array
+by utils.analytics:
+
+    task_id     int64
+    timestamp   int64   seconds since the epoch
+    day         int32   local date as a day ordinal
+    reward      int32   XP gained, or health lost if negative
+    kind        int8    0 todo, 1 daily
+    priority    int8    index into PRIORITIES, -1 for dailies
+    successful  int8    1 or 0
+"""
+import os
+import struct
+import threading
+import time
+from datetime import date
+from models.daily_task import DailyTask
+
+EVENT = struct.Struct("<qqiibbbx")
+
+TODO, DAILY = 0, 1
+PRIORITIES = ["low", "medium", "high"]
+NO_PRIORITY = -1
+
+class CompletionLog:
+    DEFAULT_FILE = "completions.events"
+
+    def __init__(self, path=DEFAULT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        # A torn record from a crash would shift every record after it
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size % EVENT.size:
+                os.truncate(path, size - size % EVENT.size)
+
+    def append(self, task, reward, success=True, when=None):
+        when = time.time() if when is None else when
+        if isinstance(task, DailyTask):
+            kind, priority = DAILY, NO_PRIORITY
+        else:
+            kind, priority = TODO, PRIORITIES.index(task._priority)
+        record = EVENT.pack(task._id, int(when), date.fromtimestamp(when).toordinal(),
+                            reward, kind, priority, int(success))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(record)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
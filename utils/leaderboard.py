@@ -0,0 +1,118 @@
+"""Ranking of Survivor profiles by level, then XP.
+
+Usage: python -m utils.leaderboard DATA_DIR [--top 10] [--rank NAME]
+"""
+import argparse
+import os
+import sys
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional
+from models.sorted_list import SortedList
+from utils.data_manager import JsonStorage
+
+class Standing(NamedTuple):
+    rank: int
+    name: str
+    level: int
+    xp: int
+
+class Leaderboard:
+    """Profiles ordered by (level, XP), best first, ties by name.
+
+    Each profile's (-level, -XP, name) key is kept in a SortedList, so an
+    update is a remove and an insert and a rank or a page of the top list
+    is found in O(log n), without re-sorting after changes.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, tuple] = {}
+        self._ranking = SortedList()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, name):
+        return name in self._keys
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        """Bulk build from (name, level, xp) triples with one sort."""
+        leaderboard = cls()
+        leaderboard._keys = {name: (-level, -xp, name) for name, level, xp in profiles}
+        leaderboard._ranking = SortedList(leaderboard._keys.values())
+        return leaderboard
+
+    @classmethod
+    def from_saves(cls, data_dir):
+        """Bulk build from every JSON save in data_dir, the way server.py
+        stores profiles (DATA_DIR/<name>.json)."""
+        return cls.from_profiles(_read_profiles(data_dir))
+
+    def update(self, name, level, xp):
+        key = (-level, -xp, name)
+        old = self._keys.get(name)
+        if old == key:
+            return
+        if old is not None:
+            self._ranking.remove(old)
+        self._ranking.add(key)
+        self._keys[name] = key
+
+    def remove(self, name):
+        key = self._keys.pop(name, None)
+        if key is not None:
+            self._ranking.remove(key)
+
+    def rank(self, name) -> Optional[int]:
+        """1-based rank of a profile, or None if it is not ranked."""
+        key = self._keys.get(name)
+        return None if key is None else self._ranking.index(key) + 1
+
+    def top(self, k=10, offset=0) -> List[Standing]:
+        if k <= 0:
+            return []
+        keys = islice(self._ranking.iter_from(offset), k)
+        return [Standing(rank, name, -level, -xp) for rank, (level, xp, name) in enumerate(keys, offset + 1)]
+
+    def track(self, name, character):
+        """Rank a character and keep its entry current as its level and XP
+        change."""
+        def tracker(character, field, old):
+            if field in ("_level", "_xp"):
+                self.update(name, character._level, character._xp)
+        character._tracker = tracker
+        self.update(name, character._level, character._xp)
+
+    @staticmethod
+    def untrack(character):
+        character._tracker = None
+
+def _read_profiles(data_dir):
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            name, extension = os.path.splitext(entry.name)
+            if extension != ".json" or not entry.is_file():
+                continue
+            game_state = JsonStorage(entry.path).load_game_state()
+            if game_state is not None:
+                character = game_state["character"]
+                yield name, character["_level"], character["_xp"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the profiles in a directory of saves")
+    parser.add_argument("data_dir", help="directory of <name>.json saves, e.g. the server's --data-dir")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--rank", metavar="NAME", help="also show the rank of this profile")
+    args = parser.parse_args(argv)
+
+    leaderboard = Leaderboard.from_saves(args.data_dir)
+    print(f"{len(leaderboard)} profile(s)")
+    for standing in leaderboard.top(args.top):
+        print(f"{standing.rank:>6}. {standing.name:20} level {standing.level:>4}  {standing.xp:>8} XP")
+    if args.rank:
+        rank = leaderboard.rank(args.rank)
+        print(f"{args.rank}: " + (f"rank {rank}" if rank else "not found"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Opt-in instrumentation of TaskManager, DataManager and the storage
+engines.
+
+Nothing is wrapped until enable() is called, so with metrics off the game
+runs its original methods at no cost at all. Once enabled, every call of
+an instrumented method is counted and timed into a latency histogram,
+and whole-save loads and writes also count the bytes of the save file.
+DataManager.serialize_game_state and the engines' save_serialized are
+timed separately, which splits a save into serialization and I/O.
+
+Results go to a Prometheus text file, or a JSON dump when the file name
+ends in .json. enable(profile_file=...) also runs cProfile for the
+session and writes its stats on disable().
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from utils.data_manager import atomic_open
+
+# Upper bounds of the latency buckets, in seconds
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+TASK_MANAGER_METHODS = ("create_task", "delete_task", "delete_many", "complete_task", "complete_many",
+                        "query", "clear_tasks", "pop_changes", "roll_over", "load_tasks")
+DATA_MANAGER_METHODS = ("serialize_game_state", "save_game_state", "load_game_state", "save_changes")
+
+class Histogram:
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # The last one is +Inf
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()  # Saves also run on background threads
+        self.calls = {}
+        self.bytes = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.calls.get(name)
+            if histogram is None:
+                histogram = self.calls[name] = Histogram()
+            histogram.observe(seconds)
+
+    def add_bytes(self, name, count):
+        with self._lock:
+            self.bytes[name] = self.bytes.get(name, 0) + count
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.bytes.clear()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "calls": {name: {"count": h.count, "seconds": h.total,
+                                 "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], h.buckets))}
+                          for name, h in sorted(self.calls.items())},
+                "bytes": dict(sorted(self.bytes.items())),
+            }
+
+    def to_prometheus(self):
+        lines = ["# TYPE rpg_call_seconds histogram"]
+        with self._lock:
+            for name, histogram in sorted(self.calls.items()):
+                cumulative = 0
+                for bound, count in zip([*map(str, BUCKETS), "+Inf"], histogram.buckets):
+                    cumulative += count
+                    lines.append(f'rpg_call_seconds_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'rpg_call_seconds_sum{{op="{name}"}} {histogram.total}')
+                lines.append(f'rpg_call_seconds_count{{op="{name}"}} {histogram.count}')
+            lines.append("# TYPE rpg_bytes_total counter")
+            for name, count in sorted(self.bytes.items()):
+                lines.append(f'rpg_bytes_total{{op="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        with atomic_open(path) as f:
+            if path.endswith(".json"):
+                json.dump(self.to_dict(), f, indent=4)
+            else:
+                f.write(self.to_prometheus())
+
+registry = Metrics()
+
+_originals = []  # (owner, attribute, original or None if inherited) to restore
+_profiler = None
+_profile_file = None
+_NO_TIMER = nullcontext()
+_waited = 0.0  # Seconds spent in waiting() blocks so far
+
+def enabled():
+    return bool(_originals)
+
+def timer(name):
+    """Context manager timing a block into the histogram for name; a
+    shared no-op while metrics are disabled."""
+    if not _originals:
+        return _NO_TIMER
+    return _timed_block(name)
+
+def waiting():
+    """Context manager for time spent waiting on the player, which the
+    timer() blocks around it leave out; a shared no-op while metrics are
+    disabled."""
+    if not _originals:
+        return _NO_TIMER
+    return _waiting_block()
+
+@contextmanager
+def _timed_block(name):
+    start = time.perf_counter()
+    waited = _waited
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start - (_waited - waited))
+
+@contextmanager
+def _waiting_block():
+    global _waited
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _waited += time.perf_counter() - start
+
+def instrument(owner, attribute, size=None):
+    """Replace owner.attribute with a timed wrapper recorded as
+    "Owner.attribute". size(instance) returns the bytes to count after
+    each call, for methods of storage engines."""
+    # The raw class attribute, so staticmethods are seen as such
+    original = next(vars(klass)[attribute] for klass in owner.__mro__ if attribute in vars(klass))
+    inherited = attribute not in vars(owner)
+    static = isinstance(original, staticmethod)
+    function = original.__func__ if static else original
+    name = f"{owner.__name__}.{attribute}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            registry.observe(name, time.perf_counter() - start)
+            if size is not None:
+                registry.add_bytes(name, size(args[0]))
+
+    setattr(owner, attribute, staticmethod(wrapper) if static else wrapper)
+    _originals.append((owner, attribute, None if inherited else original))
+
+def enable(profile_file=None):
+    """Instrument the hot paths, and run cProfile on the calling thread
+    if profile_file is given."""
+    global _profiler, _profile_file
+    if not _originals:
+        # Imported here so that importing metrics, which the CLI always
+        # does, loads none of the engines
+        from models.task_manager import TaskManager
+        from utils.data_manager import DataManager, JsonStorage
+        from utils.sqlite_storage import SqliteStorage
+        from utils.binary_format import BinaryStorage
+        for method in TASK_MANAGER_METHODS:
+            instrument(TaskManager, method)
+        for method in DATA_MANAGER_METHODS:
+            instrument(DataManager, method)
+        for engine in (JsonStorage, SqliteStorage, BinaryStorage):
+            instrument(engine, "load_game_state", _save_size)
+            instrument(engine, "save_serialized", _save_size)
+            instrument(engine, "record")
+    if profile_file and _profiler is None:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profile_file = profile_file
+        _profiler.enable()
+
+def disable():
+    """Restore the original methods and write the cProfile stats."""
+    global _profiler
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        if original is None:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_profile_file)
+        _profiler = None
+
+@contextmanager
+def session(metrics_file=None, profile_file=None):
+    """Collect metrics for the duration of the block and write them to
+    metrics_file at the end; does nothing when both files are None."""
+    if metrics_file is None and profile_file is None:
+        yield
+        return
+    enable(profile_file)
+    try:
+        yield
+    finally:
+        disable()
+        if metrics_file is not None:
+            registry.write(metrics_file)
+
+def _save_size(storage):
+    path = getattr(storage, "save_file", None) or getattr(storage, "db_file", None)
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
@@ -0,0 +1,30 @@
+"""Import an existing gamestate.json save into a SQLite database.
+
+Usage: python -m utils.migrate [gamestate.json] [gamestate.db]
+"""
+import sys
+from models.task_manager import TaskManager
+from utils.data_manager import DataManager, JsonStorage
+from utils.sqlite_storage import SqliteStorage
+
+def migrate_json_to_sqlite(json_file=JsonStorage.DEFAULT_FILE, db_file=SqliteStorage.DEFAULT_FILE):
+    game_state = JsonStorage(json_file).load_game_state()
+    if game_state is None:
+        return False
+
+    character = DataManager.deserialize_character(game_state["character"])
+
+    task_manager = TaskManager()
+    task_manager.load_tasks(game_state["tasks"])
+
+    storage = SqliteStorage(db_file)
+    storage.save_game_state(character, task_manager.get_tasks(), game_state.get("state"))
+    storage.close()
+    return True
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if migrate_json_to_sqlite(*args[:2]):
+        print("Save migrated successfully!")
+    else:
+        print("No save file found.")
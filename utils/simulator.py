@@ -0,0 +1,242 @@
+"""Balance simulator: plays many survivors through many days with NumPy
+to show what the reward and survival rules lead to.
+
+Usage: python -m utils.simulator [--profile casual] [--survivors 100000]
+           [--days 365] [--workers 4] [--set DAILY_FAILURE_REWARD=-3]
+
+Requires numpy. Every number comes from models.rules, the marketplace
+catalog and DailyRollover, the same definitions the game uses, so a
+simulation cannot drift from the game. --set overrides a constant in
+models.rules for the run, to try out a change before making it.
+
+Each simulated day follows the game's order: the rollover penalises the
+dailies missed the day before, the day's tasks are completed as one
+batch the way TaskManager.complete_many applies them, and the survivor
+then restocks at the marketplace. A survivor dies when health reaches 0
+and stays dead for the rest of the run.
+"""
+import argparse
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Tuple
+import numpy as np
+import models.rules as rules
+import models.daily_rollover as daily_rollover
+from models.consumables import Food, Water, Medicine, catalog
+
+class BehaviorProfile(NamedTuple):
+    todos_per_day: float  # Mean of a Poisson draw
+    priority_weights: Tuple[float, float, float]  # low, medium, high
+    dailies: int
+    attempt_rate: float  # Chance a daily is done at all on a given day
+    success_rate: float  # Chance an attempted daily succeeds
+    eat_below: int  # Restock thresholds
+    drink_below: int
+    treat_above: int
+
+PROFILES = {
+    "casual": BehaviorProfile(2.0, (0.6, 0.3, 0.1), 2, 0.7, 0.8, 30, 30, 10),
+    "diligent": BehaviorProfile(5.0, (0.3, 0.4, 0.3), 4, 0.95, 0.9, 50, 50, 5),
+    "struggling": BehaviorProfile(1.0, (0.8, 0.15, 0.05), 3, 0.5, 0.6, 20, 20, 20),
+}
+
+PRIORITIES = ("low", "medium", "high")
+PERCENTILES = (10, 50, 90)
+
+def apply_overrides(overrides):
+    """Set constants in models.rules, then rebuild what was derived from
+    them at import time. Only call this in a worker process."""
+    for name, value in overrides.items():
+        if not hasattr(rules, name) or not name.isupper():
+            raise ValueError(f"models.rules has no constant {name!r}")
+        setattr(rules, name, value)
+    if overrides:
+        importlib.reload(daily_rollover)
+
+def parse_override(text):
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    try:
+        return name.strip(), int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name.strip()} must be an integer")
+
+class _LevelTable:
+    """rules.level_for_xp evaluated once per XP value, so whole arrays of
+    XP balances can be looked up at once. Grows as balances do."""
+
+    def __init__(self):
+        self._levels = np.empty(0, dtype=np.int64)
+
+    def __call__(self, xp):
+        highest = int(xp.max(initial=0))
+        if highest >= len(self._levels):
+            size = max(highest + 1, 2 * len(self._levels), 1024)
+            self._levels = np.fromiter((rules.level_for_xp(x) for x in range(size)),
+                                       dtype=np.int64, count=size)
+        return self._levels[xp]
+
+def _restock_items():
+    # First catalog item of each kind, with the stat it moves and its sign
+    items = {}
+    for item in catalog().values():
+        items.setdefault(type(item), item)
+    return [(stat, sign, items[item_type]) for item_type, stat, sign in
+            ((Food, "hunger", 1), (Water, "thirst", 1), (Medicine, "infection", -1))
+            if item_type in items]
+
+def simulate(profile, survivors, days, seed, overrides=None):
+    """Run one shard and return per-survivor result arrays."""
+    apply_overrides(overrides or {})
+    rng = np.random.default_rng(seed)
+    rollover = daily_rollover.DailyRollover
+    level_for = _LevelTable()
+    bonus = np.array([rules.streak_bonus(streak) for streak in range(days + 2)], dtype=np.int64)
+    todo_rewards = np.array([rules.TODO_REWARDS[priority] for priority in PRIORITIES], dtype=np.int64)
+    restock = _restock_items()
+    weights = np.array(profile.priority_weights, dtype=float)
+    todo_means = profile.todos_per_day * weights / weights.sum()
+
+    level = np.ones(survivors, dtype=np.int64)
+    xp = np.zeros(survivors, dtype=np.int64)
+    stats = {
+        "health": np.full(survivors, rules.MAX_HEALTH, dtype=np.int64),
+        "hunger": np.full(survivors, rules.MAX_STAT, dtype=np.int64),
+        "thirst": np.full(survivors, rules.MAX_STAT, dtype=np.int64),
+        "infection": np.zeros(survivors, dtype=np.int64),
+    }
+    limits = {"health": rules.MAX_HEALTH, "hunger": rules.MAX_STAT,
+              "thirst": rules.MAX_STAT, "infection": rules.MAX_STAT}
+    thresholds = {"hunger": profile.eat_below, "thirst": profile.drink_below,
+                  "infection": profile.treat_above}
+    streaks = np.zeros((survivors, profile.dailies), dtype=np.int64)
+    attempted = np.ones((survivors, profile.dailies), dtype=bool)
+    alive = np.ones(survivors, dtype=bool)
+    death_day = np.full(survivors, -1, dtype=np.int64)
+    earned = np.zeros(survivors, dtype=np.int64)
+    spent = np.zeros(survivors, dtype=np.int64)
+
+    def add(stat, change):
+        values = stats[stat]
+        np.clip(values + change * alive, 0, limits[stat], out=values)
+
+    def bury(day):
+        died = alive & (stats["health"] <= 0)
+        death_day[died] = day
+        alive[died] = False
+
+    for day in range(days):
+        # Rollover: every daily not done yesterday counts as a missed day
+        missed = (~attempted).sum(axis=1)
+        add("health", -missed * rollover.MISSED_DAY_HEALTH_PENALTY)
+        add("infection", missed * rollover.MISSED_DAY_INFECTION)
+        bury(day)
+
+        # The day's completions, applied together like complete_many
+        # Splitting a Poisson count by priority gives independent Poisson
+        # counts per priority, which are much cheaper to draw
+        todos = rng.poisson(todo_means, (survivors, len(PRIORITIES)))
+        attempted = rng.random(streaks.shape) < profile.attempt_rate
+        succeeded = attempted & (rng.random(streaks.shape) < profile.success_rate)
+        failed = attempted & ~succeeded
+        streaks = np.where(succeeded, streaks + 1, 0)
+        daily_rewards = np.where(succeeded, rules.DAILY_SUCCESS_REWARD + bonus[streaks],
+                                 np.where(failed, rules.DAILY_FAILURE_REWARD, 0))
+        rewards = np.concatenate([todos * todo_rewards, daily_rewards], axis=1)
+        xp_gained = np.where(rewards > 0, rewards, 0).sum(axis=1) * alive
+        health_change = np.where(rewards < 0, rewards, 0).sum(axis=1)
+        completions = todos.sum(axis=1) + attempted.sum(axis=1)
+        failures = failed.sum(axis=1)
+
+        xp += xp_gained
+        earned += xp_gained
+        new_level = np.maximum(level, level_for(xp))
+        levelled = new_level > level
+        level = new_level
+        stats["health"][levelled] = rules.MAX_HEALTH
+        add("health", health_change)
+        add("hunger", -completions * rules.HUNGER_DECAY_PER_COMPLETION)
+        add("thirst", -completions * rules.THIRST_DECAY_PER_COMPLETION)
+        add("infection", failures * rules.INFECTION_PER_FAILURE)
+        bury(day)
+
+        # Marketplace: fill up whatever is past its threshold, bought the
+        # way consumables.purchase clamps a quantity
+        for stat, sign, item in restock:
+            values = stats[stat]
+            wanted = alive & ((values < thresholds[stat]) if sign > 0 else (values > thresholds[stat]))
+            if not wanted.any():
+                continue
+            headroom = limits[stat] - values if sign > 0 else values
+            quantity = np.minimum(xp // item._cost if item._cost else headroom,
+                                  headroom // item._effect_value if item._effect_value else 0) * wanted
+            cost = quantity * item._cost
+            xp -= cost
+            spent += cost
+            add(stat, sign * quantity * item._effect_value)
+
+    return {"level": level, "xp": xp, "earned": earned, "spent": spent,
+            "death_day": death_day, "infection": stats["infection"]}
+
+def run(profile, survivors, days, workers=None, seed=None, overrides=None):
+    """Shard the survivors across a process pool and merge the results.
+    Rule overrides only ever touch the worker processes."""
+    workers = workers or os.cpu_count() or 1
+    shards = min(workers, survivors)
+    sizes = [len(part) for part in np.array_split(np.arange(survivors), shards)]
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        parts = list(pool.map(simulate, [profile] * shards, sizes, [days] * shards,
+                              seeds, [overrides] * shards))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def summarize(results, days):
+    deaths = results["death_day"] >= 0
+    return {
+        "survivors": len(deaths),
+        "death_rate": float(deaths.mean()),
+        "death_day": np.percentile(results["death_day"][deaths], PERCENTILES) if deaths.any() else None,
+        "level": np.percentile(results["level"], PERCENTILES),
+        "earned_per_day": float(results["earned"].mean() / days),
+        "spent_share": float(results["spent"].sum() / max(results["earned"].sum(), 1)),
+        "xp_balance": np.percentile(results["xp"], PERCENTILES),
+        "infection": np.percentile(results["infection"], PERCENTILES),
+    }
+
+def _format_percentiles(values):
+    return "  ".join(f"p{p}={v:g}" for p, v in zip(PERCENTILES, values))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate the game's balance over many survivors")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES),
+                        help="behavior profile to run; repeatable, default: all")
+    parser.add_argument("--survivors", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", type=int, help="processes to use, default: one per CPU")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--set", dest="overrides", action="append", type=parse_override, default=[],
+                        metavar="NAME=VALUE", help="override an integer constant in models.rules")
+    args = parser.parse_args(argv)
+
+    overrides = dict(args.overrides)
+    for name in overrides:
+        if not hasattr(rules, name) or not name.isupper():
+            parser.error(f"models.rules has no constant {name!r}")
+
+    for name in args.profile or sorted(PROFILES):
+        results = run(PROFILES[name], args.survivors, args.days, args.workers, args.seed, overrides)
+        summary = summarize(results, args.days)
+        print(f"{name}: {summary['survivors']} survivors over {args.days} days")
+        print(f"  died:        {summary['death_rate']:.1%}"
+              + (f"  (day {_format_percentiles(summary['death_day'])})" if summary["death_day"] is not None else ""))
+        print(f"  level:       {_format_percentiles(summary['level'])}")
+        print(f"  XP earned:   {summary['earned_per_day']:.1f}/day, {summary['spent_share']:.0%} spent at the marketplace")
+        print(f"  XP balance:  {_format_percentiles(summary['xp_balance'])}")
+        print(f"  infection:   {_format_percentiles(summary['infection'])}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
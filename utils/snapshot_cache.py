@@ -0,0 +1,82 @@
+import hashlib
+import os
+import pickle
+from utils.data_manager import atomic_open
+
+class SnapshotCache:
+    """Pickled Survivor and TaskManager from the last session, so a start
+    can skip parsing the save and rebuilding every task.
+
+    The snapshot is keyed on the storage engine's source files. It is
+    used when their mtime and size are unchanged, or when they changed
+    but their contents hash the same (e.g. after a copy or touch).
+    Anything else, including a snapshot that fails to unpickle, counts
+    as a miss and the caller loads the save as usual.
+    """
+    # Bump whenever pickled classes change shape
+    VERSION = 7
+
+    def __init__(self, storage, path=None):
+        self.storage = storage
+        sources = storage.source_files()
+        self.path = path or (os.path.splitext(sources[0])[0] + ".snapshot" if sources else None)
+
+    def load(self):
+        """Return (character, task_manager) or None if the snapshot is
+        missing or stale."""
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = pickle.load(f)
+            if snapshot["version"] != self.VERSION or snapshot["engine"] != type(self.storage).__name__:
+                return None
+            if snapshot["stats"] != self._stats() and snapshot["hashes"] != self._hashes():
+                return None
+            self.storage.restore_snapshot_state(snapshot["storage"])
+            return snapshot["character"], snapshot["task_manager"]
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, ImportError, TypeError):
+            return None
+
+    def save(self, character, task_manager):
+        """Snapshot the current state; call only once the save files hold
+        exactly this state."""
+        if self.path is None:
+            return
+        snapshot = {
+            "version": self.VERSION,
+            "engine": type(self.storage).__name__,
+            "stats": self._stats(),
+            "hashes": self._hashes(),
+            "storage": self.storage.snapshot_state(),
+            "character": character,
+            "task_manager": task_manager,
+        }
+        with atomic_open(self.path, "wb") as f:
+            pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except (OSError, TypeError):
+            pass
+
+    def _stats(self):
+        stats = []
+        for path in self.storage.source_files():
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stats.append(None)
+        return stats
+
+    def _hashes(self):
+        hashes = []
+        for path in self.storage.source_files():
+            try:
+                with open(path, "rb") as f:
+                    hashes.append(hashlib.file_digest(f, "blake2b").hexdigest())
+            except FileNotFoundError:
+                hashes.append(None)
+        return hashes
@@ -0,0 +1,255 @@
+import json
+import sqlite3
+from utils.data_manager import StorageEngine
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS character (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    name TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    xp INTEGER NOT NULL,
+    health INTEGER NOT NULL,
+    hunger INTEGER NOT NULL,
+    thirst INTEGER NOT NULL,
+    infection INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    item_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    priority TEXT,
+    last_completion_date TEXT,
+    was_successful INTEGER,
+    streak INTEGER NOT NULL DEFAULT 0,
+    best_streak INTEGER NOT NULL DEFAULT 0,
+    history INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS completions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL,
+    completion_date TEXT,
+    was_successful INTEGER
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+-- The deadlines of the "schedule" state, one row per task so changing
+-- one does not rewrite them all; the rest of it stays in state
+CREATE TABLE IF NOT EXISTS deadlines (
+    task_id INTEGER PRIMARY KEY,
+    due TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_type ON tasks (type);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_last_completion_date ON tasks (last_completion_date);
+CREATE INDEX IF NOT EXISTS idx_completions_task ON completions (task_id);
+"""
+
+CHARACTER_COLUMNS = ["_name", "_level", "_xp", "_health", "_hunger", "_thirst", "_infection"]
+
+TASK_COLUMNS = ["id", "type", "title", "description", "completed", "priority",
+                "last_completion_date", "was_successful", "streak", "best_streak", "history"]
+INSERT_TASK = (f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) "
+               f"VALUES ({', '.join('?' for _ in TASK_COLUMNS)})")
+UPDATE_TASK = f"UPDATE tasks SET {', '.join(f'{column} = ?' for column in TASK_COLUMNS[1:])} WHERE id = ?"
+
+class SqliteStorage(StorageEngine):
+    """Stores tasks, character stats and completion history in real tables.
+
+    Mutations become row-level writes that are committed in batches of
+    BATCH_SIZE, or on flush()/close().
+    """
+    DEFAULT_FILE = "gamestate.db"
+    BATCH_SIZE = 100
+
+    journaled = True
+
+    def __init__(self, db_file=DEFAULT_FILE):
+        self.db_file = db_file
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._pending = 0
+
+    def load_game_state(self):
+        row = self._conn.execute(
+            "SELECT name, level, xp, health, hunger, thirst, infection FROM character").fetchone()
+        if row is None:
+            return None
+        character_data = dict(zip(CHARACTER_COLUMNS, row))
+        character_data["_inventory"] = dict(self._conn.execute("SELECT item_id, count FROM inventory"))
+        state = {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM state")}
+        deadlines = {str(task_id): due for task_id, due in self._conn.execute("SELECT task_id, due FROM deadlines")}
+        if deadlines:
+            state.setdefault("schedule", {})["deadlines"] = deadlines
+        return {
+            "character": character_data,
+            "tasks": list(self.iter_tasks()),
+            "state": state
+        }
+
+    def save_serialized(self, game_state):
+        with self._conn:
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.execute("DELETE FROM state")
+            self._conn.execute("DELETE FROM deadlines")
+            state = dict(game_state.get("state") or {})
+            schedule = state.pop("schedule", None)
+            self._conn.executemany(
+                "INSERT INTO state (key, value) VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in state.items()))
+            if schedule is not None:
+                self._write_schedule(schedule)
+            self._write_character(game_state["character"])
+            self._conn.executemany(INSERT_TASK, (_task_row(task_data) for task_data in game_state["tasks"]))
+        self._pending = 0
+
+    def load_tasks(self, task_type=None, completed=None, priority=None, completed_since=None,
+                   completed_until=None, offset=0, limit=None):
+        query = f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks"
+        conditions, params = [], []
+        if task_type is not None:
+            conditions.append("type = ?")
+            params.append(task_type)
+        if completed is not None:
+            conditions.append("completed = ?")
+            params.append(int(completed))
+        if priority is not None:
+            conditions.append("priority = ?")
+            params.append(priority)
+        if completed_since is not None:
+            conditions.append("last_completion_date >= ?")
+            params.append(completed_since)
+        if completed_until is not None:
+            conditions.append("last_completion_date <= ?")
+            params.append(completed_until)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+
+        return [_task_data(row) for row in self._conn.execute(query, params)]
+
+    def iter_tasks(self):
+        # A separate cursor streams rows without materializing the table
+        for row in self._conn.execute(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks ORDER BY id"):
+            yield _task_data(row)
+
+    def record(self, op, **payload):
+        if op == "character":
+            self._write_character(payload["character"])
+        elif op == "create":
+            self._conn.execute(INSERT_TASK, _task_row(payload["task"]))
+        elif op == "update":
+            task_data = payload["task"]
+            task_id = task_data["_id"]
+            self._conn.execute(UPDATE_TASK, _task_row(task_data)[1:] + (task_id,))
+            # Delta saves name the fields they changed; only a change to
+            # the completed flag is a new completion
+            fields = payload.get("fields")
+            if task_data["_completed"] and (fields is None or "_completed" in fields):
+                self._conn.execute(
+                    "INSERT INTO completions (task_id, completion_date, was_successful) VALUES (?, ?, ?)",
+                    (task_id, task_data.get("last_completion_date"), _to_int(task_data.get("was_successful", True))))
+        elif op == "delete":
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (payload["id"],))
+        elif op == "clear":
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.execute("DELETE FROM deadlines")
+            self._conn.execute("DELETE FROM state WHERE key = 'schedule'")
+        elif op == "state":
+            if payload["key"] == "schedule":
+                self._conn.execute("DELETE FROM deadlines")
+                self._write_schedule(payload["value"])
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                    (payload["key"], json.dumps(payload["value"])))
+        elif op == "deadline":
+            if payload["due"] is None:
+                self._conn.execute("DELETE FROM deadlines WHERE task_id = ?", (payload["id"],))
+            else:
+                self._conn.execute("INSERT OR REPLACE INTO deadlines (task_id, due) VALUES (?, ?)",
+                                   (payload["id"], payload["due"]))
+        elif op == "rules":
+            schedule = self._read_state("schedule") or {}
+            schedule.update(rules=payload["rules"], next_rule_id=payload["next_rule_id"])
+            self._write_schedule(schedule)
+
+        self._pending += 1
+        if self._pending >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+
+    def source_files(self):
+        return [self.db_file]
+
+    def _read_state(self, key):
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _write_schedule(self, schedule):
+        # Deadlines go to their own table, adding to the rows already there
+        schedule = dict(schedule)
+        self._conn.executemany("INSERT OR REPLACE INTO deadlines (task_id, due) VALUES (?, ?)",
+                               ((int(task_id), due) for task_id, due in schedule.pop("deadlines", {}).items()))
+        self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('schedule', ?)",
+                           (json.dumps(schedule),))
+
+    def _write_character(self, character_data):
+        row = self._conn.execute(
+            "SELECT name, level, xp, health, hunger, thirst, infection FROM character").fetchone()
+        merged = dict(zip(CHARACTER_COLUMNS, row)) if row else {}
+        merged.update(character_data)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO character (id, name, level, xp, health, hunger, thirst, infection) "
+            "VALUES (1, ?, ?, ?, ?, ?, ?, ?)",
+            tuple(merged[column] for column in CHARACTER_COLUMNS))
+        # One row per item held, rewritten whenever the inventory changes
+        if "_inventory" in character_data:
+            self._conn.execute("DELETE FROM inventory")
+            self._conn.executemany("INSERT INTO inventory (item_id, count) VALUES (?, ?)",
+                                   character_data["_inventory"].items())
+
+def _to_int(value):
+    return None if value is None else int(value)
+
+def _task_row(task_data):
+    task_type = "todo" if "_priority" in task_data else "daily"
+    return (task_data["_id"], task_type, task_data["_title"], task_data["_description"], int(task_data["_completed"]),
+            task_data.get("_priority"), task_data.get("last_completion_date"),
+            _to_int(task_data.get("was_successful")), task_data.get("streak", 0),
+            task_data.get("best_streak", 0), task_data.get("history", 0))
+
+def _task_data(row):
+    (task_id, task_type, title, description, completed, priority, last_completion_date, was_successful,
+     streak, best_streak, history) = row
+    task_data = {
+        "_id": task_id,
+        "_title": title,
+        "_description": description,
+        "_completed": bool(completed),
+    }
+    if task_type == "todo":
+        task_data["_priority"] = priority
+    else:
+        task_data["last_completion_date"] = last_completion_date
+        task_data["was_successful"] = None if was_successful is None else bool(was_successful)
+        task_data["streak"] = streak
+        task_data["best_streak"] = best_streak
+        task_data["history"] = history
+    return task_data
@@ -0,0 +1,94 @@
+import bisect
+import sys
+from datetime import date
+from models.daily_task import DailyTask
+
+class TaskRenderer:
+    """Renders a TaskManager's tasks one page at a time.
+
+    Formatted rows are cached per task and dropped only when the task
+    changes, and every page goes to the terminal in a single write, so
+    showing a page costs the same with 50 tasks or 50,000.
+    """
+
+    def __init__(self, task_manager, page_size=20):
+        self.task_manager = task_manager
+        self.page_size = page_size
+        self._rows = {}
+        self._order = None  # Task IDs in display order, built on first use
+        self._day = date.today()
+        task_manager.add_listener(self._invalidate)
+
+    def page_count(self):
+        return max(1, -(-len(self.task_manager) // self.page_size))
+
+    def page_of(self, task_id):
+        """Page showing task_id, or None if there is no such task."""
+        order = self._task_ids()
+        position = bisect.bisect_left(order, task_id)
+        if position == len(order) or order[position] != task_id:
+            return None
+        return position // self.page_size
+
+    def render(self, page):
+        # Streaks shown in the rows depend on the date
+        if date.today() != self._day:
+            self._rows.clear()
+            self._day = date.today()
+
+        order = self._task_ids()
+        if not order:
+            return "\nNo tasks available.\n"
+        page = min(max(page, 0), self.page_count() - 1)
+        start = page * self.page_size
+        rows = [self._row(task_id) for task_id in order[start:start + self.page_size]]
+        return (f"\nCurrent Tasks (page {page + 1}/{self.page_count()}, {len(order)} tasks):\n"
+                + "\n".join(rows) + "\n")
+
+    def show(self, page, out=None):
+        out = out or sys.stdout
+        out.write(self.render(page))
+        out.flush()
+
+    def _row(self, task_id):
+        row = self._rows.get(task_id)
+        if row is None:
+            row = self._rows[task_id] = format_task(self.task_manager.get_task(task_id),
+                                                    self.task_manager.deadline(task_id))
+        return row
+
+    def _task_ids(self):
+        # IDs only grow and tasks are kept in creation order, so the list
+        # is sorted and page_of() can bisect it
+        if self._order is None:
+            self._order = [task.id for task in self.task_manager.get_tasks()]
+        return self._order
+
+    def _invalidate(self, event, task_id):
+        if event == "clear":
+            self._rows.clear()
+            self._order = None
+            return
+        self._rows.pop(task_id, None)
+        if self._order is None or event == "update":
+            return
+        # Keep the ID list sorted in place instead of rebuilding it
+        position = bisect.bisect_left(self._order, task_id)
+        found = position < len(self._order) and self._order[position] == task_id
+        if event == "create" and not found:
+            self._order.insert(position, task_id)  # Appends unless undo put back an older task
+        elif event == "delete" and found:
+            del self._order[position]
+
+def format_task(task, due=None):
+    if isinstance(task, DailyTask):
+        task_type = "Daily"
+        streak = task.current_streak()
+        details = f" - Streak: {streak}" if streak else ""
+    else:
+        task_type = "Todo"
+        details = f" - Priority: {task._priority}"
+        if due is not None:
+            details += f" - Due: {due}"
+    status = "Completed" if task._completed else "Pending"
+    return f"{task.id}. [{task_type}] {task._title}{details} - {status}"
@@ -0,0 +1,231 @@
+import json
+import os
+from collections import deque
+from typing import List, NamedTuple
+from utils.data_manager import DataManager, atomic_open
+
+CHARACTER_FIELDS = ("_name", "_level", "_xp", "_health", "_hunger", "_thirst", "_infection",
+                    "_inventory")
+
+class Entry(NamedTuple):
+    label: str
+    # Undone last to first. ("set", task_id, field, old value),
+    # ("created", [task_id, ...]), ("deleted", [task, ...]),
+    # ("deadline", task_id, old due date or None), ("schedule", old
+    # Scheduler state, whole or just its rules) or ("character", field,
+    # old value)
+    steps: List[tuple]
+
+class UndoHistory:
+    """Undo and redo of whole actions on a TaskManager and its Survivor.
+
+    Each entry is a log of inverse operations that holds only the old
+    value of every field and deadline the action changed, the ID of every
+    task it created, the task objects it deleted and the recurrences it
+    replaced (or the whole schedule it cleared), so an action costs memory
+    in proportion to what it changed rather than to the task list.
+    Applying an entry yields its own inverse, which moves it between the
+    undo and redo stacks. Both keep at most max_entries, dropping the
+    oldest.
+
+    Changes from TaskManager arrive through its history hooks; character
+    stats are compared with their values at the last commit(), which
+    closes the current action.
+    """
+    MAX_ENTRIES = 50
+
+    def __init__(self, task_manager, character, max_entries=MAX_ENTRIES):
+        self.task_manager = task_manager
+        self.character = character
+        self._undo = deque(maxlen=max_entries)
+        self._redo = deque(maxlen=max_entries)
+        self._replaying = False
+        self._reset_pending()
+        task_manager.history = self
+
+    @property
+    def undo_label(self):
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self):
+        return self._redo[-1].label if self._redo else None
+
+    # TaskManager hooks
+    def task_created(self, task):
+        if not self._replaying:
+            self._add_to_step("created", task._id)
+            self._created.add(task._id)
+
+    def task_changed(self, task, field, old):
+        # Only the value from before the action is needed; changes to
+        # tasks created during it go away with the task
+        key = (task._id, field)
+        if self._replaying or key in self._seen or task._id in self._created:
+            return
+        self._seen.add(key)
+        self._steps.append(("set", task._id, field, old))
+
+    def task_deleted(self, task):
+        if not self._replaying:
+            self._add_to_step("deleted", task)
+
+    def tasks_cleared(self, tasks):
+        if not self._replaying and tasks:
+            self._steps.append(("deleted", tasks))
+
+    def deadline_changed(self, task_id, old):
+        # Logged for tasks created during the action too, so redoing their
+        # creation brings the deadline back with them
+        key = (task_id, "deadline")
+        if self._replaying or key in self._seen:
+            return
+        self._seen.add(key)
+        self._steps.append(("deadline", task_id, old))
+
+    def schedule_changed(self, old_state):
+        if not self._replaying:
+            self._steps.append(("schedule", old_state))
+
+    def commit(self, label):
+        """Close the current action; returns whether it changed anything."""
+        steps = self._steps
+        for field, old, new in zip(CHARACTER_FIELDS, self._baseline, self._character_state()):
+            if old != new:
+                steps.append(("character", field, old))
+        self._reset_pending()
+        if not steps:
+            return False
+        self._undo.append(Entry(label, steps))
+        self._redo.clear()
+        return True
+
+    def undo(self):
+        """Revert the last committed action; returns its label, or None if
+        there is nothing to undo."""
+        return self._move(self._undo, self._redo)
+
+    def redo(self):
+        return self._move(self._redo, self._undo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._reset_pending()
+
+    # Persistence, so undo survives restarting the game on the same day
+    def save(self, path):
+        with atomic_open(path) as f:
+            json.dump({
+                "day": self.task_manager.last_rollover,
+                "undo": [self._entry_data(entry) for entry in self._undo],
+                "redo": [self._entry_data(entry) for entry in self._redo],
+            }, f)
+
+    def load(self, path):
+        """Restore saved entries if they belong to the current day."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if data.get("day") != self.task_manager.last_rollover:
+            return False
+        self._undo.extend(self._entry(entry_data) for entry_data in data["undo"])
+        self._redo.extend(self._entry(entry_data) for entry_data in data["redo"])
+        return True
+
+    def _move(self, source, target):
+        if not source:
+            return None
+        entry = source.pop()
+        self._replaying = True
+        try:
+            inverse = [self._apply(step) for step in reversed(entry.steps)]
+        finally:
+            self._replaying = False
+            self._reset_pending()
+        target.append(Entry(entry.label, inverse))
+        return entry.label
+
+    def _apply(self, step):
+        """Carry out one step and return the step that reverts it."""
+        kind = step[0]
+        task_manager = self.task_manager
+        if kind == "set":
+            _, task_id, field, value = step
+            task = task_manager.get_task(task_id)
+            if task is None:
+                return step
+            current = getattr(task, field)
+            task_manager.set_field(task_id, field, value)
+            return ("set", task_id, field, current)
+        if kind == "created":
+            tasks = [task_manager.get_task(task_id) for task_id in step[1]]
+            tasks = [task for task in tasks if task is not None]
+            task_manager.delete_many([task._id for task in tasks])
+            return ("deleted", tasks)
+        if kind == "deleted":
+            tasks = [task for task in step[1] if task_manager.get_task(task._id) is None]
+            task_manager.restore_tasks(tasks)
+            return ("created", [task._id for task in tasks])
+        if kind == "deadline":
+            _, task_id, value = step
+            current = task_manager.deadline(task_id)
+            task_manager.restore_deadline(task_id, value)
+            return ("deadline", task_id, current)
+        if kind == "schedule":
+            return ("schedule", task_manager.restore_schedule(step[1]))
+        _, field, value = step
+        current = getattr(self.character, field)
+        setattr(self.character, field.lstrip("_"), value)
+        return ("character", field, current)
+
+    def _add_to_step(self, kind, item):
+        # Runs of creates or deletes share one step, so undoing them puts
+        # the task list back in one go. The deadline a delete cancels does
+        # not end the run: a deadline can be put back before its task.
+        steps = self._steps
+        end = len(steps)
+        if kind == "deleted":
+            while end and steps[end - 1][0] == "deadline":
+                end -= 1
+        if end and steps[end - 1][0] == kind:
+            steps[end - 1][1].append(item)
+        else:
+            steps.append((kind, [item]))
+
+    def _character_state(self):
+        return tuple(getattr(self.character, field) for field in CHARACTER_FIELDS)
+
+    def _reset_pending(self):
+        self._steps = []
+        self._seen = set()  # (task ID, field) pairs already logged
+        self._created = set()
+        self._baseline = self._character_state()
+
+    @staticmethod
+    def _entry_data(entry):
+        return {"label": entry.label,
+                "steps": [["deleted", [DataManager.serialize_task(task) for task in step[1]]]
+                          if step[0] == "deleted" else list(step) for step in entry.steps]}
+
+    def _entry(self, entry_data):
+        steps = []
+        for step in entry_data["steps"]:
+            if step[0] == "deleted":
+                tasks = []
+                for task_data in step[1]:
+                    task = self.task_manager.build_task(task_data)
+                    task.clear_dirty()
+                    task._id = task_data["_id"]
+                    tasks.append(task)
+                steps.append(("deleted", tasks))
+            else:
+                steps.append(tuple(step))
+        return Entry(entry_data["label"], steps)
+
+def history_file(storage):
+    """Undo history file kept next to the storage engine's save."""
+    sources = storage.source_files()
+    return os.path.splitext(sources[0])[0] + ".undo" if sources else None